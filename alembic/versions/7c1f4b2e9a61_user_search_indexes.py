@@ -0,0 +1,52 @@
+"""user search indexes
+
+Revision ID: 7c1f4b2e9a61
+Revises: 25d814bc83ed
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1f4b2e9a61'
+down_revision: Union[str, None] = '25d814bc83ed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Substring search (ILIKE '%term%') on email and nickname uses trigram GIN indexes.
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute('CREATE INDEX ix_users_email_trgm ON users USING gin (email gin_trgm_ops)')
+    op.execute('CREATE INDEX ix_users_nickname_trgm ON users USING gin (nickname gin_trgm_ops)')
+
+    # Case-insensitive prefix search (lower(col) LIKE 'term%') uses pattern-ops b-trees.
+    op.create_index('ix_users_email_lower_pattern', 'users', [sa.text('lower(email) text_pattern_ops')], unique=False)
+    op.create_index('ix_users_nickname_lower_pattern', 'users', [sa.text('lower(nickname) text_pattern_ops')], unique=False)
+
+    op.create_index('ix_users_role', 'users', ['role'], unique=False)
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    op.create_index('ix_users_last_login_at', 'users', ['last_login_at'], unique=False)
+
+    # Locked, unverified and professional users are a small slice of the table; partial
+    # indexes keep those filters cheap without indexing every row.
+    op.create_index('ix_users_locked_created_at', 'users', ['created_at'], unique=False, postgresql_where=sa.text('is_locked'))
+    op.create_index('ix_users_unverified_created_at', 'users', ['created_at'], unique=False, postgresql_where=sa.text('NOT email_verified'))
+    op.create_index('ix_users_professional_created_at', 'users', ['created_at'], unique=False, postgresql_where=sa.text('is_professional'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_professional_created_at', table_name='users')
+    op.drop_index('ix_users_unverified_created_at', table_name='users')
+    op.drop_index('ix_users_locked_created_at', table_name='users')
+    op.drop_index('ix_users_last_login_at', table_name='users')
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.drop_index('ix_users_role', table_name='users')
+    op.drop_index('ix_users_nickname_lower_pattern', table_name='users')
+    op.drop_index('ix_users_email_lower_pattern', table_name='users')
+    op.execute('DROP INDEX IF EXISTS ix_users_nickname_trgm')
+    op.execute('DROP INDEX IF EXISTS ix_users_email_trgm')
@@ -0,0 +1,28 @@
+"""user self registered
+
+Revision ID: a4c8e2f19d36
+Revises: f1a6d0c83e29
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e2f19d36'
+down_revision: Union[str, None] = 'f1a6d0c83e29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing users cannot be told apart by how they were created, so none of them are
+    # treated as self-registered and the unverified-user purge leaves them alone
+    op.add_column('users', sa.Column('self_registered', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'self_registered')
@@ -0,0 +1,39 @@
+"""user full text search
+
+Revision ID: b3d92e7f1c04
+Revises: 7c1f4b2e9a61
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d92e7f1c04'
+down_revision: Union[str, None] = '7c1f4b2e9a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('english', coalesce(first_name, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(last_name, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(bio, '')), 'B')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.create_index('ix_users_search_vector', 'users', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_search_vector', table_name='users')
+    op.drop_column('users', 'search_vector')
@@ -0,0 +1,52 @@
+"""user tokens
+
+Revision ID: d5a8e3f60b17
+Revises: b3d92e7f1c04
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a8e3f60b17'
+down_revision: Union[str, None] = 'b3d92e7f1c04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_tokens',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('purpose', sa.Enum('EMAIL_VERIFICATION', name='TokenPurpose', create_constraint=True), nullable=False),
+    sa.Column('token_hash', sa.String(length=64), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('used_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_user_tokens_token_hash', 'user_tokens', ['token_hash'], unique=True)
+    op.create_index('ix_user_tokens_user_id', 'user_tokens', ['user_id'], unique=False)
+
+    # Carry pending plaintext tokens over as hashes so links already mailed keep working
+    # for one full verification window.
+    op.execute(
+        "INSERT INTO user_tokens (id, user_id, purpose, token_hash, expires_at) "
+        "SELECT gen_random_uuid(), id, 'EMAIL_VERIFICATION', encode(sha256(convert_to(verification_token, 'UTF8')), 'hex'), "
+        "now() + interval '48 hours' FROM users WHERE verification_token IS NOT NULL AND NOT email_verified"
+    )
+    op.drop_column('users', 'verification_token')
+
+
+def downgrade() -> None:
+    # Hashed tokens cannot be turned back into plaintext; pending verifications are lost.
+    op.add_column('users', sa.Column('verification_token', sa.String(), nullable=True))
+    op.drop_index('ix_user_tokens_user_id', table_name='user_tokens')
+    op.drop_index('ix_user_tokens_token_hash', table_name='user_tokens')
+    op.drop_table('user_tokens')
+    op.execute('DROP TYPE IF EXISTS "TokenPurpose"')
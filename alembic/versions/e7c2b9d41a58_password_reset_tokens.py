@@ -0,0 +1,29 @@
+"""password reset tokens
+
+Revision ID: e7c2b9d41a58
+Revises: d5a8e3f60b17
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c2b9d41a58'
+down_revision: Union[str, None] = 'd5a8e3f60b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('ALTER TYPE "TokenPurpose" ADD VALUE IF NOT EXISTS \'PASSWORD_RESET\'')
+    op.create_index('ix_user_tokens_expires_at', 'user_tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    # PostgreSQL cannot drop an enum value; remove the rows that use it and leave the value.
+    op.drop_index('ix_user_tokens_expires_at', table_name='user_tokens')
+    op.execute("DELETE FROM user_tokens WHERE purpose = 'PASSWORD_RESET'")
@@ -0,0 +1,28 @@
+"""user locked at
+
+Revision ID: f1a6d0c83e29
+Revises: e7c2b9d41a58
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a6d0c83e29'
+down_revision: Union[str, None] = 'e7c2b9d41a58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True))
+    # Accounts locked before this column existed start their cooldown from their last update
+    op.execute('UPDATE users SET locked_at = updated_at WHERE is_locked')
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'locked_at')
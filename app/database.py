@@ -1,22 +1,148 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from builtins import bool, dict, int, isinstance, min, range, str
+import asyncio
+from typing import Awaitable, Callable
+from uuid import uuid4
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+from app.utils.metrics import instrument_engine
+from app.utils.query_stats import instrument_queries
+from app.utils.tracing import trace_queries
 
 Base = declarative_base()
 
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+def connect_args(database_url: str, statement_cache_size: int = 100, pgbouncer: bool = False) -> dict:
+    """
+    Driver arguments controlling asyncpg's prepared-statement caches.
+
+    PgBouncer in transaction pooling mode may hand each transaction a different server
+    connection, so statements prepared on one are missing (or clash by name) on the next:
+    both caches are disabled and every statement gets a unique name.
+    """
+    if make_url(database_url).get_driver_name() != "asyncpg":
+        return {}
+    if pgbouncer:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    return {"prepared_statement_cache_size": statement_cache_size}
+
+def is_sqlite(database_url: str) -> bool:
+    return make_url(database_url).get_backend_name() == "sqlite"
+
+def is_memory_database(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+def engine_options(database_url: str) -> dict:
+    """
+    Pool overrides for SQLite, which allows a single writer. An in-memory database lives inside
+    one connection, so that connection is shared. A file database gets a pool of one: sessions
+    queue for the connection instead of failing with "database is locked" when a transaction
+    that read first tries to write after another connection's commit.
+    """
+    if is_memory_database(database_url):
+        return {"poolclass": StaticPool}
+    if is_sqlite(database_url):
+        return {"poolclass": AsyncAdaptedQueuePool, "pool_size": 1, "max_overflow": 0}
+    return {}
+
+def configure_sqlite(engine: AsyncEngine):
+    """
+    Set up every new SQLite connection: WAL journaling for file databases (readers in other
+    processes no longer block the writer), enforced foreign keys and a busy timeout. The
+    sqlite3 module defers BEGIN until the first write, which breaks savepoints and
+    transactional DDL, so SQLAlchemy emits BEGIN itself instead.
+    """
+    sync_engine = engine.sync_engine
+    file_backed = not is_memory_database(engine.url.render_as_string())
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        if file_backed:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+    @event.listens_for(sync_engine, "begin")
+    def _on_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
 class Database:
     """Handles database connections and sessions."""
     _engine = None
     _session_factory = None
 
     @classmethod
-    def initialize(cls, database_url: str, echo: bool = False):
+    def initialize(cls, database_url: str, echo: bool = False, statement_cache_size: int = 100, pgbouncer: bool = False):
         """Initialize the async engine and sessionmaker."""
         if cls._engine is None:  # Ensure engine is created once
-            cls._engine = create_async_engine(database_url, echo=echo, future=True)
+            cls._engine = create_async_engine(
+                database_url, echo=echo, future=True,
+                connect_args=connect_args(database_url, statement_cache_size, pgbouncer),
+                **engine_options(database_url),
+            )
+            if is_sqlite(database_url):
+                configure_sqlite(cls._engine)
+            instrument_engine(cls._engine)
+            instrument_queries(cls._engine)
+            trace_queries(cls._engine)
             cls._session_factory = sessionmaker(
                 bind=cls._engine, class_=AsyncSession, expire_on_commit=False, future=True
             )
 
+    @classmethod
+    async def warm_up(cls, connections: int, work: Callable[[AsyncSession], Awaitable[None]]) -> int:
+        """
+        Open up to `connections` pooled connections at once and run `work` in a session on each,
+        so connection setup and per-connection statement preparation happen before traffic arrives.
+        Returns the number of connections warmed.
+        """
+        pool = cls._engine.pool
+        count = min(connections, pool.size() if isinstance(pool, QueuePool) else 1)
+        if count <= 0:
+            return 0
+        # Every session holds its connection until all are open, so each warms a distinct one
+        sessions = [cls._session_factory() for _ in range(count)]
+        try:
+            await asyncio.gather(*(session.connection() for session in sessions))
+            await asyncio.gather(*(work(session) for session in sessions))
+        finally:
+            await asyncio.gather(*(session.close() for session in sessions), return_exceptions=True)
+        return count
+
+    @classmethod
+    async def create_all(cls):
+        """Create any missing tables from the models; used for SQLite, which has no migrations."""
+        async with cls._engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    @classmethod
+    async def dispose(cls):
+        """Close all pooled connections and forget the engine; `initialize` may be called again."""
+        if cls._engine is not None:
+            await cls._engine.dispose()
+        cls._engine = None
+        cls._session_factory = None
+
+    @classmethod
+    def get_engine(cls) -> AsyncEngine:
+        """Returns the engine, ensuring it's initialized."""
+        if cls._engine is None:
+            raise ValueError("Database not initialized. Call `initialize()` first.")
+        return cls._engine
+
     @classmethod
     def get_session_factory(cls):
         """Returns the session factory, ensuring it's initialized."""
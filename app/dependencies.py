@@ -1,11 +1,14 @@
-from builtins import Exception, dict, str
-from fastapi import Depends, HTTPException
+from builtins import Exception, dict, list, str
+from typing import List, Optional
+from fastapi import Depends, HTTPException, Query
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import Database
+from app.schemas.user_schemas import REQUIRED_USER_FIELDS, USER_RESPONSE_FIELDS
 from app.utils.template_manager import TemplateManager
 from app.services.email_service import EmailService
 from app.services.jwt_service import decode_token
+from app.utils.server_timing import current_timings, timed
 from settings.config import Settings
 from fastapi import Depends
 
@@ -17,6 +20,10 @@ def get_email_service() -> EmailService:
     template_manager = TemplateManager()
     return EmailService(template_manager=template_manager)
 
+def get_session_factory():
+    """Session factory for work that outlives the request's session, such as background tasks."""
+    return Database.get_session_factory()
+
 async def get_db() -> AsyncSession:
     """Dependency that provides a database session for each request."""
     async_session_factory = Database.get_session_factory()
@@ -27,6 +34,20 @@ async def get_db() -> AsyncSession:
             raise HTTPException(status_code=500, detail=str(e))
         
 
+def get_user_fields(fields: Optional[str] = Query(None, description="Comma-separated user fields to return, e.g. email,nickname. Defaults to all fields.")) -> List[str]:
+    """Parse the sparse fieldset parameter into the user columns a route should select."""
+    if not fields:
+        return list(USER_RESPONSE_FIELDS)
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in USER_RESPONSE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(unknown)}")
+    selected = list(REQUIRED_USER_FIELDS)
+    for field in requested:
+        if field not in selected:
+            selected.append(field)
+    return selected
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
 def get_current_user(token: str = Depends(oauth2_scheme)):
@@ -35,13 +56,17 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    payload = decode_token(token)
+    with timed("auth"):
+        payload = decode_token(token)
     if payload is None:
         raise credentials_exception
     user_id: str = payload.get("sub")
     user_role: str = payload.get("role")
     if user_id is None or user_role is None:
         raise credentials_exception
+    timings = current_timings()
+    if timings is not None:
+        timings.role = user_role
     return {"user_id": user_id, "role": user_role}
 
 def require_role(role: str):
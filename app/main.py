@@ -1,11 +1,72 @@
-from builtins import Exception
+from builtins import Exception, OSError
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from sqlalchemy.exc import SQLAlchemyError
 from starlette.responses import JSONResponse
 from starlette.middleware.cors import CORSMiddleware  # Import the CORSMiddleware
-from app.database import Database
+from app.database import Database, is_sqlite
 from app.dependencies import get_settings
-from app.routers import user_routes
+from app.routers import admin_routes, health_routes, metrics_routes, user_routes
+from app.services.maintenance import build_scheduler
+from app.services.user_service import UserService
 from app.utils.api_description import getDescription
+from app.utils.common import setup_logging, shutdown_logging
+from app.utils.link_generation import build_link_templates
+from app.utils.metrics import MetricsMiddleware
+from app.utils.profiler import ProfilerMiddleware
+from app.utils.query_stats import QueryStatsMiddleware
+from app.utils.server_timing import ServerTimingMiddleware
+from app.utils.tracing import TracingMiddleware, configure_tracing, shutdown_tracing
+from app.utils.responses import ModelJSONResponse
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start up, warm the worker, then mark it ready; on shutdown stop taking traffic and close the pool.
+
+    Warmup opens `db_warmup_connections` pool connections, runs the hot user queries on each
+    and builds the OpenAPI schema, so the first real requests do not pay for them. The background
+    job scheduler starts with the worker and stops before the pool is closed.
+    """
+    setup_logging()
+    settings = get_settings()
+    Database.initialize(
+        settings.database_url, settings.debug,
+        statement_cache_size=settings.db_statement_cache_size, pgbouncer=settings.db_pgbouncer_mode,
+    )
+    if is_sqlite(settings.database_url):
+        # SQLite is for local runs and has no migrations: create the tables from the models
+        await Database.create_all()
+    build_link_templates(app)
+    if settings.tracing_enabled:
+        configure_tracing()
+    try:
+        warmed = await Database.warm_up(settings.db_warmup_connections, UserService.warm_up)
+        logger.info("Warmed %d database connections", warmed)
+    except (SQLAlchemyError, OSError, asyncio.TimeoutError):
+        # The database is unreachable: still serve, /readyz keeps reporting its state. Anything
+        # else is a bug and fails startup instead of silently leaving the pool cold.
+        logger.exception("Database warmup failed")
+    app.openapi()
+    scheduler = None
+    if settings.scheduler_enabled:
+        scheduler = build_scheduler(settings)
+        scheduler.start()
+    app.state.ready = True
+    yield
+    app.state.ready = False
+    if scheduler is not None:
+        await scheduler.stop()
+    await Database.dispose()
+    shutdown_tracing()
+    shutdown_logging()
+
+
 app = FastAPI(
     title="User Management",
     description=getDescription(),
@@ -16,6 +77,8 @@ app = FastAPI(
         "email": "support@example.com",
     },
     license_info={"name": "MIT", "url": "https://opensource.org/licenses/MIT"},
+    default_response_class=ModelJSONResponse,
+    lifespan=lifespan,
 )
 # CORS middleware configuration
 # This middleware will enable CORS and allow requests from any origin
@@ -27,16 +90,20 @@ app.add_middleware(
     allow_methods=["*"],  # Allowed HTTP methods
     allow_headers=["*"],  # Allowed HTTP headers
 )
-
-@app.on_event("startup")
-async def startup_event():
-    settings = get_settings()
-    Database.initialize(settings.database_url, settings.debug)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(ProfilerMiddleware)
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(TracingMiddleware)
+# Added last so it is the outermost middleware and times the whole request
+app.add_middleware(MetricsMiddleware)
 
 @app.exception_handler(Exception)
 async def exception_handler(request, exc):
     return JSONResponse(status_code=500, content={"message": "An unexpected error occurred."})
 
 app.include_router(user_routes.router)
+app.include_router(metrics_routes.router)
+app.include_router(admin_routes.router)
+app.include_router(health_routes.router)
 
 
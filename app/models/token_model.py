@@ -0,0 +1,50 @@
+from builtins import str
+from datetime import datetime
+from enum import Enum
+import uuid
+from sqlalchemy import Column, ForeignKey, Index, String, Uuid, Enum as SQLAlchemyEnum
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+from app.models.types import UTCDateTime, utcnow
+
+class TokenPurpose(Enum):
+    """What a single-use token authorizes; a token issued for one purpose never satisfies another."""
+    EMAIL_VERIFICATION = "EMAIL_VERIFICATION"
+    PASSWORD_RESET = "PASSWORD_RESET"
+
+class UserToken(Base):
+    """
+    Single-use, expiring token mailed to a user, corresponding to the 'user_tokens' table.
+
+    Only the SHA-256 hex digest of the token is stored, so a leaked table cannot be replayed.
+    Tokens are high-entropy random strings, so a fast unsalted hash is enough and lets the
+    digest be looked up through a unique index.
+
+    Attributes:
+        id (UUID): Unique identifier for the token row.
+        user_id (UUID): The user the token was issued to.
+        purpose (TokenPurpose): What the token may be used for.
+        token_hash (str): SHA-256 hex digest of the token sent to the user.
+        expires_at (datetime): The token is rejected from this moment on.
+        used_at (datetime): When the token was redeemed; redeemed tokens are rejected.
+        created_at (datetime): Timestamp when the token was issued, set by the server.
+    """
+    __tablename__ = "user_tokens"
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = Column(Uuid(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    purpose: Mapped[TokenPurpose] = Column(SQLAlchemyEnum(TokenPurpose, name='TokenPurpose', create_constraint=True), nullable=False)
+    token_hash: Mapped[str] = Column(String(64), nullable=False)
+    expires_at: Mapped[datetime] = Column(UTCDateTime, nullable=False)
+    used_at: Mapped[datetime] = Column(UTCDateTime, nullable=True)
+    created_at: Mapped[datetime] = Column(UTCDateTime, server_default=utcnow(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_user_tokens_token_hash", token_hash, unique=True),
+        Index("ix_user_tokens_user_id", user_id),
+        # Lets the background purge find expired tokens without scanning the table
+        Index("ix_user_tokens_expires_at", expires_at),
+    )
+
+    def __repr__(self) -> str:
+        return f"<UserToken {self.purpose.name} for {self.user_id}>"
@@ -0,0 +1,81 @@
+"""
+Column types and SQL functions that work on both PostgreSQL and SQLite.
+
+PostgreSQL is the production database; `sqlite+aiosqlite` is supported for local runs,
+profiling and benchmarks without a database server. Schema objects that only exist on
+PostgreSQL (the full-text search column and its GIN index) are marked with
+`POSTGRESQL_ONLY` / `ddl_if(dialect="postgresql")` and left out of SQLite schemas.
+"""
+from builtins import dict
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import DateTime
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import TypeDecorator
+
+# Column.info marker for columns created on PostgreSQL only
+POSTGRESQL_ONLY = dict(postgresql_only=True)
+
+# SQLite has no timestamp type; SQLAlchemy stores DATETIME as text in this layout, so SQL-side
+# timestamps must match it exactly for comparisons such as `updated_at = :expected` to work.
+# '%f' yields seconds with milliseconds ("SS.SSS"); the literal zeros pad it to microseconds.
+_SQLITE_NOW = "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+class UTCDateTime(TypeDecorator):
+    """
+    Timezone-aware UTC timestamp.
+
+    Maps to `timestamptz` on PostgreSQL. SQLite has no time zones, so values are stored as
+    naive UTC and returned with `tzinfo=timezone.utc`, matching what asyncpg returns.
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[datetime], dialect) -> Optional[datetime]:
+        if value is not None and dialect.name == "sqlite" and value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    def process_result_value(self, value: Optional[datetime], dialect) -> Optional[datetime]:
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
+
+class utcnow(FunctionElement):
+    """Transaction timestamp: `now()` on PostgreSQL, the statement time on SQLite."""
+    type = UTCDateTime()
+    inherit_cache = True
+
+
+class clock_utcnow(FunctionElement):
+    """Wall-clock timestamp that advances within a transaction: `clock_timestamp()` on PostgreSQL."""
+    type = UTCDateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _compile_utcnow(element, compiler, **kw):
+    return "now()"
+
+
+@compiles(clock_utcnow)
+def _compile_clock_utcnow(element, compiler, **kw):
+    return "clock_timestamp()"
+
+
+@compiles(utcnow, "sqlite")
+@compiles(clock_utcnow, "sqlite")
+def _compile_sqlite_now(element, compiler, **kw):
+    return _SQLITE_NOW
+
+
+@compiles(CreateColumn, "sqlite")
+def _skip_postgresql_only_columns(element, compiler, **kw):
+    if element.element.info.get("postgresql_only"):
+        return None
+    return compiler.visit_create_column(element, **kw)
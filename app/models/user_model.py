@@ -3,11 +3,12 @@ from datetime import datetime
 from enum import Enum
 import uuid
 from sqlalchemy import (
-    Column, String, Integer, DateTime, Boolean, func, Enum as SQLAlchemyEnum
+    Column, String, Integer, Boolean, Computed, Index, Uuid, false, func, text, Enum as SQLAlchemyEnum
 )
-from sqlalchemy.dialects.postgresql import UUID, ENUM
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database import Base
+from app.models.types import POSTGRESQL_ONLY, UTCDateTime, clock_utcnow, utcnow
 
 class UserRole(Enum):
     """Enumeration of user roles within the application, stored as ENUM in the database."""
@@ -16,6 +17,16 @@ class UserRole(Enum):
     MANAGER = "MANAGER"
     ADMIN = "ADMIN"
 
+# Text search configuration shared by the generated search vector and the queries against it
+SEARCH_CONFIG = "english"
+
+# Names rank above the bio (weights A and B) in full-text search results
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(first_name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(last_name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(bio, '')), 'B')"
+)
+
 class User(Base):
     """
     Represents a user within the application, corresponding to the 'users' table in the database.
@@ -26,6 +37,7 @@ class User(Base):
         nickname (str): Unique nickname for privacy, required.
         email (str): Unique email address, required.
         email_verified (bool): Flag indicating if the email has been verified.
+        self_registered (bool): True if the user signed up through registration, False if created by an admin.
         hashed_password (str): Hashed password for security, required.
         first_name (str): Optional first name of the user.
         last_name (str): Optional first name of the user.
@@ -40,8 +52,10 @@ class User(Base):
         last_login_at (datetime): Timestamp of the last login.
         failed_login_attempts (int): Count of failed login attempts.
         is_locked (bool): Flag indicating if the account is locked.
+        locked_at (datetime): When the account was locked; locked accounts unlock after a cooldown.
         created_at (datetime): Timestamp when the user was created, set by the server.
         updated_at (datetime): Timestamp of the last update, set by the server.
+        search_vector (tsvector): Generated full-text vector over names and bio; table column only, not loaded into instances (PostgreSQL only).
 
     Methods:
         lock_account(): Locks the user account.
@@ -51,9 +65,10 @@ class User(Base):
         update_professional_status(status): Updates the professional status and logs the update time.
     """
     __tablename__ = "users"
-    __mapper_args__ = {"eager_defaults": True}
+    # search_vector is only used inside SQL; leaving it unmapped keeps it out of INSERT ... RETURNING
+    __mapper_args__ = {"eager_defaults": True, "exclude_properties": ["search_vector"]}
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     nickname: Mapped[str] = Column(String(50), unique=True, nullable=False, index=True)
     email: Mapped[str] = Column(String(255), unique=True, nullable=False, index=True)
     first_name: Mapped[str] = Column(String(100), nullable=True)
@@ -64,16 +79,33 @@ class User(Base):
     github_profile_url: Mapped[str] = Column(String(255), nullable=True)
     role: Mapped[UserRole] = Column(SQLAlchemyEnum(UserRole, name='UserRole', create_constraint=True), nullable=False)
     is_professional: Mapped[bool] = Column(Boolean, default=False)
-    professional_status_updated_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
-    last_login_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
+    professional_status_updated_at: Mapped[datetime] = Column(UTCDateTime, nullable=True)
+    last_login_at: Mapped[datetime] = Column(UTCDateTime, nullable=True)
     failed_login_attempts: Mapped[int] = Column(Integer, default=0)
     is_locked: Mapped[bool] = Column(Boolean, default=False)
-    created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-    verification_token = Column(String, nullable=True)
+    locked_at: Mapped[datetime] = Column(UTCDateTime, nullable=True)
+    created_at: Mapped[datetime] = Column(UTCDateTime, server_default=utcnow())
+    # clock_timestamp(), not now(): updated_at versions the row (ETags, If-Match), so it must
+    # advance on every update, even several within one transaction
+    updated_at: Mapped[datetime] = Column(UTCDateTime, server_default=utcnow(), onupdate=clock_utcnow())
     email_verified: Mapped[bool] = Column(Boolean, default=False, nullable=False)
+    self_registered: Mapped[bool] = Column(Boolean, default=False, server_default=false(), nullable=False)
     hashed_password: Mapped[str] = Column(String(255), nullable=False)
+    search_vector = Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True), info=POSTGRESQL_ONLY)
 
+    # Indexes backing the admin list filters. Trigram (pg_trgm) GIN indexes for substring
+    # search on email and nickname need the extension and are created by migration only.
+    __table_args__ = (
+        Index("ix_users_email_lower_pattern", func.lower(email).label("email_lower"), postgresql_ops={"email_lower": "text_pattern_ops"}),
+        Index("ix_users_nickname_lower_pattern", func.lower(nickname).label("nickname_lower"), postgresql_ops={"nickname_lower": "text_pattern_ops"}),
+        Index("ix_users_role", role),
+        Index("ix_users_created_at_id", created_at, "id"),
+        Index("ix_users_last_login_at", last_login_at),
+        Index("ix_users_locked_created_at", created_at, postgresql_where=text("is_locked")),
+        Index("ix_users_unverified_created_at", created_at, postgresql_where=text("NOT email_verified")),
+        Index("ix_users_professional_created_at", created_at, postgresql_where=text("is_professional")),
+        Index("ix_users_search_vector", search_vector, postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
 
     def __repr__(self) -> str:
         """Provides a readable representation of a user object."""
@@ -81,9 +113,11 @@ class User(Base):
 
     def lock_account(self):
         self.is_locked = True
+        self.locked_at = utcnow()
 
     def unlock_account(self):
         self.is_locked = False
+        self.locked_at = None
 
     def verify_email(self):
         self.email_verified = True
@@ -94,4 +128,4 @@ class User(Base):
     def update_professional_status(self, status: bool):
         """Updates the professional status and logs the update time."""
         self.is_professional = status
-        self.professional_status_updated_at = func.now()
+        self.professional_status_updated_at = utcnow()
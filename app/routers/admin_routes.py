@@ -0,0 +1,108 @@
+"""
+Admin-only diagnostics for live workers.
+
+Each endpoint acts on the worker process that happens to serve the request; behind gunicorn,
+repeat the call (or target the worker directly) to inspect a particular process.
+"""
+from builtins import KeyError, RuntimeError, dict, float, int, str
+import asyncio
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.security import OAuth2PasswordBearer
+from app.dependencies import require_role
+from app.utils import memory
+from app.utils.profiler import StackSampler, profile_filename
+from settings.config import settings
+
+router = APIRouter(prefix="/admin/diagnostics", tags=["Diagnostics Requires (Admin Role)"])
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+
+_profile_lock = asyncio.Lock()
+
+
+@router.post("/profile", name="profile_worker")
+async def profile_worker(
+    seconds: float = Query(10.0, gt=0, le=120, description="How long to sample the worker"),
+    interval_ms: float = Query(None, gt=0, le=1000, description="Sampling interval; defaults to profile_interval_ms"),
+    token: str = Depends(oauth2_scheme),
+    current_user: dict = Depends(require_role(["ADMIN"])),
+):
+    """
+    Sample this worker's event loop for `seconds` and return collapsed stacks.
+
+    The output loads directly into speedscope or `flamegraph.pl`; a copy is kept in `profile_dir`.
+    Only one profile runs per worker at a time.
+    """
+    if _profile_lock.locked():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running on this worker")
+    async with _profile_lock:
+        sampler = StackSampler(interval=(interval_ms or settings.profile_interval_ms) / 1000).start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+    name = profile_filename("worker")
+    sampler.write(settings.profile_dir, name)
+    return Response(
+        content=sampler.collapsed(),
+        media_type="text/plain",
+        headers={"Content-Disposition": f'attachment; filename="{name}"', "X-Profile-Samples": str(sampler.sample_count)},
+    )
+
+
+@router.post("/memory/start", name="start_memory_tracing")
+async def start_memory_tracing(
+    frames: int = Query(1, ge=1, le=50, description="Traceback depth stored per allocation"),
+    token: str = Depends(oauth2_scheme),
+    current_user: dict = Depends(require_role(["ADMIN"])),
+):
+    """Start tracemalloc on this worker, discarding any earlier trace."""
+    memory.start_tracing(frames)
+    return {"tracing": True, "frames": frames}
+
+
+@router.post("/memory/stop", name="stop_memory_tracing")
+async def stop_memory_tracing(token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN"]))):
+    """Stop tracemalloc and drop stored snapshots."""
+    memory.stop_tracing()
+    return {"tracing": False}
+
+
+@router.post("/memory/snapshots", name="take_memory_snapshot")
+async def take_memory_snapshot(
+    limit: int = Query(20, ge=1, le=200, description="Number of top allocation sites to return"),
+    key: Literal["lineno", "filename", "traceback"] = Query("lineno", description="Group allocations by line, file or full traceback"),
+    token: str = Depends(oauth2_scheme),
+    current_user: dict = Depends(require_role(["ADMIN"])),
+):
+    """Take and store a snapshot, returning its id and the largest allocation sites."""
+    try:
+        snapshot_id, snapshot = memory.take_snapshot()
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return {
+        "snapshot_id": snapshot_id,
+        "traced_memory": memory.traced_memory(),
+        "top": memory.top_allocators(snapshot, limit, key),
+    }
+
+
+@router.get("/memory/diff", name="diff_memory_snapshots")
+async def diff_memory_snapshots(
+    base: int = Query(..., description="Earlier snapshot id"),
+    target: Optional[int] = Query(None, description="Later snapshot id; defaults to the most recent"),
+    limit: int = Query(20, ge=1, le=200, description="Number of allocation sites to return"),
+    key: Literal["lineno", "filename", "traceback"] = Query("lineno", description="Group allocations by line, file or full traceback"),
+    token: str = Depends(oauth2_scheme),
+    current_user: dict = Depends(require_role(["ADMIN"])),
+):
+    """Compare two stored snapshots, largest growth first."""
+    stored = memory.snapshot_ids()
+    if target is None and stored:
+        target = stored[-1]
+    try:
+        base_snapshot = memory.get_snapshot(base)
+        target_snapshot = memory.get_snapshot(target)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.args[0])
+    return {"base": base, "target": target, "top": memory.diff_allocators(base_snapshot, target_snapshot, limit, key)}
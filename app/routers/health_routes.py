@@ -0,0 +1,35 @@
+"""
+Liveness and readiness probes.
+
+`/healthz` only says the process is serving requests. `/readyz` additionally requires the
+startup warmup to have finished and the database to answer, so load balancers and
+orchestrators send traffic only to warm workers.
+"""
+from builtins import Exception, getattr
+import asyncio
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependencies import get_db
+from app.utils.responses import ModelJSONResponse
+
+router = APIRouter(tags=["Health"])
+
+# Seconds the readiness database ping may take before the worker reports itself unready
+READY_DB_TIMEOUT = 2.0
+
+
+@router.get("/healthz", name="healthz", include_in_schema=False)
+async def healthz():
+    return {"status": "ok"}
+
+
+@router.get("/readyz", name="readyz", include_in_schema=False)
+async def readyz(request: Request, db: AsyncSession = Depends(get_db)):
+    if not getattr(request.app.state, "ready", False):
+        return ModelJSONResponse({"status": "starting"}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    try:
+        await asyncio.wait_for(db.execute(text("SELECT 1")), READY_DB_TIMEOUT)
+    except Exception:
+        return ModelJSONResponse({"status": "database unavailable"}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return {"status": "ready"}
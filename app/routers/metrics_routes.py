@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Response
+from app.utils.metrics import render_metrics
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus scrape endpoint.
+
+    Unauthenticated, like most exporters; restrict it to the monitoring network at the proxy.
+    """
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
@@ -18,26 +18,67 @@ Key Highlights:
 - Utilizes OAuth2PasswordBearer for securing API endpoints, requiring valid access tokens for operations.
 """
 
-from builtins import dict, int, len, str
+from builtins import KeyError, TypeError, ValueError, dict, float, int, len, str
 from datetime import timedelta
+from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Response, status, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Response, status, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.dependencies import get_current_user, get_db, get_email_service, require_role
+from app.dependencies import get_current_user, get_db, get_email_service, get_session_factory, get_user_fields, require_role
 from app.schemas.pagination_schema import EnhancedPagination
 from app.schemas.token_schema import TokenResponse
-from app.schemas.user_schemas import LoginRequest, UserBase, UserCreate, UserListResponse, UserResponse, UserUpdate
+from app.schemas.user_schemas import LoginRequest, PasswordResetConfirm, PasswordResetRequest, UserBase, UserCreate, UserFilterParams, UserListResponse, UserResponse, UserSearchResponse, UserUpdate
 from app.services.user_service import UserService
 from app.services.jwt_service import create_access_token
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.etag import collection_etag, etag_matches, parse_user_etag, representation_tag, split_etags, user_etag
 from app.utils.link_generation import create_user_links, generate_pagination_links
+from app.utils.response_cache import response_cache
+from app.utils.responses import ModelJSONResponse
 from app.dependencies import get_settings
 from app.services.email_service import EmailService
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 settings = get_settings()
+# Declared before /users/{user_id} so "search" is not parsed as a user id.
+@router.get("/users/search", response_model=UserSearchResponse, name="search_users", tags=["User Management Requires (Admin or Manager Roles)"])
+async def search_users(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description="Keywords matched against first name, last name and bio."),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page."),
+    include_links: bool = True,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))
+):
+    """
+    Full-text search over user profiles, ranked by relevance with highlighted snippets.
+
+    Supports web-search syntax (`"exact phrase"`, `or`, `-excluded`). Results are keyset-paginated:
+    follow `next_cursor` until it is null.
+    """
+    after = None
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            after = (float(position["rank"]), UUID(position["id"]))
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    results = await UserService.search(db, q, limit, after)
+    if include_links:
+        for result in results:
+            result["links"] = create_user_links(result["id"], request)
+
+    next_cursor = None
+    if len(results) == limit:
+        last = results[-1]
+        next_cursor = encode_cursor({"rank": last["rank"], "id": str(last["id"])})
+    return ModelJSONResponse({"items": results, "size": len(results), "next_cursor": next_cursor})
+
 @router.get("/users/{user_id}", response_model=UserResponse, name="get_user", tags=["User Management Requires (Admin or Manager Roles)"])
-async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def get_user(user_id: UUID, request: Request, include_links: bool = True, fields: List[str] = Depends(get_user_fields), if_none_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     """
     Endpoint to fetch a user by their unique identifier (UUID).
 
@@ -47,29 +88,39 @@ async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(g
     Args:
         user_id: UUID of the user to fetch.
         request: The request object, used to generate full URLs in the response.
+        include_links: Set to false to skip generating HATEOAS links.
+        fields: Sparse fieldset; only these columns (plus id) are selected and returned.
+        if_none_match: ETag from a previous response; answered with 304 if the user is unchanged.
         db: Dependency that provides an AsyncSession for database access.
         token: The OAuth2 access token obtained through OAuth2PasswordBearer dependency.
     """
-    user = await UserService.get_by_id(db, user_id)
+    cache_key = response_cache.key("get_user", request, current_user["role"])
+    cached = response_cache.lookup(cache_key, if_none_match)
+    if cached is not None:
+        return cached
+
+    variant = representation_tag(tuple(fields), include_links)
+    if if_none_match:
+        # Revalidation only reads updated_at, skipping row hydration and serialization.
+        updated_at = await UserService.get_version(db, user_id)
+        if updated_at is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        etag = user_etag(user_id, updated_at, variant)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    user = await UserService.get_fields_by_id(db, user_id, fields + ["updated_at"])
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    etag = user_etag(user_id, user.pop("updated_at"), variant)
 
-    return UserResponse.model_construct(
-        id=user.id,
-        nickname=user.nickname,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        bio=user.bio,
-        profile_picture_url=user.profile_picture_url,
-        github_profile_url=user.github_profile_url,
-        linkedin_profile_url=user.linkedin_profile_url,
-        role=user.role,
-        email=user.email,
-        last_login_at=user.last_login_at,
-        created_at=user.created_at,
-        updated_at=user.updated_at,
-        links=create_user_links(user.id, request)  
-    )
+    if include_links:
+        user["links"] = create_user_links(user["id"], request)
+    # Returning the response directly skips FastAPI's response_model re-validation and
+    # jsonable_encoder pass; the row is serialized to JSON bytes exactly once.
+    response = ModelJSONResponse(user, headers={"ETag": etag})
+    response_cache.store(cache_key, response)
+    return response
 
 # Additional endpoints for update, delete, create, and list users follow a similar pattern, using
 # asynchronous database operations, handling security with OAuth2PasswordBearer, and enhancing response
@@ -79,19 +130,33 @@ async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(g
 # experience by adhering to REST principles and providing self-discoverable operations.
 
 @router.put("/users/{user_id}", response_model=UserResponse, name="update_user", tags=["User Management Requires (Admin or Manager Roles)"])
-async def update_user(user_id: UUID, user_update: UserUpdate, request: Request, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def update_user(user_id: UUID, user_update: UserUpdate, request: Request, include_links: bool = True, if_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     """
     Update user information.
 
     - **user_id**: UUID of the user to update.
     - **user_update**: UserUpdate model with updated user information.
+    - **include_links**: Set to false to skip generating HATEOAS links.
+    - **If-Match**: ETag from a previous response; the update fails with 412 if the user changed since.
     """
+    expected_updated_at = None
+    if if_match:
+        current_updated_at = await UserService.get_version(db, user_id)
+        if current_updated_at is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        if if_match.strip() != "*":
+            if current_updated_at not in [parse_user_etag(tag, user_id) for tag in split_etags(if_match)]:
+                raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="User was modified by another request")
+            expected_updated_at = current_updated_at
+
     user_data = user_update.model_dump(exclude_unset=True)
-    updated_user = await UserService.update(db, user_id, user_data)
+    updated_user = await UserService.update(db, user_id, user_data, expected_updated_at)
     if not updated_user:
+        if expected_updated_at is not None:
+            raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="User was modified by another request")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    return UserResponse.model_construct(
+    return ModelJSONResponse(UserResponse.model_construct(
         id=updated_user.id,
         bio=updated_user.bio,
         first_name=updated_user.first_name,
@@ -105,8 +170,8 @@ async def update_user(user_id: UUID, user_update: UserUpdate, request: Request,
         linkedin_profile_url=updated_user.linkedin_profile_url,
         created_at=updated_user.created_at,
         updated_at=updated_user.updated_at,
-        links=create_user_links(updated_user.id, request)
-    )
+        links=create_user_links(updated_user.id, request) if include_links else []
+    ), headers={"ETag": user_etag(updated_user.id, updated_user.updated_at, representation_tag("update", include_links))})
 
 
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT, name="delete_user", tags=["User Management Requires (Admin or Manager Roles)"])
@@ -124,7 +189,7 @@ async def delete_user(user_id: UUID, db: AsyncSession = Depends(get_db), token:
 
 
 @router.post("/users/", response_model=UserResponse, status_code=status.HTTP_201_CREATED, tags=["User Management Requires (Admin or Manager Roles)"], name="create_user")
-async def create_user(user: UserCreate, request: Request, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def create_user(user: UserCreate, request: Request, include_links: bool = True, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     """
     Create a new user.
 
@@ -135,6 +200,7 @@ async def create_user(user: UserCreate, request: Request, db: AsyncSession = Dep
     Parameters:
     - user (UserCreate): The user information to create.
     - request (Request): The request object.
+    - include_links (bool): Set to false to skip generating HATEOAS links.
     - db (AsyncSession): The database session.
 
     Returns:
@@ -149,7 +215,7 @@ async def create_user(user: UserCreate, request: Request, db: AsyncSession = Dep
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create user")
     
     
-    return UserResponse.model_construct(
+    return ModelJSONResponse(UserResponse.model_construct(
         id=created_user.id,
         bio=created_user.bio,
         first_name=created_user.first_name,
@@ -161,8 +227,8 @@ async def create_user(user: UserCreate, request: Request, db: AsyncSession = Dep
         last_login_at=created_user.last_login_at,
         created_at=created_user.created_at,
         updated_at=created_user.updated_at,
-        links=create_user_links(created_user.id, request)
-    )
+        links=create_user_links(created_user.id, request) if include_links else []
+    ), status_code=status.HTTP_201_CREATED)
 
 
 @router.get("/users/", response_model=UserListResponse, tags=["User Management Requires (Admin or Manager Roles)"])
@@ -170,26 +236,54 @@ async def list_users(
     request: Request,
     skip: int = 0,
     limit: int = 10,
+    include_links: bool = True,
+    fields: List[str] = Depends(get_user_fields),
+    filters: UserFilterParams = Depends(),
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))
 ):
-    total_users = await UserService.count(db)
-    users = await UserService.list_users(db, skip, limit)
+    """
+    List users, optionally searched and filtered.
+
+    Email and nickname accept a case-insensitive substring (`email`, `nickname`) or prefix
+    (`email_prefix`, `nickname_prefix`); role, lock, verification and professional flags and
+    created/last-login ranges narrow the list further. Every filter is backed by an index.
+
+    Responses carry an ETag versioned by the matching count and newest update, and specific to
+    the page, fields, filters and links requested; sending it back in `If-None-Match` returns
+    304 without loading or serializing the page. Rendered pages are cached in memory until the
+    next write or the route's TTL.
+    """
+    cache_key = response_cache.key("list_users", request, current_user["role"])
+    cached = response_cache.lookup(cache_key, if_none_match)
+    if cached is not None:
+        return cached
+
+    total_users, last_updated = await UserService.count_and_version(db, filters)
+    etag = collection_etag(total_users, last_updated, representation_tag(
+        tuple(fields), include_links, skip, limit, tuple(filters.model_dump(exclude_none=True).items())
+    ))
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    users = await UserService.list_user_fields(db, fields, skip, limit, filters)
+
+    pagination_links = []
+    if include_links:
+        for user in users:
+            user["links"] = create_user_links(user["id"], request)
+        pagination_links = generate_pagination_links(request, skip, limit, total_users)
 
-    user_responses = [
-        UserResponse.model_validate(user) for user in users
-    ]
-    
-    pagination_links = generate_pagination_links(request, skip, limit, total_users)
-    
     # Construct the final response with pagination details
-    return UserListResponse(
-        items=user_responses,
-        total=total_users,
-        page=skip // limit + 1,
-        size=len(user_responses),
-        links=pagination_links  # Ensure you have appropriate logic to create these links
-    )
+    response = ModelJSONResponse({
+        "items": users,
+        "total": total_users,
+        "page": skip // limit + 1,
+        "size": len(users),
+        "links": pagination_links
+    }, headers={"ETag": etag})
+    response_cache.store(cache_key, response)
+    return response
 
 
 @router.post("/register/", response_model=UserResponse, tags=["Login and Registration"])
@@ -244,4 +338,50 @@ async def verify_email(user_id: UUID, token: str, db: AsyncSession = Depends(get
     """
     if await UserService.verify_email_with_token(db, user_id, token):
         return {"message": "Email verified successfully"}
-    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired verification token")
\ No newline at end of file
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired verification token")
+
+
+@router.post("/password-reset/request", status_code=status.HTTP_202_ACCEPTED, name="request_password_reset", tags=["Login and Registration"])
+async def request_password_reset(body: PasswordResetRequest, background_tasks: BackgroundTasks, session_factory=Depends(get_session_factory), email_service: EmailService = Depends(get_email_service)):
+    """
+    Email a single-use password-reset link.
+
+    The link is issued and sent in the background, so the response is the same, and takes the
+    same time, whether or not the address belongs to an account; the endpoint cannot be used to
+    find registered emails.
+    """
+    background_tasks.add_task(UserService.request_password_reset_in_background, session_factory, body.email, email_service)
+    return {"message": "If the email belongs to an account, a reset link has been sent"}
+
+
+@router.get("/reset-password/{user_id}/{token}", status_code=status.HTTP_200_OK, name="password_reset_link", tags=["Login and Registration"])
+async def password_reset_link(user_id: UUID, token: str, request: Request):
+    """
+    Landing endpoint for the emailed reset link.
+
+    Checks the link's signature and expiry (not whether it was already used) and returns what
+    to post to the confirm endpoint along with the new password. Deployments with a frontend
+    reset page point links there instead through `password_reset_base_url`.
+    """
+    if not UserService.check_password_reset_token(user_id, token):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired reset token")
+    return {
+        "message": "Post a new password with this user id and token to confirm_url",
+        "user_id": user_id,
+        "token": token,
+        "confirm_url": str(request.url_for("confirm_password_reset")),
+    }
+
+
+@router.post("/password-reset/confirm", status_code=status.HTTP_200_OK, name="confirm_password_reset", tags=["Login and Registration"])
+async def confirm_password_reset(body: PasswordResetConfirm, db: AsyncSession = Depends(get_db)):
+    """
+    Set a new password using the user id and token from a reset link.
+
+    - **user_id**: UUID of the user from the link.
+    - **token**: Reset token from the link; it works once and expires.
+    - **new_password**: The new password.
+    """
+    if await UserService.reset_password_with_token(db, body.user_id, body.token, body.new_password):
+        return {"message": "Password reset successfully"}
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired reset token")
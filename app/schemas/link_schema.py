@@ -1,8 +1,10 @@
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field
 
 class Link(BaseModel):
     rel: str = Field(..., description="Relation type of the link.")
-    href: HttpUrl = Field(..., description="The URL of the link.")
+    # Links are generated server-side from resolved route templates, so the URL is
+    # documented as a URI but not re-parsed on every construction.
+    href: str = Field(..., description="The URL of the link.", json_schema_extra={"format": "uri"})
     action: str = Field(..., description="HTTP method for the action this link represents.")
     type: str = Field(default="application/json", description="Content type of the response for this link.")
 
@@ -25,7 +25,7 @@ class Pagination(BaseModel):
 
 class PaginationLink(BaseModel):
     rel: str
-    href: HttpUrl
+    href: str = Field(..., json_schema_extra={"format": "uri"})
     method: str = "GET"
 
 class EnhancedPagination(Pagination):
@@ -6,6 +6,8 @@ from enum import Enum
 import uuid
 import re
 from app.models.user_model import UserRole
+from app.schemas.link_schema import Link
+from app.schemas.pagination_schema import PaginationLink
 from app.utils.nickname_gen import generate_nickname
 
 
@@ -60,11 +62,55 @@ class UserResponse(UserBase):
     nickname: Optional[str] = Field(None, min_length=3, pattern=r'^[\w-]+$', example=generate_nickname())    
     is_professional: Optional[bool] = Field(default=False, example=True)
     role: UserRole
+    links: List[Link] = []
+
+# Fields a client can select with the ?fields= parameter; "id" is always returned because
+# links and follow-up requests are keyed on it.
+USER_RESPONSE_FIELDS = [name for name in UserResponse.model_fields if name != "links"]
+REQUIRED_USER_FIELDS = ["id"]
+
+class UserFilterParams(BaseModel):
+    """Query parameters for searching and filtering the admin user list; all are optional and combined with AND."""
+    email: Optional[str] = Field(None, description="Case-insensitive substring of the email address.", example="example.com")
+    email_prefix: Optional[str] = Field(None, description="Case-insensitive prefix of the email address.", example="john")
+    nickname: Optional[str] = Field(None, description="Case-insensitive substring of the nickname.", example="panda")
+    nickname_prefix: Optional[str] = Field(None, description="Case-insensitive prefix of the nickname.", example="clever")
+    role: Optional[UserRole] = Field(None, example="AUTHENTICATED")
+    is_locked: Optional[bool] = Field(None, example=True)
+    email_verified: Optional[bool] = Field(None, example=False)
+    is_professional: Optional[bool] = Field(None, example=True)
+    created_from: Optional[datetime] = Field(None, description="Only users created at or after this time.")
+    created_to: Optional[datetime] = Field(None, description="Only users created before this time.")
+    last_login_from: Optional[datetime] = Field(None, description="Only users who last logged in at or after this time.")
+    last_login_to: Optional[datetime] = Field(None, description="Only users who last logged in before this time.")
+
+class UserSearchResult(BaseModel):
+    id: uuid.UUID = Field(..., example=uuid.uuid4())
+    nickname: Optional[str] = Field(None, example=generate_nickname())
+    first_name: Optional[str] = Field(None, example="John")
+    last_name: Optional[str] = Field(None, example="Doe")
+    rank: float = Field(..., description="Relevance of the match; higher is better.", example=0.6)
+    snippet: Optional[str] = Field(None, description="HTML-escaped matching text with search terms wrapped in <mark> tags; safe to render as HTML.",
+                                   example="<mark>John</mark> Doe Experienced <mark>developer</mark>")
+    links: List[Link] = []
+
+class UserSearchResponse(BaseModel):
+    items: List[UserSearchResult]
+    size: int = Field(..., example=10)
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page; null on the last page.")
 
 class LoginRequest(BaseModel):
     email: str = Field(..., example="john.doe@example.com")
     password: str = Field(..., example="Secure*1234")
 
+class PasswordResetRequest(BaseModel):
+    email: EmailStr = Field(..., example="john.doe@example.com")
+
+class PasswordResetConfirm(BaseModel):
+    user_id: uuid.UUID = Field(..., example=uuid.uuid4())
+    token: str = Field(..., max_length=200, description="Token from the emailed reset link.")
+    new_password: str = Field(..., min_length=8, example="NewSecure*1234")
+
 class ErrorResponse(BaseModel):
     error: str = Field(..., example="Not Found")
     details: Optional[str] = Field(None, example="The requested resource was not found.")
@@ -81,3 +127,4 @@ class UserListResponse(BaseModel):
     total: int = Field(..., example=100)
     page: int = Field(..., example=1)
     size: int = Field(..., example=10)
+    links: List[PaginationLink] = []
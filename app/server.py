@@ -0,0 +1,122 @@
+"""
+Process runner for the API.
+
+    python -m app.server
+
+`server_mode=development` runs a single uvicorn process with auto-reload. `production` runs
+gunicorn as the process manager with uvicorn workers: one worker per available CPU by
+default, keep-alive, worker recycling after `server_max_requests` (+ jitter so workers do
+not restart together) and graceful shutdown. uvloop and httptools are used when installed
+(`server_loop` / `server_http` = "auto").
+
+Prometheus metrics need a shared directory across production workers; if
+`PROMETHEUS_MULTIPROC_DIR` is not set, `prometheus_multiproc_dir` is used. It is prepared here,
+before any worker imports prometheus_client, and dead workers' gauges are dropped from the
+`child_exit` hook. Development mode runs one process and never uses a multiprocess directory.
+"""
+from builtins import dict, int, len, max, round
+import os
+import shutil
+from typing import Any, Dict
+
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+
+from settings.config import settings
+
+APP_PATH = "app.main:app"
+
+
+class AppUvicornWorker(UvicornWorker):
+    """Uvicorn worker honouring the event loop and HTTP parser settings."""
+
+    CONFIG_KWARGS = {"loop": settings.server_loop, "http": settings.server_http}
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (respects affinity masks and container cpusets)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def worker_count() -> int:
+    if settings.server_workers > 0:
+        return settings.server_workers
+    return max(1, round(available_cpus() * settings.server_workers_per_core))
+
+
+def child_exit(server, worker):
+    from app.utils.metrics import mark_worker_dead
+
+    mark_worker_dead(worker.pid)
+
+
+def gunicorn_options() -> Dict[str, Any]:
+    return {
+        "bind": f"{settings.server_host}:{settings.server_port}",
+        "workers": worker_count(),
+        "worker_class": f"{__name__}.AppUvicornWorker",
+        "keepalive": settings.server_keepalive,
+        "timeout": settings.server_timeout,
+        "graceful_timeout": settings.server_graceful_timeout,
+        "max_requests": settings.server_max_requests,
+        "max_requests_jitter": settings.server_max_requests_jitter,
+        "forwarded_allow_ips": settings.server_forwarded_allow_ips,
+        "accesslog": "-" if settings.server_access_log else None,
+        "child_exit": child_exit,
+    }
+
+
+class GunicornApplication(BaseApplication):
+    def __init__(self, app_path: str, options: Dict[str, Any]):
+        self.app_path = app_path
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+
+        return app
+
+
+def prepare_multiprocess_metrics():
+    """Give workers a fresh, shared prometheus_client directory."""
+    directory = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", settings.prometheus_multiproc_dir)
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def run_production():
+    prepare_multiprocess_metrics()
+    # Import now, with the multiprocess directory set, so child_exit (a signal handler) never imports
+    import app.utils.metrics  # noqa: F401
+
+    GunicornApplication(APP_PATH, gunicorn_options()).run()
+
+
+def run_development():
+    import uvicorn
+
+    # One process needs no shared metrics directory; an inherited setting pointing at a
+    # directory nobody created would make prometheus_client fail at import
+    os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+
+    uvicorn.run(APP_PATH, host=settings.server_host, port=settings.server_port, reload=True)
+
+
+def main():
+    if settings.server_mode == "production":
+        run_production()
+    else:
+        run_development()
+
+
+if __name__ == "__main__":
+    main()
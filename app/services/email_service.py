@@ -1,5 +1,6 @@
 # email_service.py
 from builtins import ValueError, dict, str
+import asyncio
 from settings.config import settings
 from app.utils.smtp_connection import SMTPClient
 from app.utils.template_manager import TemplateManager
@@ -26,12 +27,23 @@ class EmailService:
             raise ValueError("Invalid email type")
 
         html_content = self.template_manager.render_template(email_type, **user_data)
-        self.smtp_client.send_email(subject_map[email_type], html_content, user_data['email'])
+        # smtplib blocks for the whole SMTP exchange; keep it off the event loop
+        await asyncio.to_thread(self.smtp_client.send_email, subject_map[email_type], html_content, user_data['email'])
 
-    async def send_verification_email(self, user: User):
-        verification_url = f"{settings.server_base_url}verify-email/{user.id}/{user.verification_token}"
+    async def send_verification_email(self, user: User, token: str):
+        verification_url = f"{settings.server_base_url}verify-email/{user.id}/{token}"
         await self.send_user_email({
             "name": user.first_name,
             "verification_url": verification_url,
             "email": user.email
-        }, 'email_verification')
\ No newline at end of file
+        }, 'email_verification')
+
+    async def send_password_reset_email(self, user: User, token: str):
+        base_url = str(settings.password_reset_base_url or settings.server_base_url).rstrip("/")
+        reset_url = f"{base_url}/reset-password/{user.id}/{token}"
+        await self.send_user_email({
+            "name": user.first_name,
+            "reset_url": reset_url,
+            "expires_minutes": settings.password_reset_token_expire_minutes,
+            "email": user.email
+        }, 'password_reset')
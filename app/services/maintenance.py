@@ -0,0 +1,63 @@
+"""
+Periodic database housekeeping, run by the background `Scheduler` on the leader worker.
+
+Every job works in bounded batches with a commit per batch, so a large backlog is worked
+off over several runs without long transactions, and is safe to run concurrently.
+"""
+from builtins import dict, int
+from datetime import timedelta
+from functools import partial
+import logging
+from app.database import Database
+from app.services.user_service import UserService
+from app.utils.metrics import USERS
+from app.utils.scheduler import Scheduler
+from settings.config import Settings
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_expired_tokens(batch_size: int, max_batches: int) -> int:
+    """Delete expired verification/reset tokens."""
+    async with Database.get_session_factory()() as session:
+        return await UserService.purge_expired_tokens(session, batch_size, max_batches)
+
+
+async def unlock_expired_lockouts(cooldown: timedelta, batch_size: int, max_batches: int) -> int:
+    """Unlock accounts whose lockout is older than `cooldown`."""
+    async with Database.get_session_factory()() as session:
+        return await UserService.unlock_expired_lockouts(session, cooldown, batch_size, max_batches)
+
+
+async def purge_stale_unverified_users(older_than: timedelta, batch_size: int, max_batches: int) -> int:
+    """Delete self-registered users that never verified their email."""
+    async with Database.get_session_factory()() as session:
+        return await UserService.purge_stale_unverified_users(session, older_than, batch_size, max_batches)
+
+
+async def refresh_user_stats():
+    """Recompute the per-role user counts exported as the `app_users` gauge."""
+    async with Database.get_session_factory()() as session:
+        stats = await UserService.user_stats(session)
+    for role, counts in stats.items():
+        for state, value in counts.items():
+            USERS.labels(role.name, state).set(value)
+
+
+def build_scheduler(settings: Settings) -> Scheduler:
+    """Scheduler with the maintenance jobs configured in `settings`; jobs with a 0 interval are left out."""
+    scheduler = Scheduler(Database.get_engine(), election_interval=settings.scheduler_election_interval_seconds)
+    batch = dict(batch_size=settings.maintenance_batch_size, max_batches=settings.maintenance_max_batches)
+    timeout, jitter = settings.scheduler_job_timeout_seconds, settings.scheduler_jitter
+    scheduler.add("purge_expired_tokens", partial(purge_expired_tokens, **batch),
+                  settings.token_purge_interval_seconds, timeout, jitter)
+    if settings.account_unlock_cooldown_minutes > 0:
+        scheduler.add("unlock_expired_lockouts", partial(
+            unlock_expired_lockouts, timedelta(minutes=settings.account_unlock_cooldown_minutes), **batch
+        ), settings.account_unlock_interval_seconds, timeout, jitter)
+    if settings.unverified_user_retention_days > 0:
+        scheduler.add("purge_stale_unverified_users", partial(
+            purge_stale_unverified_users, timedelta(days=settings.unverified_user_retention_days), **batch
+        ), settings.unverified_user_purge_interval_seconds, timeout, jitter)
+    scheduler.add("refresh_user_stats", refresh_user_stats, settings.user_stats_refresh_interval_seconds, timeout, jitter)
+    return scheduler
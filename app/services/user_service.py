@@ -1,16 +1,22 @@
-from builtins import Exception, bool, classmethod, int, str
-from datetime import datetime, timezone
+from builtins import Exception, bool, classmethod, dict, getattr, int, list, range, str, tuple
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+import html
 import secrets
-from typing import Optional, Dict, List
+from typing import Any, Optional, Dict, List, Tuple
 from pydantic import ValidationError
-from sqlalchemy import func, null, update, select
+from sqlalchemy import Float, bindparam, cast, delete, func, literal, null, tuple_, update, select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.dependencies import get_email_service, get_settings
-from app.models.user_model import User
-from app.schemas.user_schemas import UserCreate, UserUpdate
+from app.models.token_model import TokenPurpose, UserToken
+from app.models.types import utcnow
+from app.models.user_model import SEARCH_CONFIG, User
+from app.schemas.user_schemas import USER_RESPONSE_FIELDS, UserCreate, UserFilterParams, UserUpdate
 from app.utils.nickname_gen import generate_nickname
-from app.utils.security import generate_verification_token, hash_password, verify_password
+from app.utils.response_cache import response_cache
+from app.utils.security import hash_password_async, hash_token, is_legacy_token, sign_token, signed_token_expiry, verify_password_async, verify_signed_token
+from app.utils.tracing import traced_classmethods
 from uuid import UUID
 from app.services.email_service import EmailService
 from app.models.user_model import UserRole
@@ -19,108 +25,299 @@ import logging
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+# ts_headline marks matches with these control characters (stripped from the document first, so
+# profile text cannot forge them); the snippet is HTML-escaped before they become <mark> tags.
+_SNIPPET_START, _SNIPPET_STOP = "\x02", "\x03"
+
+def _render_snippet(snippet: Optional[str]) -> Optional[str]:
+    """HTML-escape a ts_headline snippet and turn its match delimiters into <mark> tags."""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_SNIPPET_START, "<mark>").replace(_SNIPPET_STOP, "</mark>")
+
+# Hot read statements are built once and executed with bound parameters. Reusing the same
+# statement object skips query construction and lets SQLAlchemy reuse the compiled-cache key
+# memoized on it, instead of regenerating both on every call.
+_USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+_USER_BY_NICKNAME = select(User).where(User.nickname == bindparam("nickname"))
+_USER_VERSION = select(User.updated_at).where(User.id == bindparam("user_id"))
+_USER_PAGE = select(User).offset(bindparam("skip")).limit(bindparam("limit"))
+_USER_COUNT = select(func.count()).select_from(User)
+# Redeeming a token is one indexed UPDATE: it only matches an unused, unexpired token of the
+# right purpose and marks it used in the same statement, so a token cannot be redeemed twice.
+_REDEEM_TOKEN = update(UserToken).where(
+    UserToken.token_hash == bindparam("hash"),
+    UserToken.purpose == bindparam("token_purpose"),
+    UserToken.user_id == bindparam("owner_id"),
+    UserToken.used_at.is_(None),
+    UserToken.expires_at > utcnow(),
+).values(used_at=utcnow()).returning(UserToken.user_id).execution_options(synchronize_session=False)
+_REVOKE_TOKENS = update(UserToken).where(
+    UserToken.user_id == bindparam("owner_id"),
+    UserToken.purpose == bindparam("token_purpose"),
+    UserToken.used_at.is_(None),
+).values(used_at=utcnow()).execution_options(synchronize_session=False)
+# A reset request is dropped while the user's previous reset email is this fresh and unused
+_RECENT_RESET_TOKEN = select(UserToken.id).where(
+    UserToken.user_id == bindparam("owner_id"),
+    UserToken.purpose == TokenPurpose.PASSWORD_RESET,
+    UserToken.used_at.is_(None),
+    UserToken.created_at > bindparam("since"),
+).limit(1)
+# Expired tokens are deleted a bounded batch at a time through ix_user_tokens_expires_at, so
+# each purge transaction holds few locks and never rewrites the whole table
+_EXPIRED_TOKEN_BATCH = select(UserToken.id).where(UserToken.expires_at <= utcnow()).order_by(
+    UserToken.expires_at
+).limit(bindparam("batch_size")).with_for_update(skip_locked=True)
+_PURGE_EXPIRED_TOKENS = delete(UserToken).where(
+    UserToken.id.in_(_EXPIRED_TOKEN_BATCH.scalar_subquery())
+).execution_options(synchronize_session=False)
+# Maintenance batches: accounts locked longer than the cooldown, and self-registered users
+# who never verified their email (matching the partial index ix_users_unverified_created_at).
+# Admin-created users also start unverified and ANONYMOUS, so self_registered keeps them out.
+_LOCKOUT_BATCH = select(User.id).where(User.is_locked, User.locked_at <= bindparam("cutoff")).limit(
+    bindparam("batch_size")
+).with_for_update(skip_locked=True)
+_UNLOCK_EXPIRED_LOCKOUTS = update(User).where(User.id.in_(_LOCKOUT_BATCH.scalar_subquery())).values(
+    is_locked=False, locked_at=None, failed_login_attempts=0
+).execution_options(synchronize_session=False)
+_STALE_UNVERIFIED_BATCH = select(User.id).where(
+    ~User.email_verified, User.self_registered, User.role == UserRole.ANONYMOUS, User.created_at < bindparam("cutoff")
+).order_by(User.created_at).limit(bindparam("batch_size")).with_for_update(skip_locked=True)
+_PURGE_STALE_UNVERIFIED = delete(User).where(
+    User.id.in_(_STALE_UNVERIFIED_BATCH.scalar_subquery())
+).execution_options(synchronize_session=False)
+_USER_STATS = select(
+    User.role, func.count(), func.count().filter(~User.email_verified), func.count().filter(User.is_locked)
+).group_by(User.role)
+_MARK_EMAIL_VERIFIED = update(User).where(User.id == bindparam("user_id")).values(
+    email_verified=True, role=UserRole.AUTHENTICATED
+).execution_options(synchronize_session="fetch")
+_USER_COUNT_AND_VERSION = select(func.count(), func.max(User.updated_at)).select_from(User)
+
+@lru_cache(maxsize=64)
+def _user_fields_by_id(fields: Tuple[str, ...]):
+    """Cached single-user projection for one column list."""
+    return select(*[getattr(User, field) for field in fields]).where(User.id == bindparam("user_id"))
+
+@lru_cache(maxsize=64)
+def _user_fields_page(fields: Tuple[str, ...]):
+    """Cached list-page projection for one column list; filters are added per call."""
+    return select(*[getattr(User, field) for field in fields]).order_by(User.created_at, User.id).offset(
+        bindparam("skip")
+    ).limit(bindparam("limit"))
+
+@traced_classmethods
 class UserService:
     @classmethod
-    async def _execute_query(cls, session: AsyncSession, query):
+    async def _execute_query(cls, session: AsyncSession, query, params: Optional[Dict[str, Any]] = None):
         try:
-            result = await session.execute(query)
+            result = await session.execute(query, params)
             await session.commit()
             return result
         except SQLAlchemyError as e:
-            logger.error(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             await session.rollback()
             return None
 
     @classmethod
-    async def _fetch_user(cls, session: AsyncSession, **filters) -> Optional[User]:
-        query = select(User).filter_by(**filters)
-        result = await cls._execute_query(session, query)
+    async def _commit_write(cls, session: AsyncSession):
+        """Commit a write to the users table and invalidate cached responses built from it."""
+        await session.commit()
+        response_cache.bump_version()
+
+    @classmethod
+    async def _fetch_user(cls, session: AsyncSession, query, **params) -> Optional[User]:
+        result = await cls._execute_query(session, query, params)
         return result.scalars().first() if result else None
 
+    @classmethod
+    def _apply_filters(cls, query, filters: Optional[UserFilterParams]):
+        """Add the WHERE clauses for the admin list filters, each shaped to match its index."""
+        if filters is None:
+            return query
+        conditions = []
+        if filters.email:
+            conditions.append(User.email.ilike(f"%{_escape_like(filters.email)}%", escape="\\"))
+        if filters.email_prefix:
+            conditions.append(func.lower(User.email).like(f"{_escape_like(filters.email_prefix.lower())}%", escape="\\"))
+        if filters.nickname:
+            conditions.append(User.nickname.ilike(f"%{_escape_like(filters.nickname)}%", escape="\\"))
+        if filters.nickname_prefix:
+            conditions.append(func.lower(User.nickname).like(f"{_escape_like(filters.nickname_prefix.lower())}%", escape="\\"))
+        if filters.role is not None:
+            conditions.append(User.role == filters.role)
+        if filters.is_locked is not None:
+            conditions.append(User.is_locked == filters.is_locked)
+        if filters.email_verified is not None:
+            conditions.append(User.email_verified == filters.email_verified)
+        if filters.is_professional is not None:
+            conditions.append(User.is_professional == filters.is_professional)
+        if filters.created_from is not None:
+            conditions.append(User.created_at >= filters.created_from)
+        if filters.created_to is not None:
+            conditions.append(User.created_at < filters.created_to)
+        if filters.last_login_from is not None:
+            conditions.append(User.last_login_at >= filters.last_login_from)
+        if filters.last_login_to is not None:
+            conditions.append(User.last_login_at < filters.last_login_to)
+        return query.where(*conditions) if conditions else query
+
+    @classmethod
+    async def _fetch_user_fields(cls, session: AsyncSession, fields: List[str], user_id: UUID) -> Optional[Dict[str, Any]]:
+        """Select only the given columns of a single user, skipping ORM entity hydration."""
+        result = await cls._execute_query(session, _user_fields_by_id(tuple(fields)), {"user_id": user_id})
+        row = result.mappings().first() if result else None
+        return dict(row) if row else None
+
     @classmethod
     async def get_by_id(cls, session: AsyncSession, user_id: UUID) -> Optional[User]:
-        return await cls._fetch_user(session, id=user_id)
+        return await cls._fetch_user(session, _USER_BY_ID, user_id=user_id)
+
+    @classmethod
+    async def get_fields_by_id(cls, session: AsyncSession, user_id: UUID, fields: List[str]) -> Optional[Dict[str, Any]]:
+        return await cls._fetch_user_fields(session, fields, user_id)
+
+    @classmethod
+    async def get_version(cls, session: AsyncSession, user_id: UUID) -> Optional[datetime]:
+        """Return a user's `updated_at` without loading the row, or None if the user does not exist."""
+        result = await cls._execute_query(session, _USER_VERSION, {"user_id": user_id})
+        row = result.first() if result else None
+        return row.updated_at if row else None
 
     @classmethod
     async def get_by_nickname(cls, session: AsyncSession, nickname: str) -> Optional[User]:
-        return await cls._fetch_user(session, nickname=nickname)
+        return await cls._fetch_user(session, _USER_BY_NICKNAME, nickname=nickname)
 
     @classmethod
     async def get_by_email(cls, session: AsyncSession, email: str) -> Optional[User]:
-        return await cls._fetch_user(session, email=email)
+        return await cls._fetch_user(session, _USER_BY_EMAIL, email=email)
 
     @classmethod
-    async def create(cls, session: AsyncSession, user_data: Dict[str, str], email_service: EmailService) -> Optional[User]:
+    async def create(cls, session: AsyncSession, user_data: Dict[str, str], email_service: EmailService, self_registered: bool = False) -> Optional[User]:
         try:
             validated_data = UserCreate(**user_data).model_dump()
+            validated_data['self_registered'] = self_registered
             existing_user = await cls.get_by_email(session, validated_data['email'])
             if existing_user:
                 logger.error("User with given email already exists.")
                 return None
-            validated_data['hashed_password'] = hash_password(validated_data.pop('password'))
+            validated_data['hashed_password'] = await hash_password_async(validated_data.pop('password'))
             new_user = User(**validated_data)
             new_nickname = generate_nickname()
             while await cls.get_by_nickname(session, new_nickname):
                 new_nickname = generate_nickname()
             new_user.nickname = new_nickname
-            logger.info(f"User Role: {new_user.role}")
+            logger.debug("User role: %s", new_user.role)
             user_count = await cls.count(session)
             new_user.role = UserRole.ADMIN if user_count == 0 else UserRole.ANONYMOUS            
+            session.add(new_user)
             if new_user.role == UserRole.ADMIN:
                 new_user.email_verified = True
-
+                await cls._commit_write(session)
             else:
-                new_user.verification_token = generate_verification_token()
-                await email_service.send_verification_email(new_user)
-
-            session.add(new_user)
-            await session.commit()
+                await session.flush()  # assigns new_user.id for the token row
+                token = cls._issue_token(session, new_user.id, TokenPurpose.EMAIL_VERIFICATION,
+                                         timedelta(hours=settings.email_verification_token_expire_hours))
+                await cls._commit_write(session)
+                await email_service.send_verification_email(new_user, token)
             return new_user
         except ValidationError as e:
-            logger.error(f"Validation error during user creation: {e}")
+            logger.error("Validation error during user creation: %s", e)
             return None
 
     @classmethod
-    async def update(cls, session: AsyncSession, user_id: UUID, update_data: Dict[str, str]) -> Optional[User]:
+    async def update(cls, session: AsyncSession, user_id: UUID, update_data: Dict[str, str], expected_updated_at: Optional[datetime] = None) -> Optional[User]:
+        """
+        Update a user; when `expected_updated_at` is given the row is only updated if it still
+        carries that timestamp (optimistic concurrency), otherwise None is returned.
+        """
         try:
             # validated_data = UserUpdate(**update_data).dict(exclude_unset=True)
             validated_data = UserUpdate(**update_data).model_dump(exclude_unset=True)
 
             if 'password' in validated_data:
-                validated_data['hashed_password'] = hash_password(validated_data.pop('password'))
+                validated_data['hashed_password'] = await hash_password_async(validated_data.pop('password'))
             query = update(User).where(User.id == user_id).values(**validated_data).execution_options(synchronize_session="fetch")
-            await cls._execute_query(session, query)
+            if expected_updated_at is not None:
+                query = query.where(User.updated_at == expected_updated_at)
+            result = await cls._execute_query(session, query)
+            response_cache.bump_version()
+            if expected_updated_at is not None and (result is None or result.rowcount == 0):
+                logger.info("User %s changed since %s; update skipped.", user_id, expected_updated_at)
+                return None
             updated_user = await cls.get_by_id(session, user_id)
             if updated_user:
-                session.refresh(updated_user)  # Explicitly refresh the updated user object
-                logger.info(f"User {user_id} updated successfully.")
+                await session.refresh(updated_user)  # Explicitly refresh the updated user object
+                logger.info("User %s updated successfully.", user_id)
                 return updated_user
             else:
-                logger.error(f"User {user_id} not found after update attempt.")
+                logger.error("User %s not found after update attempt.", user_id)
             return None
         except Exception as e:  # Broad exception handling for debugging
-            logger.error(f"Error during user update: {e}")
+            logger.error("Error during user update: %s", e)
             return None
 
     @classmethod
     async def delete(cls, session: AsyncSession, user_id: UUID) -> bool:
         user = await cls.get_by_id(session, user_id)
         if not user:
-            logger.info(f"User with ID {user_id} not found.")
+            logger.info("User with ID %s not found.", user_id)
             return False
         await session.delete(user)
-        await session.commit()
+        await cls._commit_write(session)
         return True
 
     @classmethod
     async def list_users(cls, session: AsyncSession, skip: int = 0, limit: int = 10) -> List[User]:
-        query = select(User).offset(skip).limit(limit)
-        result = await cls._execute_query(session, query)
+        result = await cls._execute_query(session, _USER_PAGE, {"skip": skip, "limit": limit})
         return result.scalars().all() if result else []
 
+    @classmethod
+    async def list_user_fields(cls, session: AsyncSession, fields: List[str], skip: int = 0, limit: int = 10, filters: Optional[UserFilterParams] = None) -> List[Dict[str, Any]]:
+        """List users as plain dicts holding only the requested columns, oldest first."""
+        query = cls._apply_filters(_user_fields_page(tuple(fields)), filters)
+        result = await cls._execute_query(session, query, {"skip": skip, "limit": limit})
+        return [dict(row) for row in result.mappings()] if result else []
+
+    @classmethod
+    async def search(cls, session: AsyncSession, query_text: str, limit: int = 10, after: Optional[Tuple[float, UUID]] = None) -> List[Dict[str, Any]]:
+        """
+        Full-text search over first name, last name and bio, best matches first.
+
+        Matches come from the GIN-indexed `search_vector` column. Pages are keyset-paginated on
+        (rank, id): pass the rank and id of the last row seen as `after` to continue. Snippets
+        are only rendered for the rows on the returned page, and are HTML-escaped with matches
+        wrapped in <mark> tags, so they are safe to insert into a page as HTML.
+        """
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query_text)
+        rank = func.ts_rank_cd(User.search_vector, ts_query)
+        page = select(User.id, User.nickname, User.first_name, User.last_name, User.bio, rank.label("rank")).where(
+            User.search_vector.bool_op("@@")(ts_query)
+        )
+        if after is not None:
+            after_rank, after_id = after
+            page = page.where(tuple_(cast(rank, Float), User.id) < tuple_(literal(after_rank, Float), literal(after_id, User.id.type)))
+        page = page.order_by(rank.desc(), User.id.desc()).limit(limit).subquery()
+
+        document = func.translate(func.concat_ws(" ", page.c.first_name, page.c.last_name, page.c.bio), _SNIPPET_START + _SNIPPET_STOP, "")
+        snippet = func.ts_headline(SEARCH_CONFIG, document, ts_query, f"StartSel={_SNIPPET_START}, StopSel={_SNIPPET_STOP}, MaxFragments=2, MaxWords=20, MinWords=5")
+        query = select(page.c.id, page.c.nickname, page.c.first_name, page.c.last_name, page.c.rank, snippet.label("snippet")).order_by(
+            page.c.rank.desc(), page.c.id.desc()
+        )
+        result = await cls._execute_query(session, query)
+        if not result:
+            return []
+        return [dict(row, snippet=_render_snippet(row["snippet"])) for row in result.mappings()]
+
     @classmethod
     async def register_user(cls, session: AsyncSession, user_data: Dict[str, str], get_email_service) -> Optional[User]:
-        return await cls.create(session, user_data, get_email_service)
+        return await cls.create(session, user_data, get_email_service, self_registered=True)
     
 
     @classmethod
@@ -131,18 +328,18 @@ class UserService:
                 return None
             if user.is_locked:
                 return None
-            if verify_password(password, user.hashed_password):
+            if await verify_password_async(password, user.hashed_password):
                 user.failed_login_attempts = 0
                 user.last_login_at = datetime.now(timezone.utc)
                 session.add(user)
-                await session.commit()
+                await cls._commit_write(session)
                 return user
             else:
                 user.failed_login_attempts += 1
                 if user.failed_login_attempts >= settings.max_login_attempts:
-                    user.is_locked = True
+                    user.lock_account()
                 session.add(user)
-                await session.commit()
+                await cls._commit_write(session)
         return None
 
     @classmethod
@@ -153,49 +350,226 @@ class UserService:
 
     @classmethod
     async def reset_password(cls, session: AsyncSession, user_id: UUID, new_password: str) -> bool:
-        hashed_password = hash_password(new_password)
+        hashed_password = await hash_password_async(new_password)
         user = await cls.get_by_id(session, user_id)
         if user:
             user.hashed_password = hashed_password
             user.failed_login_attempts = 0  # Resetting failed login attempts
-            user.is_locked = False  # Unlocking the user account, if locked
+            user.unlock_account()  # Unlocking the user account, if locked
             session.add(user)
-            await session.commit()
+            await cls._commit_write(session)
             return True
         return False
 
+    @classmethod
+    def _issue_token(cls, session: AsyncSession, user_id: UUID, purpose: TokenPurpose, lifetime: timedelta) -> str:
+        """Add a hashed token row to the session and return the signed plaintext token to mail out."""
+        token = sign_token(purpose.value, str(user_id), datetime.now(timezone.utc) + lifetime)
+        session.add(UserToken(
+            user_id=user_id, purpose=purpose, token_hash=hash_token(token), expires_at=signed_token_expiry(token),
+        ))
+        return token
+
+    @classmethod
+    async def _redeem_token(cls, session: AsyncSession, user_id: UUID, token: str, purpose: TokenPurpose) -> bool:
+        """
+        Mark a valid token used; False if it is unknown, expired, already used or not `user_id`'s.
+
+        Forged, tampered and expired links fail the signature check and never reach the database.
+        Unsigned legacy links have no signature to check and are looked up by hash alone, but
+        only until `legacy_token_valid_until`.
+        """
+        if is_legacy_token(token):
+            return await cls._consume_token(session, user_id, token, purpose)
+        if not verify_signed_token(token, purpose.value, str(user_id)):
+            return False
+        return await cls._consume_token(session, user_id, token, purpose)
+
+    @classmethod
+    async def _consume_token(cls, session: AsyncSession, user_id: UUID, token: str, purpose: TokenPurpose) -> bool:
+        """The database half of `_redeem_token`, for callers that already checked the signature."""
+        result = await session.execute(
+            _REDEEM_TOKEN, {"hash": hash_token(token), "token_purpose": purpose, "owner_id": user_id}
+        )
+        return result.scalar_one_or_none() is not None
+
     @classmethod
     async def verify_email_with_token(cls, session: AsyncSession, user_id: UUID, token: str) -> bool:
-        user = await cls.get_by_id(session, user_id)
-        if user and user.verification_token == token:
-            user.email_verified = True
-            user.verification_token = None  # Clear the token once used
-            user.role = UserRole.AUTHENTICATED
-            session.add(user)
-            await session.commit()
+        try:
+            if not await cls._redeem_token(session, user_id, token, TokenPurpose.EMAIL_VERIFICATION):
+                return False
+            await session.execute(_MARK_EMAIL_VERIFIED, {"user_id": user_id})
+            await cls._commit_write(session)
             return True
-        return False
+        except SQLAlchemyError as e:
+            logger.error("Database error: %s", e)
+            await session.rollback()
+            return False
+
+    @classmethod
+    async def request_password_reset(cls, session: AsyncSession, email: str, email_service: EmailService) -> bool:
+        """
+        Mail a single-use reset link if `email` belongs to a user; False (and no email) otherwise.
+
+        The new link replaces any the user still has outstanding, and no email is sent while
+        the previous one is younger than `password_reset_cooldown_seconds`.
+        """
+        user = await cls.get_by_email(session, email)
+        if user is None:
+            return False
+        since = datetime.now(timezone.utc) - timedelta(seconds=settings.password_reset_cooldown_seconds)
+        if await session.scalar(_RECENT_RESET_TOKEN, {"owner_id": user.id, "since": since}) is not None:
+            return False
+        await session.execute(_REVOKE_TOKENS, {"owner_id": user.id, "token_purpose": TokenPurpose.PASSWORD_RESET})
+        token = cls._issue_token(session, user.id, TokenPurpose.PASSWORD_RESET,
+                                 timedelta(minutes=settings.password_reset_token_expire_minutes))
+        await session.commit()
+        await email_service.send_password_reset_email(user, token)
+        return True
+
+    @classmethod
+    async def request_password_reset_in_background(cls, session_factory, email: str, email_service: EmailService):
+        """
+        `request_password_reset` on a session of its own, for running after the response is sent:
+        the lookup, token write and SMTP send then take no time on the request path, so the
+        response time does not reveal whether `email` is registered.
+        """
+        try:
+            async with session_factory() as session:
+                await cls.request_password_reset(session, email, email_service)
+        except Exception:
+            logger.exception("Password reset request failed")
 
     @classmethod
-    async def count(cls, session: AsyncSession) -> int:
+    def check_password_reset_token(cls, user_id: UUID, token: str) -> bool:
+        """Signature and expiry check of a reset link without the database; the token may still be used or revoked."""
+        return verify_signed_token(token, TokenPurpose.PASSWORD_RESET.value, str(user_id))
+
+    @classmethod
+    async def reset_password_with_token(cls, session: AsyncSession, user_id: UUID, token: str, new_password: str) -> bool:
+        """
+        Set a new password from an emailed reset link; the link and any other outstanding reset
+        links for the user stop working. Also clears failed logins and unlocks the account.
+        """
+        if not verify_signed_token(token, TokenPurpose.PASSWORD_RESET.value, str(user_id)):
+            return False
+        # Hash before opening the transaction so bcrypt does not hold the token row locked
+        new_hash = await hash_password_async(new_password)
+        try:
+            if not await cls._consume_token(session, user_id, token, TokenPurpose.PASSWORD_RESET):
+                return False
+            await session.execute(update(User).where(User.id == user_id).values(
+                hashed_password=new_hash, failed_login_attempts=0, is_locked=False, locked_at=None
+            ).execution_options(synchronize_session="fetch"))
+            await session.execute(_REVOKE_TOKENS, {"owner_id": user_id, "token_purpose": TokenPurpose.PASSWORD_RESET})
+            await cls._commit_write(session)
+            return True
+        except SQLAlchemyError as e:
+            logger.error("Database error: %s", e)
+            await session.rollback()
+            return False
+
+    @classmethod
+    async def purge_expired_tokens(cls, session: AsyncSession, batch_size: int, max_batches: int) -> int:
+        """
+        Delete expired tokens, committing after every `batch_size` rows and stopping after
+        `max_batches` batches; returns the number deleted.
+        """
+        return await cls._run_in_batches(session, _PURGE_EXPIRED_TOKENS, {}, batch_size, max_batches)
+
+    @classmethod
+    async def unlock_expired_lockouts(cls, session: AsyncSession, cooldown: timedelta, batch_size: int, max_batches: int) -> int:
+        """Unlock accounts locked for longer than `cooldown`, in batches; returns the number unlocked."""
+        cutoff = datetime.now(timezone.utc) - cooldown
+        unlocked = await cls._run_in_batches(session, _UNLOCK_EXPIRED_LOCKOUTS, {"cutoff": cutoff}, batch_size, max_batches)
+        if unlocked:
+            response_cache.bump_version()
+        return unlocked
+
+    @classmethod
+    async def purge_stale_unverified_users(cls, session: AsyncSession, older_than: timedelta, batch_size: int, max_batches: int) -> int:
+        """
+        Delete users who signed up through registration, are still ANONYMOUS and have not verified
+        their email within `older_than` of signing up, in batches; their tokens go with them.
+        Admin-created users are never purged. Returns the number deleted.
+        """
+        cutoff = datetime.now(timezone.utc) - older_than
+        purged = await cls._run_in_batches(session, _PURGE_STALE_UNVERIFIED, {"cutoff": cutoff}, batch_size, max_batches)
+        if purged:
+            response_cache.bump_version()
+        return purged
+
+    @classmethod
+    async def _run_in_batches(cls, session: AsyncSession, statement, params: Dict[str, Any], batch_size: int, max_batches: int) -> int:
+        """
+        Execute a batched maintenance statement until it touches fewer than `batch_size` rows
+        or has run `max_batches` times, committing after each batch; returns the rows touched.
+        The batch subqueries skip rows locked by a concurrent run.
+        """
+        total = 0
+        for _ in range(max_batches):
+            result = await session.execute(statement, {**params, "batch_size": batch_size})
+            await session.commit()
+            total += result.rowcount
+            if result.rowcount < batch_size:
+                break
+        return total
+
+    @classmethod
+    async def user_stats(cls, session: AsyncSession) -> Dict[UserRole, Dict[str, int]]:
+        """Total, unverified and locked user counts per role, in one grouped query."""
+        result = await session.execute(_USER_STATS)
+        stats = {role: {"total": 0, "unverified": 0, "locked": 0} for role in UserRole}
+        for role, total, unverified, locked in result:
+            stats[role] = {"total": total, "unverified": unverified, "locked": locked}
+        return stats
+
+    @classmethod
+    async def count(cls, session: AsyncSession, filters: Optional[UserFilterParams] = None) -> int:
         """
         Count the number of users in the database.
 
         :param session: The AsyncSession instance for database access.
+        :param filters: Optional admin list filters to count matching users only.
         :return: The count of users.
         """
-        query = select(func.count()).select_from(User)
+        query = cls._apply_filters(_USER_COUNT, filters)
         result = await session.execute(query)
         count = result.scalar()
         return count
     
+    @classmethod
+    async def count_and_version(cls, session: AsyncSession, filters: Optional[UserFilterParams] = None) -> Tuple[int, Optional[datetime]]:
+        """
+        Count matching users and return the newest `updated_at` among them in the same query.
+
+        Together they version a list page: inserts and deletes change the count, updates move the
+        newest timestamp.
+        """
+        query = cls._apply_filters(_USER_COUNT_AND_VERSION, filters)
+        result = await session.execute(query)
+        total, last_updated = result.one()
+        return total, last_updated
+
     @classmethod
     async def unlock_user_account(cls, session: AsyncSession, user_id: UUID) -> bool:
         user = await cls.get_by_id(session, user_id)
         if user and user.is_locked:
-            user.is_locked = False
+            user.unlock_account()
             user.failed_login_attempts = 0  # Optionally reset failed login attempts
             session.add(user)
-            await session.commit()
+            await cls._commit_write(session)
             return True
         return False
+
+    @classmethod
+    async def warm_up(cls, session: AsyncSession):
+        """Run the hot read queries once so their compiled SQL and prepared statements are cached."""
+        missing_id = UUID(int=0)
+        fields = list(USER_RESPONSE_FIELDS)
+        await cls.get_fields_by_id(session, missing_id, fields + ["updated_at"])
+        await cls.get_version(session, missing_id)
+        await cls.get_by_id(session, missing_id)
+        await cls.get_by_email(session, "warmup@invalid")
+        await cls.count_and_version(session)
+        await cls.list_user_fields(session, fields, 0, 1)
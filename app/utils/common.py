@@ -1,16 +1,25 @@
-import logging.config
-import os
+import logging
+from typing import Optional
+from logging.handlers import QueueListener
 from app.dependencies import get_settings
+from app.utils.structured_logging import configure_logging
 
 settings = get_settings()
+_listener: Optional[QueueListener] = None
+
 def setup_logging():
     """
-    Sets up logging for the application using a configuration file.
-    This ensures standardized logging across the entire application.
+    Sets up logging for the application through a queue, so log I/O happens on a background thread.
+    This ensures standardized (JSON by default) logging across the entire application.
     """
-    # Construct the path to 'logging.conf', assuming it's in the project's root.
-    logging_config_path = os.path.join(os.path.dirname(__file__), '..', '..', 'logging.conf')
-    # Normalize the path to handle any '..' correctly.
-    normalized_path = os.path.normpath(logging_config_path)
-    # Apply the logging configuration.
-    logging.config.fileConfig(normalized_path, disable_existing_loggers=False)
\ No newline at end of file
+    global _listener
+    if _listener is not None:
+        return
+    _listener = configure_logging(settings.log_level, settings.log_json, settings.log_sample_rates)
+
+def shutdown_logging():
+    """Flush queued records and stop the logging thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,26 @@
+from builtins import ValueError, dict, isinstance, len, str
+import base64
+import json
+
+
+def encode_cursor(position: dict) -> str:
+    """Encode a keyset pagination position as an opaque, URL-safe cursor."""
+    raw = json.dumps(position, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(position, dict):
+        raise ValueError("Invalid cursor")
+    return position
@@ -0,0 +1,77 @@
+from builtins import ValueError, int, list, repr, str
+from datetime import datetime, timedelta, timezone
+import hashlib
+from typing import Optional
+from uuid import UUID
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_micros(moment: Optional[datetime]) -> int:
+    if moment is None:
+        return 0
+    return (moment - _EPOCH) // timedelta(microseconds=1)
+
+
+def representation_tag(*inputs) -> str:
+    """
+    Short digest of the request inputs that shape a response body (fields, links, page,
+    filters). ETags carry it so two projections or pages of the same data never share one:
+    a strong ETag promises byte-identical bodies.
+    """
+    return hashlib.blake2s(repr(inputs).encode("utf-8"), digest_size=6).hexdigest()
+
+
+def _with_variant(tag: str, variant: str) -> str:
+    return f'"{tag}.{variant}"' if variant else f'"{tag}"'
+
+
+def user_etag(user_id: UUID, updated_at: Optional[datetime], variant: str = "") -> str:
+    """
+    Strong ETag for a single user, built from its id, `updated_at` and the `representation_tag`
+    of the response.
+
+    The timestamp is encoded exactly (microseconds, hex) so an If-Match value can be turned back
+    into the `updated_at` it was issued for and used as an UPDATE precondition, whichever
+    representation it came from.
+    """
+    return _with_variant(f"{user_id.hex}.{_to_micros(updated_at):x}", variant)
+
+
+def collection_etag(total: int, last_updated: Optional[datetime], variant: str = "") -> str:
+    """
+    Strong ETag for a user list, built from the matching row count, the newest `updated_at` and
+    the `representation_tag` of the page.
+    """
+    return _with_variant(f"c{total:x}.{_to_micros(last_updated):x}", variant)
+
+
+def parse_user_etag(etag: str, user_id: UUID) -> Optional[datetime]:
+    """Return the `updated_at` encoded in an ETag issued for `user_id`, or None if it is not one."""
+    value = etag.strip()
+    if value.startswith("W/"):
+        return None  # weak validators never satisfy If-Match
+    value = value.strip('"')
+    prefix, _, rest = value.partition(".")
+    micros = rest.partition(".")[0]
+    if prefix != user_id.hex or not micros:
+        return None
+    try:
+        return _EPOCH + timedelta(microseconds=int(micros, 16))
+    except ValueError:
+        return None
+
+
+def split_etags(header: str) -> list:
+    """Split an If-Match / If-None-Match header into its individual entity tags."""
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Weak comparison used for If-None-Match: true if any listed tag (or "*") matches."""
+    if not header:
+        return False
+    for tag in split_etags(header):
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
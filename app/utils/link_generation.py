@@ -1,12 +1,18 @@
-from builtins import dict, int, max, str
-from typing import List, Callable
-from urllib.parse import urlencode
+from builtins import dict, getattr, int, max, str
+from typing import Dict, List
 from uuid import UUID
 
-from fastapi import Request
+from fastapi import FastAPI, Request
 from app.schemas.link_schema import Link
 from app.schemas.pagination_schema import PaginationLink
 
+# (rel, route name, HTTP method, action) for every link attached to a user resource
+USER_LINK_ACTIONS = [
+    ("self", "get_user", "GET", "view"),
+    ("update", "update_user", "PUT", "update"),
+    ("delete", "delete_user", "DELETE", "delete")
+]
+
 # Utility function to create a link
 def create_link(rel: str, href: str, method: str = "GET", action: str = None) -> Link:
     return Link(rel=rel, href=href, method=method, action=action)
@@ -14,24 +20,44 @@ def create_link(rel: str, href: str, method: str = "GET", action: str = None) ->
 def create_pagination_link(rel: str, base_url: str, params: dict) -> PaginationLink:
     # Ensure parameters are added in a specific order
     query_string = f"skip={params['skip']}&limit={params['limit']}"
-    return PaginationLink(rel=rel, href=f"{base_url}?{query_string}")
+    separator = "&" if "?" in base_url else "?"
+    return PaginationLink.model_construct(rel=rel, href=f"{base_url}{separator}{query_string}", method="GET")
+
+def build_link_templates(app: FastAPI) -> Dict[str, str]:
+    """
+    Resolve the path of every route linked from a user resource once and cache it on the app.
+
+    The result maps route names to format strings such as "/users/{user_id}", so building
+    a link is a string format instead of a route-table lookup per user.
+    """
+    templates = {
+        route_name: str(app.url_path_for(route_name, user_id="{user_id}"))
+        for _, route_name, _, _ in USER_LINK_ACTIONS
+    }
+    app.state.link_templates = templates
+    return templates
+
+def get_link_templates(request: Request) -> Dict[str, str]:
+    """Return the cached link templates, resolving them on first use if startup did not."""
+    templates = getattr(request.app.state, "link_templates", None)
+    if templates is None:
+        templates = build_link_templates(request.app)
+    return templates
 
 def create_user_links(user_id: UUID, request: Request) -> List[Link]:
     """
     Generate navigation links for user actions.
     """
-    actions = [
-        ("self", "get_user", "GET", "view"),
-        ("update", "update_user", "PUT", "update"),
-        ("delete", "delete_user", "DELETE", "delete")
-    ]
+    base_url = str(request.base_url).rstrip("/")
+    templates = get_link_templates(request)
+    user_id = str(user_id)
     return [
-        create_link(rel, str(request.url_for(action, user_id=str(user_id))), method, action_desc)
-        for rel, action, method, action_desc in actions
+        Link.model_construct(rel=rel, href=base_url + templates[route_name].format(user_id=user_id), action=action_desc)
+        for rel, route_name, method, action_desc in USER_LINK_ACTIONS
     ]
 
 def generate_pagination_links(request: Request, skip: int, limit: int, total_items: int) -> List[PaginationLink]:
-    base_url = str(request.url)
+    base_url = str(request.url.remove_query_params(["skip", "limit"]))
     total_pages = (total_items + limit - 1) // limit
     links = [
         create_pagination_link("self", base_url, {'skip': skip, 'limit': limit}),
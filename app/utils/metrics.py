@@ -0,0 +1,166 @@
+"""
+Prometheus metrics for the service.
+
+All metric objects live here so instrumented modules only import what they record. When
+`PROMETHEUS_MULTIPROC_DIR` is set (gunicorn with several workers), prometheus_client writes
+values to per-process files in that directory and `render_metrics` aggregates them, so any
+worker can answer a scrape for the whole server.
+"""
+from builtins import int, str
+import os
+import time
+from typing import Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from sqlalchemy import event
+from app.utils.memory import MemoryCollector
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled, by route template and status.", ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency, by route template.", ["method", "route"]
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests currently being handled.", multiprocess_mode="livesum"
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "Open database connections held by the pool.", multiprocess_mode="livesum"
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Database connections currently checked out of the pool.", multiprocess_mode="livesum"
+)
+BCRYPT_IN_PROGRESS = Gauge(
+    "bcrypt_operations_in_progress", "bcrypt hash/verify calls currently running.",
+    ["operation"], multiprocess_mode="livesum"
+)
+BCRYPT_WAITING = Gauge(
+    "bcrypt_operations_waiting", "bcrypt hash/verify calls queued for a free bcrypt thread (queue depth).",
+    ["operation"], multiprocess_mode="livesum"
+)
+BCRYPT_DURATION = Histogram(
+    "bcrypt_duration_seconds", "Time spent in bcrypt hash/verify calls.", ["operation"],
+    buckets=(0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0)
+)
+SMTP_SEND_DURATION = Histogram(
+    "smtp_send_duration_seconds", "Time spent sending an email over SMTP.",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+SMTP_SEND_FAILURES = Counter("smtp_send_failures_total", "Emails that failed to send.")
+SIGNED_TOKEN_REJECTIONS = Counter(
+    "signed_token_rejections_total", "Emailed-link tokens rejected before any database query, by purpose and reason.",
+    ["purpose", "reason"]
+)
+SCHEDULER_JOB_RUNS = Counter(
+    "scheduler_job_runs_total", "Background job runs, by job and result (success, failure, timeout).", ["job", "result"]
+)
+SCHEDULER_JOB_DURATION = Histogram(
+    "scheduler_job_duration_seconds", "Time spent in background job runs.", ["job"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+)
+SCHEDULER_JOB_ROWS = Counter(
+    "scheduler_job_rows_total", "Rows changed by background jobs (tokens purged, accounts unlocked, ...).", ["job"]
+)
+SCHEDULER_JOB_LAST_SUCCESS = Gauge(
+    "scheduler_job_last_success_timestamp_seconds", "Unix time a background job last finished successfully.",
+    ["job"], multiprocess_mode="max"
+)
+SCHEDULER_LEADER = Gauge(
+    "scheduler_leader", "1 while this worker holds the scheduler leader lock.", multiprocess_mode="livesum"
+)
+USERS = Gauge(
+    "app_users", "Users by role and account state (total, unverified, locked); refreshed by a background job.",
+    ["role", "state"], multiprocess_mode="mostrecent"
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Time spent executing individual SQL statements.",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+DB_SLOW_QUERIES = Counter("db_slow_queries_total", "SQL statements slower than the slow-query threshold.")
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request, by route template.", ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds", "Total SQL execution time per HTTP request, by route template.", ["route"]
+)
+DB_N_PLUS_ONE = Counter(
+    "db_n_plus_one_total", "Requests that repeated one statement past the N+1 threshold, by route template.", ["route"]
+)
+RESPONSE_CACHE_REQUESTS = Counter(
+    "response_cache_requests_total", "Response cache lookups, by route and hit/miss.", ["route", "result"]
+)
+# Read at scrape time; also added to the per-scrape registry in multiprocess mode
+MEMORY_COLLECTOR = MemoryCollector()
+REGISTRY.register(MEMORY_COLLECTOR)
+
+
+def route_label(scope) -> str:
+    """Path template of the route that handled the request, or "unmatched"."""
+    route = scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request counts, latency and in-flight requests.
+
+    Routes are labelled by their path template (e.g. /users/{user_id}) taken from the matched
+    route after the request is handled, which keeps label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            route_path = route_label(scope)
+            HTTP_REQUESTS.labels(scope["method"], route_path, str(status_code)).inc()
+            HTTP_REQUEST_DURATION.labels(scope["method"], route_path).observe(elapsed)
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Track pool connections and checkouts through SQLAlchemy pool events."""
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "connect", lambda dbapi_connection, record: DB_POOL_CONNECTIONS.inc())
+    event.listen(sync_engine, "close", lambda dbapi_connection, record: DB_POOL_CONNECTIONS.dec())
+    event.listen(sync_engine, "checkout", lambda dbapi_connection, record, proxy: DB_POOL_CHECKED_OUT.inc())
+    event.listen(sync_engine, "checkin", lambda dbapi_connection, record: DB_POOL_CHECKED_OUT.dec())
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Return the exposition-format payload and its content type."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(MEMORY_COLLECTOR)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid: int):
+    """Drop a dead worker's live gauges; call from the gunicorn `child_exit` hook."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,149 @@
+"""
+Statistical sampling profiler for live workers.
+
+A background thread snapshots the event loop thread's stack with `sys._current_frames()`
+every few milliseconds and counts identical stacks. The result is written in the collapsed
+("folded") format read by flamegraph.pl and speedscope: one `frame;frame;frame count` line
+per distinct stack. Sampling never pauses the worker, so it is safe to run in production.
+
+All requests share the event loop thread, so a profile taken while serving one request also
+contains samples from whatever else the worker was running at the time.
+"""
+from builtins import ValueError, bool, float, getattr, int, len, list, open, reversed, str, sum
+from collections import Counter
+from datetime import datetime, timezone
+import hmac
+import os
+import sys
+import threading
+import time
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.services.jwt_service import decode_token
+from app.utils.metrics import route_label
+from settings.config import settings
+
+PROFILE_REQUEST_HEADER = "x-profile"
+PROFILE_SECRET_HEADER = "x-profile-secret"
+
+
+def _short_path(filename: str) -> str:
+    if "site-packages" in filename:
+        return filename.split("site-packages" + os.sep, 1)[-1]
+    try:
+        relative = os.path.relpath(filename)
+    except ValueError:
+        return filename
+    return filename if relative.startswith("..") else relative
+
+
+def _collapse(frame) -> str:
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(f"{getattr(code, 'co_qualname', code.co_name)} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(frames))
+
+
+class StackSampler:
+    """Sample one thread's stack at a fixed interval until stopped."""
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.005):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.started_at: Optional[float] = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[_collapse(frame)] += 1
+            del frame
+
+    def start(self) -> "StackSampler":
+        self.started_at = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> "StackSampler":
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        return self
+
+    @property
+    def sample_count(self) -> int:
+        return sum(self.samples.values())
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def write(self, directory: str, name: str) -> str:
+        """Write the collapsed stacks to `directory/name` and return the path."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.collapsed())
+        return path
+
+
+def profile_filename(label: str) -> str:
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    safe_label = "".join(char if char.isalnum() else "_" for char in label).strip("_")
+    return f"{timestamp}-{os.getpid()}-{safe_label}.collapsed"
+
+
+class ProfilerMiddleware:
+    """
+    Pure ASGI middleware profiling single requests sent with `X-Profile: 1`.
+
+    Off unless `request_profiling_enabled` is set. Even then a request is only sampled when it
+    carries an admin bearer token or an `X-Profile-Secret` header matching
+    `request_profiling_secret`, checked before sampling starts so anonymous callers cannot put
+    sampling overhead on a worker. The profile is written to `profile_dir` and named in the
+    `X-Profile-Id` response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._allowed(Headers(scope=scope)):
+            await self.app(scope, receive, send)
+            return
+
+        sampler = StackSampler(interval=settings.profile_interval_ms / 1000).start()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                sampler.stop()
+                name = profile_filename(f"{scope['method']}_{route_label(scope)}")
+                sampler.write(settings.profile_dir, name)
+                MutableHeaders(scope=message)["X-Profile-Id"] = name
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if sampler.duration == 0.0:
+                sampler.stop()
+
+    @staticmethod
+    def _allowed(headers: Headers) -> bool:
+        if not settings.request_profiling_enabled or headers.get(PROFILE_REQUEST_HEADER) != "1":
+            return False
+        secret = headers.get(PROFILE_SECRET_HEADER)
+        if secret and settings.request_profiling_secret:
+            return hmac.compare_digest(secret.encode("utf-8"), settings.request_profiling_secret.encode("utf-8"))
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+        payload = decode_token(token)
+        return payload is not None and payload.get("role") == "ADMIN"
@@ -0,0 +1,141 @@
+"""
+Per-request SQL statement accounting.
+
+`instrument_queries` hooks SQLAlchemy's cursor events on an engine and records every statement
+into the `QueryStats` collectors active in the current context. `QueryStatsMiddleware` opens a
+collector per HTTP request and reports query count, DB time, the slowest statement and likely
+N+1 patterns to the log and to Prometheus; `assert_max_queries` lets tests pin a query budget.
+"""
+from builtins import AssertionError, bool, float, int, len, list, max, str, sum, tuple
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+import time
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.utils.metrics import (
+    DB_N_PLUS_ONE, DB_QUERIES_PER_REQUEST, DB_QUERY_DURATION, DB_SLOW_QUERIES, DB_TIME_PER_REQUEST, route_label
+)
+from settings.config import settings
+
+logger = logging.getLogger(__name__)
+
+_active_stats: ContextVar[tuple] = ContextVar("active_query_stats", default=())
+_TRANSACTION_CONTROL_PREFIXES = ("BEGIN", "SAVEPOINT ", "RELEASE SAVEPOINT ", "ROLLBACK TO SAVEPOINT ")
+
+
+def is_transaction_control(statement: str) -> bool:
+    """
+    True for BEGIN and savepoint bookkeeping, which are not counted as queries. asyncpg issues
+    BEGIN and COMMIT outside the cursor, so they never reach these hooks; SQLite's explicit
+    BEGIN and savepoints on either backend are skipped to match.
+    """
+    return statement.startswith(_TRANSACTION_CONTROL_PREFIXES)
+
+
+class QueryStats:
+    """Statements executed while this collector was active, with their timings."""
+
+    def __init__(self):
+        self.statements: List[Tuple[str, float]] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def total_time(self) -> float:
+        return sum(duration for _, duration in self.statements)
+
+    @property
+    def slowest(self) -> Optional[Tuple[str, float]]:
+        return max(self.statements, key=lambda item: item[1], default=None)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed at least `threshold` times, most repeated first."""
+        counts = Counter(statement for statement, _ in self.statements)
+        return [(statement, times) for statement, times in counts.most_common() if times >= threshold]
+
+    def record(self, statement: str, duration: float):
+        self.statements.append((statement, duration))
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect every statement executed in the current context (and its child tasks) until exit."""
+    stats = QueryStats()
+    token = _active_stats.set(_active_stats.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryStats]:
+    """Fail if the block runs more than `limit` SQL statements; used to pin per-endpoint query budgets."""
+    with track_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        executed = "\n".join(f"  {statement}" for statement, _ in stats.statements)
+        raise AssertionError(f"Expected at most {limit} queries, {stats.count} were executed:\n{executed}")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if is_transaction_control(statement):
+        return
+    duration = time.perf_counter() - context._query_start
+    DB_QUERY_DURATION.observe(duration)
+    if duration * 1000 >= settings.slow_query_threshold_ms:
+        DB_SLOW_QUERIES.inc()
+        logger.warning("Slow query (%.1f ms): %s", duration * 1000, statement)
+    for stats in _active_stats.get():
+        stats.record(statement, duration)
+
+
+def instrument_queries(engine: AsyncEngine):
+    """Time every statement executed through `engine` and feed the active collectors."""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware reporting the SQL work done by each HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            await self.app(scope, receive, send)
+
+        route = route_label(scope)
+        DB_QUERIES_PER_REQUEST.labels(route).observe(stats.count)
+        DB_TIME_PER_REQUEST.labels(route).observe(stats.total_time)
+        if not stats.count:
+            return
+        statement, duration = stats.slowest
+        logger.debug(
+            "%s %s: %d queries, %.1f ms in database, slowest %.1f ms: %s",
+            scope["method"], route, stats.count, stats.total_time * 1000, duration * 1000, statement,
+        )
+        repeated = stats.repeated(settings.n_plus_one_threshold)
+        if repeated:
+            DB_N_PLUS_ONE.labels(route).inc()
+            statement, times = repeated[0]
+            logger.warning("Possible N+1 in %s %s: statement ran %d times: %s", scope["method"], route, times, statement)
@@ -0,0 +1,111 @@
+from builtins import bool, dict, float, int, len, next, sorted, str, tuple
+from collections import OrderedDict
+import time
+from typing import Dict, NamedTuple, Optional
+
+from fastapi import Request, Response, status
+from settings.config import settings
+from app.utils.etag import etag_matches
+from app.utils.metrics import RESPONSE_CACHE_REQUESTS
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    status_code: int
+    media_type: Optional[str]
+    headers: Dict[str, str]
+    expires_at: float
+
+
+class ResponseCache:
+    """
+    In-memory, size-bounded LRU cache of rendered response bodies for hot GET routes.
+
+    Keys include the route, base URL, request path (each /users/{user_id} is its own entry),
+    sorted query parameters, caller role and a users-table version that `UserService` bumps
+    on every write, so a write makes all earlier entries unreachable at once; they age out
+    through LRU eviction. The cache and version are per worker process, so writes handled by
+    another worker are only picked up once the route's TTL expires; keep TTLs short.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttls: Dict[str, float], enabled: bool = True):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = ttls
+        self.enabled = enabled
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[tuple, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+
+    def bump_version(self):
+        """Invalidate every cached response; called after any write to the users table."""
+        self.version += 1
+
+    def key(self, route: str, request: Request, role: str) -> Optional[tuple]:
+        """Build the cache key for a request, or None if the route is not cached."""
+        if not self.enabled or self.ttls.get(route, 0) <= 0:
+            return None
+        return (
+            route, self.version, str(request.base_url), request.url.path,
+            tuple(sorted(request.query_params.multi_items())), role,
+        )
+
+    def lookup(self, key: Optional[tuple], if_none_match: Optional[str] = None) -> Optional[Response]:
+        """Return the cached response for `key` (or a 304 if the client's ETag matches), or None."""
+        if key is None:
+            return None
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            RESPONSE_CACHE_REQUESTS.labels(key[0], "miss").inc()
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        RESPONSE_CACHE_REQUESTS.labels(key[0], "hit").inc()
+        etag = entry.headers.get("etag")
+        if etag and etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return Response(content=entry.body, status_code=entry.status_code, media_type=entry.media_type, headers=entry.headers)
+
+    def store(self, key: Optional[tuple], response: Response):
+        """Cache a fully rendered response under `key`; bodies larger than the byte budget are skipped."""
+        if key is None or len(response.body) > self.max_bytes:
+            return
+        headers = {name: value for name, value in response.headers.items() if name not in ("content-length", "content-type")}
+        entry = CachedResponse(response.body, response.status_code, response.media_type, headers, time.monotonic() + self.ttls[key[0]])
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._bytes += len(entry.body)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+
+response_cache = ResponseCache(
+    max_entries=settings.response_cache_max_entries,
+    max_bytes=settings.response_cache_max_bytes,
+    ttls=settings.response_cache_ttls,
+    enabled=settings.response_cache_enabled,
+)
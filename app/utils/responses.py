@@ -0,0 +1,26 @@
+from builtins import isinstance
+from typing import Any
+from pydantic import BaseModel
+from pydantic_core import to_json
+from starlette.responses import JSONResponse
+from app.utils.server_timing import timed
+
+
+class ModelJSONResponse(JSONResponse):
+    """
+    JSON response rendered directly to bytes by pydantic-core.
+
+    Routes can hand a Pydantic model straight to this class; its compiled
+    serializer writes JSON bytes in a single pass instead of going through
+    `jsonable_encoder` into Python primitives and then `json.dumps`. Any other
+    content (dicts, lists, UUIDs, datetimes, enums) is serialized with
+    `pydantic_core.to_json`, so it is also safe to use as the application-wide
+    default response class.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        with timed("serialize"):
+            if isinstance(content, BaseModel):
+                return content.__pydantic_serializer__.to_json(content)
+            return to_json(content)
@@ -0,0 +1,164 @@
+"""
+Lightweight asyncio scheduler for periodic maintenance jobs.
+
+Every worker process runs a `Scheduler`, but jobs only run in the one that holds the leader
+lock: a PostgreSQL session-level advisory lock kept on a dedicated connection. The other
+workers retry the lock every `election_interval` seconds and take over when the leader's
+connection goes away (worker exit or crash), so jobs keep running on exactly one worker.
+Session-level advisory locks need a direct connection; through PgBouncer in transaction
+pooling mode the lock would not stick to the session. SQLite has no advisory locks and is
+single-host, so every scheduler on SQLite considers itself leader.
+
+Each job sleeps `interval` seconds, randomized by +/- `jitter` (a fraction of the interval) so
+runs do not line up with each other or with other deployments, and is cancelled after
+`timeout` seconds. Runs, durations, timeouts and failures are exported as Prometheus metrics.
+"""
+from builtins import Exception, bool, float, int, isinstance, len, str
+import asyncio
+from contextlib import suppress
+import hashlib
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.utils.metrics import (
+    SCHEDULER_JOB_DURATION, SCHEDULER_JOB_LAST_SUCCESS, SCHEDULER_JOB_ROWS, SCHEDULER_JOB_RUNS, SCHEDULER_LEADER
+)
+
+logger = logging.getLogger(__name__)
+
+
+def advisory_lock_key(name: str) -> int:
+    """Stable signed 64-bit key for `pg_try_advisory_lock`, derived from a lock name."""
+    return int.from_bytes(hashlib.sha256(name.encode("utf-8")).digest()[:8], "big", signed=True)
+
+
+class Job(NamedTuple):
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    interval: float
+    timeout: float
+    jitter: float
+
+
+class Scheduler:
+    def __init__(self, engine: AsyncEngine, lock_name: str = "app.scheduler", election_interval: float = 15.0):
+        self.engine = engine
+        self.lock_key = advisory_lock_key(lock_name)
+        self.election_interval = election_interval
+        self.jobs: Dict[str, Job] = {}
+        self.is_leader = False
+        self._connection: Optional[AsyncConnection] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def add(self, name: str, run: Callable[[], Awaitable[Any]], interval: float, timeout: float, jitter: float = 0.1):
+        """
+        Register `run` to be awaited every `interval` seconds; an interval of 0 or less leaves
+        the job disabled. If `run` returns an int it is counted as rows changed.
+        """
+        if interval > 0:
+            self.jobs[name] = Job(name, run, interval, timeout, jitter)
+
+    def start(self):
+        """Start leader election and one loop per job on the running event loop."""
+        self._tasks = [asyncio.create_task(self._elect_forever(), name="scheduler-election")]
+        self._tasks += [asyncio.create_task(self._run_forever(job), name=f"scheduler-{job.name}") for job in self.jobs.values()]
+        logger.info("Scheduler started with %d jobs", len(self.jobs))
+
+    async def stop(self):
+        """Cancel all loops, wait for running jobs to unwind, then give up leadership."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self._resign()
+
+    async def elect(self) -> bool:
+        """Try to become (or confirm this worker is still) the leader; returns `is_leader`."""
+        if self.engine.dialect.name != "postgresql":
+            self._set_leader(True)
+            return True
+        if self._connection is not None:
+            try:
+                await self._connection.scalar(select(1))
+                await self._connection.commit()
+                return True
+            except Exception:
+                logger.warning("Scheduler lost its leader connection")
+                await self._resign()
+        connection = await self.engine.connect()
+        try:
+            acquired = await connection.scalar(select(func.pg_try_advisory_lock(self.lock_key)))
+            # The lock belongs to the session, not the transaction: end the transaction so the
+            # held connection does not sit idle in one
+            await connection.commit()
+        except Exception:
+            await connection.close()
+            raise
+        if acquired:
+            self._connection = connection
+            logger.info("Scheduler leadership acquired")
+        else:
+            await connection.close()
+        self._set_leader(acquired)
+        return acquired
+
+    async def run_job(self, job: Job) -> str:
+        """Run one job with its timeout and record the outcome; returns success, timeout or failure."""
+        start = time.perf_counter()
+        try:
+            changed = await asyncio.wait_for(job.run(), job.timeout)
+        except asyncio.TimeoutError:
+            result = "timeout"
+            logger.warning("Background job %s timed out after %.1fs", job.name, job.timeout)
+        except Exception:
+            result = "failure"
+            logger.exception("Background job %s failed", job.name)
+        else:
+            result = "success"
+            SCHEDULER_JOB_LAST_SUCCESS.labels(job.name).set(time.time())
+            if isinstance(changed, int) and changed:
+                SCHEDULER_JOB_ROWS.labels(job.name).inc(changed)
+                logger.info("Background job %s changed %d rows", job.name, changed)
+        elapsed = time.perf_counter() - start
+        SCHEDULER_JOB_DURATION.labels(job.name).observe(elapsed)
+        SCHEDULER_JOB_RUNS.labels(job.name, result).inc()
+        return result
+
+    async def _elect_forever(self):
+        while True:
+            try:
+                await self.elect()
+            except Exception:
+                logger.exception("Scheduler leader election failed")
+                self._set_leader(False)
+            await asyncio.sleep(self.election_interval)
+
+    async def _run_forever(self, job: Job):
+        # A random first delay spreads job starts across the interval after a deploy
+        await asyncio.sleep(random.uniform(0, job.interval))
+        while True:
+            if self.is_leader:
+                await self.run_job(job)
+            await asyncio.sleep(job.interval * random.uniform(1 - job.jitter, 1 + job.jitter))
+
+    async def _resign(self):
+        connection, self._connection = self._connection, None
+        self._set_leader(False)
+        if connection is None:
+            return
+        # Closing the connection releases the lock too, so a broken connection is fine here
+        with suppress(Exception):
+            await connection.scalar(select(func.pg_advisory_unlock(self.lock_key)))
+            await connection.commit()
+        with suppress(Exception):
+            await connection.close()
+
+    def _set_leader(self, leader: bool):
+        if leader != self.is_leader:
+            SCHEDULER_LEADER.set(1 if leader else 0)
+        self.is_leader = leader
@@ -1,12 +1,32 @@
 # app/security.py
-from builtins import Exception, ValueError, bool, int, str
+from builtins import Exception, OSError, OverflowError, ValueError, bool, int, len, str
+import asyncio
+import base64
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+from datetime import datetime, timezone
+import hashlib
+import hmac
+import re
 import secrets
+import threading
+import time
+from typing import Optional
 import bcrypt
 from logging import getLogger
+from settings.config import settings
+from app.utils.metrics import BCRYPT_DURATION, BCRYPT_IN_PROGRESS, BCRYPT_WAITING, SIGNED_TOKEN_REJECTIONS
+from app.utils.server_timing import record_phase
+from app.utils.tracing import traced
 
 # Set up logging
 logger = getLogger(__name__)
 
+# bcrypt is CPU-bound and would stall every request on the event loop, so request handlers run
+# it on these threads; once all are busy further calls wait in the executor's queue
+_bcrypt_executor = ThreadPoolExecutor(max_workers=settings.bcrypt_max_threads, thread_name_prefix="bcrypt")
+
+@traced()
 def hash_password(password: str, rounds: int = 12) -> str:
     """
     Hashes a password using bcrypt with a specified cost factor.
@@ -21,6 +41,8 @@ def hash_password(password: str, rounds: int = 12) -> str:
     Raises:
         ValueError: If hashing the password fails.
     """
+    BCRYPT_IN_PROGRESS.labels("hash").inc()
+    start = time.perf_counter()
     try:
         salt = bcrypt.gensalt(rounds=rounds)
         hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
@@ -28,7 +50,13 @@ def hash_password(password: str, rounds: int = 12) -> str:
     except Exception as e:
         logger.error("Failed to hash password: %s", e)
         raise ValueError("Failed to hash password") from e
+    finally:
+        BCRYPT_IN_PROGRESS.labels("hash").dec()
+        elapsed = time.perf_counter() - start
+        BCRYPT_DURATION.labels("hash").observe(elapsed)
+        record_phase("hash", elapsed)
 
+@traced()
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verifies a plain text password against a hashed password.
@@ -43,11 +71,108 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Raises:
         ValueError: If the hashed password format is incorrect or the function fails to verify.
     """
+    BCRYPT_IN_PROGRESS.labels("verify").inc()
+    start = time.perf_counter()
     try:
         return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
     except Exception as e:
         logger.error("Error verifying password: %s", e)
         raise ValueError("Authentication process encountered an unexpected error") from e
+    finally:
+        BCRYPT_IN_PROGRESS.labels("verify").dec()
+        elapsed = time.perf_counter() - start
+        BCRYPT_DURATION.labels("verify").observe(elapsed)
+        record_phase("hash", elapsed)
+
+async def _run_bcrypt(operation: str, func, *args):
+    """Run `func` on a bcrypt thread, counting the call in `BCRYPT_WAITING` until a thread picks it up."""
+    BCRYPT_WAITING.labels(operation).inc()
+    dequeued = threading.Lock()
+
+    def leave_queue():
+        # Called by the thread when it starts, or on the loop if the call is cancelled before; only the first counts
+        if dequeued.acquire(blocking=False):
+            BCRYPT_WAITING.labels(operation).dec()
+
+    def run():
+        leave_queue()
+        return func(*args)
+
+    context = contextvars.copy_context()  # keeps the request's timings and trace span
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_bcrypt_executor, context.run, run)
+    finally:
+        leave_queue()
+
+async def hash_password_async(password: str, rounds: int = 12) -> str:
+    """`hash_password` off the event loop, on the bounded bcrypt thread pool."""
+    return await _run_bcrypt("hash", hash_password, password, rounds)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """`verify_password` off the event loop, on the bounded bcrypt thread pool."""
+    return await _run_bcrypt("verify", verify_password, plain_password, hashed_password)
+
+# Shape of `generate_verification_token` output: 16 random bytes, URL-safe base64 without padding
+_LEGACY_TOKEN = re.compile(r"[A-Za-z0-9_-]{22}")
 
 def generate_verification_token():
-    return secrets.token_urlsafe(16)  # Generates a secure 16-byte URL-safe token
\ No newline at end of file
+    return secrets.token_urlsafe(16)  # Generates a secure 16-byte URL-safe token
+
+def hash_token(token: str) -> str:
+    """SHA-256 hex digest stored in place of a mailed token; tokens are random, so no salt or slow hash is needed."""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+def _token_signature(purpose: str, subject: str, nonce: str, expires: str) -> str:
+    message = f"{purpose}:{subject}:{nonce}:{expires}".encode('utf-8')
+    digest = hmac.new(settings.secret_key.encode('utf-8'), message, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b'=').decode('ascii')
+
+def sign_token(purpose: str, subject: str, expires_at: datetime) -> str:
+    """
+    Random token for an emailed link, HMAC-signed together with its purpose, subject and expiry.
+
+    The format is `<nonce>.<expiry, unix seconds in hex>.<signature>`, all URL-safe. A link
+    can be checked with `verify_signed_token` without touching the database.
+    """
+    nonce = generate_verification_token()
+    expires = f"{int(expires_at.timestamp()):x}"
+    return f"{nonce}.{expires}.{_token_signature(purpose, subject, nonce, expires)}"
+
+def signed_token_expiry(token: str) -> Optional[datetime]:
+    """Expiry carried by a token from `sign_token`, or None if it is malformed."""
+    parts = token.split('.')
+    if len(parts) != 3:
+        return None
+    try:
+        return datetime.fromtimestamp(int(parts[1], 16), timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        return None
+
+def is_legacy_token(token: str) -> bool:
+    """
+    True for an unsigned `generate_verification_token` token, as mailed before tokens were
+    signed, while `legacy_token_valid_until` has not passed. The user_tokens migration carried
+    their rows over with a 48h expiry; after the cutoff they are rejected like any malformed
+    token, without a database lookup.
+    """
+    cutoff = settings.legacy_token_valid_until
+    if cutoff is None or _LEGACY_TOKEN.fullmatch(token) is None:
+        return False
+    if cutoff.tzinfo is None:
+        cutoff = cutoff.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) < cutoff
+
+def verify_signed_token(token: str, purpose: str, subject: str) -> bool:
+    """True if `token` was signed for this purpose and subject and has not expired; no I/O."""
+    expires_at = signed_token_expiry(token)
+    if expires_at is None:
+        SIGNED_TOKEN_REJECTIONS.labels(purpose, "malformed").inc()
+        return False
+    if expires_at <= datetime.now(timezone.utc):
+        SIGNED_TOKEN_REJECTIONS.labels(purpose, "expired").inc()
+        return False
+    nonce, expires, signature = token.split('.')
+    if not hmac.compare_digest(signature.encode('utf-8'), _token_signature(purpose, subject, nonce, expires).encode('ascii')):
+        SIGNED_TOKEN_REJECTIONS.labels(purpose, "signature").inc()
+        return False
+    return True
@@ -0,0 +1,111 @@
+"""
+Per-request latency breakdown reported through the `Server-Timing` response header.
+
+Code on the request path records time into named phases with `timed` or `record_phase`;
+`ServerTimingMiddleware` adds the database time collected by `track_queries` and the total,
+then emits the header when `server_timing_enabled` is set or when an admin sends
+`X-Server-Timing: 1`. Requests slower than `slow_request_threshold_ms` are logged with the
+same breakdown either way.
+"""
+from builtins import bool, float, str
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+import time
+from typing import Dict, Iterator, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.utils.metrics import route_label
+from app.utils.query_stats import track_queries
+from settings.config import settings
+
+logger = logging.getLogger(__name__)
+
+TIMING_REQUEST_HEADER = "x-server-timing"
+# Order phases appear in the header; anything else recorded is appended after these
+PHASES = ("auth", "db", "hash", "template", "smtp", "serialize")
+
+
+class RequestTimings:
+    """Seconds spent in each phase of the current request, plus the caller's role once known."""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.role: Optional[str] = None
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def header_value(self, total: float) -> str:
+        names = [phase for phase in PHASES if phase in self.phases]
+        names += [phase for phase in self.phases if phase not in PHASES]
+        metrics = [f"{phase};dur={self.phases[phase] * 1000:.1f}" for phase in names]
+        metrics.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(metrics)
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current_timings.get()
+
+
+def record_phase(phase: str, seconds: float):
+    """Add already-measured time to a phase of the current request, if there is one."""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Attribute the time spent in the block to `phase` of the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter() - start)
+
+
+class ServerTimingMiddleware:
+    """Pure ASGI middleware adding the `Server-Timing` header and logging slow requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        requested = Headers(scope=scope).get(TIMING_REQUEST_HEADER) == "1"
+        start = time.perf_counter()
+
+        with track_queries() as stats:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start" and self._should_emit(timings, requested):
+                    timings.phases["db"] = stats.total_time
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", timings.header_value(time.perf_counter() - start)
+                    )
+                await send(message)
+
+            token = _current_timings.set(timings)
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                _current_timings.reset(token)
+
+        total = time.perf_counter() - start
+        if total * 1000 >= settings.slow_request_threshold_ms:
+            timings.phases["db"] = stats.total_time
+            logger.warning(
+                "Slow request %s %s: %s", scope["method"], route_label(scope), timings.header_value(total)
+            )
+
+    @staticmethod
+    def _should_emit(timings: RequestTimings, requested: bool) -> bool:
+        return settings.server_timing_enabled or (requested and timings.role == "ADMIN")
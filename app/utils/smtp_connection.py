@@ -1,11 +1,17 @@
 # smtp_client.py
 from builtins import Exception, int, str
 import smtplib
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from settings.config import settings
+from app.utils.metrics import SMTP_SEND_DURATION, SMTP_SEND_FAILURES
+from app.utils.server_timing import record_phase
+from app.utils.tracing import traced
 import logging
 
+logger = logging.getLogger(__name__)
+
 class SMTPClient:
     def __init__(self, server: str, port: int, username: str, password: str):
         self.server = server
@@ -13,7 +19,9 @@ class SMTPClient:
         self.username = username
         self.password = password
 
+    @traced()
     def send_email(self, subject: str, html_content: str, recipient: str):
+        start = time.perf_counter()
         try:
             message = MIMEMultipart('alternative')
             message['Subject'] = subject
@@ -25,7 +33,12 @@ class SMTPClient:
                 server.starttls()  # Use TLS
                 server.login(self.username, self.password)
                 server.sendmail(self.username, recipient, message.as_string())
-            logging.info(f"Email sent to {recipient}")
+            logger.info("Email sent to %s", recipient)
         except Exception as e:
-            logging.error(f"Failed to send email: {str(e)}")
+            SMTP_SEND_FAILURES.inc()
+            logger.error("Failed to send email: %s", e)
             raise
+        finally:
+            elapsed = time.perf_counter() - start
+            SMTP_SEND_DURATION.observe(elapsed)
+            record_phase("smtp", elapsed)
@@ -0,0 +1,125 @@
+"""
+Non-blocking logging pipeline.
+
+Records are handed to a `QueueHandler` on the calling thread and written by a
+`QueueListener` thread, so JSON encoding and stdout I/O never run on the event loop. On the
+calling side only the cheap steps remain: %-interpolating the message (log with `%s` args,
+not f-strings, so disabled levels cost nothing), stamping the request id and sampling.
+"""
+from builtins import bool, dict, float, frozenset, getattr, int, len, max, next, round, str
+import copy
+import itertools
+import json
+import logging
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import Dict, Optional
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+# Attributes every LogRecord has; anything else on a record came from `extra=` and is emitted as a field
+_RECORD_ATTRIBUTES = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "request_id"}
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp each record with the id of the request being handled, if any."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of DEBUG/INFO records from chatty loggers.
+
+    `rates` maps logger names to the fraction kept (the longest matching prefix applies, so
+    "app.services" covers "app.services.user_service"). Sampling is deterministic, e.g. 0.1
+    keeps every tenth record; warnings and errors always pass.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._intervals: Dict[str, int] = {}
+        self._counters: Dict[str, itertools.count] = {}
+
+    def _interval(self, name: str) -> int:
+        interval = self._intervals.get(name)
+        if interval is None:
+            matches = [prefix for prefix in self.rates if name == prefix or name.startswith(prefix + ".")]
+            rate = self.rates[max(matches, key=len)] if matches else 1.0
+            interval = 0 if rate <= 0 else max(1, round(1 / rate))
+            self._intervals[name] = interval
+            self._counters[name] = itertools.count()
+        return interval
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        interval = self._interval(record.name)
+        if interval == 1:
+            return True
+        if interval == 0:
+            return False
+        return next(self._counters[record.name]) % interval == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            payload["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(payload, default=str)
+
+
+class LazyQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The base class runs the formatter here, on the calling thread; only resolve the
+        # message so mutable args cannot change before the listener writes the record.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging(level: str = "INFO", json_output: bool = True,
+                      sample_rates: Optional[Dict[str, float]] = None, stream=None) -> QueueListener:
+    """Route all logging through a queue to a stream handler on a background thread and start it."""
+    queue: SimpleQueue = SimpleQueue()
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if json_output else logging.Formatter(TEXT_FORMAT))
+
+    handler = LazyQueueHandler(queue)
+    handler.addFilter(RequestContextFilter())
+    if sample_rates:
+        handler.addFilter(SamplingFilter(sample_rates))
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    listener = QueueListener(queue, output, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -1,5 +1,7 @@
 import markdown2
 from pathlib import Path
+from app.utils.server_timing import timed
+from app.utils.tracing import traced
 
 class TemplateManager:
     def __init__(self):
@@ -32,8 +34,13 @@ class TemplateManager:
                 styled_html = styled_html.replace(f'<{tag}>', f'<{tag} style="{style}">')
         return styled_html
 
+    @traced()
     def render_template(self, template_name: str, **context) -> str:
         """Render a markdown template with given context, applying advanced email styles."""
+        with timed("template"):
+            return self._render(template_name, **context)
+
+    def _render(self, template_name: str, **context) -> str:
         header = self._read_template('header.md')
         footer = self._read_template('footer.md')
 
@@ -0,0 +1,210 @@
+"""
+OpenTelemetry tracing with a local JSON-lines exporter.
+
+Tracing is off unless `tracing_enabled` is set; `configure_tracing` then installs a tracer
+provider that batches finished spans into `trace_export_path`, one OTLP-style JSON object per
+line, so critical paths can be analysed offline (see `benchmarks/trace_report.py`) without a
+collector. The trace id is taken from nginx's `X-Request-ID` (or a W3C `traceparent`), so
+spans line up with proxy access logs.
+"""
+from builtins import ValueError, bool, getattr, int, isinstance, len, list, open, setattr, str, vars
+import functools
+import inspect
+import os
+import random
+import threading
+import uuid
+from typing import Optional, Sequence
+
+from opentelemetry import context as otel_context, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.utils.metrics import route_label
+from app.utils.query_stats import is_transaction_control
+from app.utils.structured_logging import request_id_var
+from settings.config import settings
+
+REQUEST_ID_HEADER = "x-request-id"
+
+_provider: Optional[TracerProvider] = None
+_tracer: Optional[trace.Tracer] = None
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Append finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        with self._lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(lines)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        pass
+
+
+def configure_tracing(exporter: Optional[SpanExporter] = None, batch: bool = True) -> TracerProvider:
+    """Start recording spans into `exporter` (by default the JSON-lines file from settings)."""
+    global _provider, _tracer
+    shutdown_tracing()
+    exporter = exporter or JsonLinesSpanExporter(settings.trace_export_path)
+    _provider = TracerProvider(resource=Resource.create({"service.name": "user-management"}))
+    _provider.add_span_processor(BatchSpanProcessor(exporter) if batch else SimpleSpanProcessor(exporter))
+    _tracer = _provider.get_tracer("app")
+    return _provider
+
+
+def shutdown_tracing():
+    """Flush pending spans and stop tracing."""
+    global _provider, _tracer
+    if _provider is not None:
+        _provider.shutdown()
+    _provider = None
+    _tracer = None
+
+
+def traced(name: Optional[str] = None):
+    """Record a span around every call of the decorated function (sync or async)."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _tracer is None:
+                    return await func(*args, **kwargs)
+                with _tracer.start_as_current_span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with _tracer.start_as_current_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def traced_classmethods(cls):
+    """Class decorator tracing every public async classmethod as `ClassName.method`."""
+    for name, attribute in list(vars(cls).items()):
+        if name.startswith("_") or not isinstance(attribute, classmethod):
+            continue
+        if inspect.iscoroutinefunction(attribute.__func__):
+            setattr(cls, name, classmethod(traced(f"{cls.__name__}.{name}")(attribute.__func__)))
+    return cls
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _tracer is not None and not is_transaction_control(statement):
+        context._trace_span = _tracer.start_span(
+            statement.split(None, 1)[0] if statement else "query", kind=SpanKind.CLIENT,
+            attributes={"db.system": conn.dialect.name, "db.statement": statement},
+        )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = getattr(context, "_trace_span", None)
+    if span is not None:
+        span.end()
+
+
+def _handle_error(exception_context):
+    span = getattr(exception_context.execution_context, "_trace_span", None)
+    if span is not None:
+        span.record_exception(exception_context.original_exception)
+        span.set_status(Status(StatusCode.ERROR))
+        span.end()
+
+
+def trace_queries(engine: AsyncEngine):
+    """Record a client span for every statement executed through `engine`."""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def _parent_context(headers: Headers, request_id: str) -> otel_context.Context:
+    """Continue a W3C trace if one was sent, otherwise use the request id as the trace id."""
+    if "traceparent" in headers:
+        return TraceContextTextMapPropagator().extract(headers)
+    try:
+        trace_id = int(request_id.replace("-", ""), 16)
+    except ValueError:
+        trace_id = 0
+    if len(request_id.replace("-", "")) != 32 or trace_id == 0:
+        return otel_context.get_current()
+    parent = trace.SpanContext(
+        trace_id=trace_id, span_id=random.getrandbits(64), is_remote=True,
+        trace_flags=trace.TraceFlags(trace.TraceFlags.SAMPLED),
+    )
+    return trace.set_span_in_context(trace.NonRecordingSpan(parent))
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware opening the server span for each request.
+
+    The request id from nginx (or a generated one) is echoed back in `X-Request-ID` and exposed
+    to log records through `request_id_var`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        request_id = headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            if _tracer is None:
+                await self.app(scope, receive, send_wrapper)
+                return
+
+            with _tracer.start_as_current_span(
+                scope["method"], context=_parent_context(headers, request_id), kind=SpanKind.SERVER,
+                attributes={"http.request.method": scope["method"], "url.path": scope["path"], "http.request_id": request_id},
+            ) as span:
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    route = route_label(scope)
+                    span.update_name(f"{scope['method']} {route}")
+                    span.set_attribute("http.route", route)
+                    span.set_attribute("http.response.status_code", status_code)
+                    if status_code >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,55 @@
+"""
+Server process used by `benchmarks.load_test`.
+
+Runs `app.main:app` under uvicorn with outgoing email replaced by an in-memory SMTP sink,
+so scenarios that send mail measure template rendering and a configurable, blocking send
+delay (like smtplib's) instead of a real mail server.
+
+    python -m benchmarks.bench_server --port 8001 --smtp-latency-ms 50
+"""
+from builtins import float, int, str
+import argparse
+import time
+
+import uvicorn
+
+from app.dependencies import get_email_service
+from app.main import app
+from app.services.email_service import EmailService
+from app.utils.template_manager import TemplateManager
+
+
+class SinkSMTPClient:
+    """Stand-in for `SMTPClient` that keeps messages in memory after a blocking delay."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.sent = 0
+
+    def send_email(self, subject: str, html_content: str, recipient: str):
+        if self.latency:
+            time.sleep(self.latency)
+        self.sent += 1
+
+
+def install_smtp_sink(latency: float):
+    def sink_email_service() -> EmailService:
+        email_service = EmailService(template_manager=TemplateManager())
+        email_service.smtp_client = SinkSMTPClient(latency)
+        return email_service
+
+    app.dependency_overrides[get_email_service] = sink_email_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--smtp-latency-ms", type=float, default=0.0, help="Blocking delay per email sent")
+    args = parser.parse_args()
+    install_smtp_sink(args.smtp_latency_ms / 1000)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Micro-benchmarks for hot functions, with stored baselines and a regression check.
+
+Each benchmark is calibrated so one round lasts at least --min-time seconds, then timed for
+--rounds rounds. The fastest round's per-call time (`min_us`) is what gets compared: noise
+from other load on the machine only ever makes rounds slower, so the minimum is far more
+repeatable than the median. What remains (CPU frequency scaling, cache and allocator state)
+still moves it by several percent between otherwise identical runs, hence the default 20%
+tolerance. Baselines are only comparable on the same machine and Python version, so refresh
+them when either changes, and run compare on an otherwise idle machine: work competing for
+every CPU slows even the fastest round.
+
+Run from the project root:
+
+    python -m benchmarks.micro_bench run                      # print results as JSON
+    python -m benchmarks.micro_bench run --save               # store as the baseline
+    python -m benchmarks.micro_bench compare --threshold 20   # exit 1 on >20% slowdowns
+"""
+from builtins import dict, float, int, max, min, open, print, range, round, sorted, str
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from fastapi import Request
+
+from app.main import app
+from app.models.user_model import User, UserRole
+from app.schemas.user_schemas import UserResponse
+from app.services.jwt_service import create_access_token, decode_token
+from app.utils.link_generation import build_link_templates, create_user_links, generate_pagination_links
+from app.utils.nickname_gen import generate_nickname
+from app.utils.security import hash_password, verify_password
+from app.utils.template_manager import TemplateManager
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "micro.json")
+PASSWORD = "MySuperPassword$1234"
+
+
+def make_request(query_string: bytes = b"") -> Request:
+    return Request({
+        "type": "http", "app": app, "scheme": "http", "server": ("testserver", 80), "root_path": "",
+        "path": "/users/", "query_string": query_string, "headers": [],
+    })
+
+
+def make_users(count: int) -> List[User]:
+    now = datetime.now(timezone.utc)
+    return [
+        User(
+            id=uuid.uuid4(), nickname=f"bench_user_{i}", email=f"bench_user_{i}@example.com", first_name="Bench",
+            last_name="User", bio="Experienced software developer.", role=UserRole.AUTHENTICATED,
+            is_professional=False, created_at=now, updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def benchmarks() -> Dict[str, Callable[[], object]]:
+    """Name -> zero-argument callable; setup happens here, outside the timed region."""
+    build_link_templates(app)
+    hashed = hash_password(PASSWORD)
+    templates = TemplateManager()
+    request = make_request()
+    page_request = make_request(b"skip=40&limit=20")
+    user_id = uuid.uuid4()
+    users = make_users(100)
+    token = create_access_token(data={"sub": "bench@example.com", "role": "ADMIN"})
+
+    return {
+        "hash_password": lambda: hash_password(PASSWORD),
+        "verify_password": lambda: verify_password(PASSWORD, hashed),
+        "render_template": lambda: templates.render_template(
+            "email_verification", name="Bench", verification_url="http://localhost/verify-email/x/y", email="bench@example.com"
+        ),
+        "create_user_links": lambda: create_user_links(user_id, request),
+        "generate_pagination_links": lambda: generate_pagination_links(page_request, 40, 20, 1000),
+        "user_response_validate_100": lambda: [UserResponse.model_validate(user) for user in users],
+        "decode_token": lambda: decode_token(token),
+        "generate_nickname": generate_nickname,
+    }
+
+
+def time_benchmark(func: Callable[[], object], rounds: int, min_time: float) -> dict:
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        iterations = max(iterations * 2, int(iterations * min_time / max(elapsed, 1e-9)))
+
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        per_call.append((time.perf_counter() - start) / iterations)
+    return {
+        "median_us": round(statistics.median(per_call) * 1e6, 3),
+        "min_us": round(min(per_call) * 1e6, 3),
+        "stdev_us": round(statistics.stdev(per_call) * 1e6, 3) if rounds > 1 else 0.0,
+        "iterations": iterations,
+        "rounds": rounds,
+    }
+
+
+def run(selected: Optional[List[str]], rounds: int, min_time: float) -> dict:
+    available = benchmarks()
+    names = selected or sorted(available)
+    return {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "processor": platform.machine()},
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "results": {name: time_benchmark(available[name], rounds, min_time) for name in names},
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> dict:
+    """Per-benchmark change in fastest-round time; regressions are slowdowns beyond `threshold` percent."""
+    rows = {}
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            rows[name] = {"min_us": result["min_us"], "baseline_us": None, "change_pct": None, "regression": False}
+            continue
+        change = (result["min_us"] - base["min_us"]) / base["min_us"] * 100
+        rows[name] = {
+            "min_us": result["min_us"],
+            "baseline_us": base["min_us"],
+            "change_pct": round(change, 1),
+            "regression": change > threshold,
+        }
+    return {"threshold_pct": threshold, "benchmarks": rows, "regressions": sorted(n for n, r in rows.items() if r["regression"])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["run", "compare"])
+    parser.add_argument("--only", help="Comma-separated benchmark names to run")
+    parser.add_argument("--rounds", type=int, default=15, help="Timed rounds per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per round")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file to save to / compare against")
+    parser.add_argument("--save", action="store_true", help="With run: write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=float(os.environ.get("MICRO_BENCH_THRESHOLD", 20.0)),
+                        help="Allowed slowdown of min_us in percent before compare fails (default: $MICRO_BENCH_THRESHOLD or 20)")
+    args = parser.parse_args()
+    selected = [name.strip() for name in args.only.split(",")] if args.only else None
+
+    current = run(selected, args.rounds, args.min_time)
+    if args.command == "run":
+        if args.save:
+            with open(args.baseline, "w", encoding="utf-8") as file:
+                json.dump(current, file, indent=2)
+                file.write("\n")
+        print(json.dumps(current, indent=2))
+        return
+
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    report = compare(baseline, current, args.threshold)
+    print(json.dumps(report, indent=2))
+    if report["regressions"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
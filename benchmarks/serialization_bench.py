@@ -0,0 +1,96 @@
+"""
+Serialization throughput for a 100-item `GET /users/` page.
+
+Compares FastAPI's default rendering path (response_model validation, `field.serialize`
+to Python primitives, then `json.dumps` inside `JSONResponse`) with handing the model
+straight to `ModelJSONResponse`, which writes JSON bytes in one pass.
+
+Run from the project root:
+
+    python -m benchmarks.serialization_bench --items 100 --rounds 500
+"""
+from builtins import int, print, range, str
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from starlette.responses import JSONResponse
+
+from app.models.user_model import User, UserRole
+from app.schemas.user_schemas import UserListResponse, UserResponse
+from app.utils.responses import ModelJSONResponse
+
+
+def build_page(items: int) -> UserListResponse:
+    now = datetime.now(timezone.utc)
+    users = []
+    for i in range(items):
+        user = User(
+            id=uuid.uuid4(),
+            nickname=f"bench_user_{i}",
+            email=f"bench_user_{i}@example.com",
+            first_name="Bench",
+            last_name="User",
+            bio="Experienced software developer specializing in web applications.",
+            profile_picture_url="https://example.com/profiles/bench.jpg",
+            linkedin_profile_url="https://linkedin.com/in/bench",
+            github_profile_url="https://github.com/bench",
+            role=UserRole.AUTHENTICATED,
+            is_professional=False,
+            created_at=now,
+            updated_at=now,
+        )
+        users.append(UserResponse.model_validate(user))
+    return UserListResponse(items=users, total=items, page=1, size=items)
+
+
+async def default_path(field, page: UserListResponse) -> bytes:
+    content = await serialize_response(field=field, response_content=page)
+    return JSONResponse(content).body
+
+
+def model_path(page: UserListResponse) -> bytes:
+    return ModelJSONResponse(page).body
+
+
+def run(items: int, rounds: int) -> dict:
+    page = build_page(items)
+    field = create_response_field(name="Response_list_users", type_=UserListResponse)
+
+    async def time_default() -> float:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await default_path(field, page)
+        return time.perf_counter() - start
+
+    default_seconds = asyncio.run(time_default())
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        model_path(page)
+    model_seconds = time.perf_counter() - start
+
+    return {
+        "items_per_page": items,
+        "rounds": rounds,
+        "default_pages_per_sec": round(rounds / default_seconds, 1),
+        "model_json_pages_per_sec": round(rounds / model_seconds, 1),
+        "speedup": round(default_seconds / model_seconds, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100, help="Users per page")
+    parser.add_argument("--rounds", type=int, default=500, help="Pages rendered per path")
+    args = parser.parse_args()
+    print(json.dumps(run(args.items, args.rounds), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Python-side cost of preparing the hot `UserService` queries for execution.
+
+For each query the "dynamic" variant rebuilds the statement the way the service used to
+(`select(User).filter_by(...)` and friends) and the "cached" variant reuses the predefined
+statement. Both then go through the compiled-cache lookup `session.execute` performs:
+generate the cache key, look it up, and return the compiled SQL. No database is involved,
+so the difference is the per-query Python overhead saved.
+
+Run from the project root:
+
+    python -m benchmarks.statement_bench --rounds 20000
+"""
+from builtins import dict, getattr, int, list, print, range, round, str, tuple
+import argparse
+import json
+import time
+import uuid
+from typing import Callable, Dict, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+from sqlalchemy.util import LRUCache
+
+from app.models.user_model import User
+from app.schemas.user_schemas import USER_RESPONSE_FIELDS
+from app.services import user_service
+
+FIELDS = list(USER_RESPONSE_FIELDS) + ["updated_at"]
+
+
+def queries() -> Dict[str, Tuple[Callable[[], object], Callable[[], object]]]:
+    """Name -> (dynamic builder, cached builder)."""
+    user_id = uuid.uuid4()
+    fields = tuple(FIELDS)
+    return {
+        "get_by_id": (
+            lambda: select(User).filter_by(id=user_id),
+            lambda: user_service._USER_BY_ID,
+        ),
+        "get_by_email": (
+            lambda: select(User).filter_by(email="bench@example.com"),
+            lambda: user_service._USER_BY_EMAIL,
+        ),
+        "get_fields_by_id": (
+            lambda: select(*[getattr(User, field) for field in FIELDS]).filter_by(id=user_id),
+            lambda: user_service._user_fields_by_id(fields),
+        ),
+        "list_user_fields": (
+            lambda: select(*[getattr(User, field) for field in FIELDS]).order_by(User.created_at, User.id).offset(0).limit(10),
+            lambda: user_service._user_fields_page(fields),
+        ),
+        "count_and_version": (
+            lambda: select(func.count(), func.max(User.updated_at)).select_from(User),
+            lambda: user_service._USER_COUNT_AND_VERSION,
+        ),
+    }
+
+
+def time_variant(build: Callable[[], object], rounds: int) -> float:
+    """Microseconds per call to build the statement and fetch its compiled form from the cache."""
+    dialect = asyncpg_dialect()
+    cache = LRUCache(500)
+    build()._compile_w_cache(dialect, compiled_cache=cache, column_keys=[])  # prime the compiled cache
+    start = time.perf_counter()
+    for _ in range(rounds):
+        build()._compile_w_cache(dialect, compiled_cache=cache, column_keys=[])
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def run(rounds: int) -> dict:
+    results = {}
+    for name, (dynamic, cached) in queries().items():
+        dynamic_us = time_variant(dynamic, rounds)
+        cached_us = time_variant(cached, rounds)
+        results[name] = {
+            "dynamic_us": round(dynamic_us, 2),
+            "cached_us": round(cached_us, 2),
+            "saved_us": round(dynamic_us - cached_us, 2),
+            "speedup": round(dynamic_us / cached_us, 1),
+        }
+    return {"rounds": rounds, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20000, help="Calls timed per query and variant")
+    args = parser.parse_args()
+    print(json.dumps(run(args.rounds), indent=2))
+
+
+if __name__ == "__main__":
+    main()
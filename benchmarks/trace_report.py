@@ -0,0 +1,93 @@
+"""
+Critical-path report for spans written by the JSON-lines trace exporter.
+
+For the slowest traces, follows the critical path from the root span (at each level, the
+child that finished last) and prints where the time went, along with the total self time
+per span name across the whole file.
+
+Run from the project root:
+
+    python -m benchmarks.trace_report traces/spans.jsonl --top 5
+"""
+from builtins import dict, float, int, len, list, max, open, print, round, sorted, str, sum
+import argparse
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List
+
+
+def load_spans(path: str) -> List[dict]:
+    spans = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            raw = json.loads(line)
+            start = datetime.fromisoformat(raw["start_time"])
+            end = datetime.fromisoformat(raw["end_time"])
+            spans.append({
+                "name": raw["name"],
+                "trace_id": raw["context"]["trace_id"],
+                "span_id": raw["context"]["span_id"],
+                "parent_id": raw["parent_id"],
+                "start": start,
+                "end": end,
+                "duration_ms": (end - start).total_seconds() * 1000,
+            })
+    return spans
+
+
+def self_time_ms(span: dict, children: Dict[str, List[dict]]) -> float:
+    return max(0.0, span["duration_ms"] - sum(child["duration_ms"] for child in children[span["span_id"]]))
+
+
+def critical_path(root: dict, children: Dict[str, List[dict]]) -> List[dict]:
+    path = []
+    span = root
+    while span is not None:
+        path.append({
+            "name": span["name"],
+            "duration_ms": round(span["duration_ms"], 2),
+            "self_ms": round(self_time_ms(span, children), 2),
+        })
+        span = max(children[span["span_id"]], key=lambda child: child["end"], default=None)
+    return path
+
+
+def report(spans: List[dict], top: int) -> dict:
+    children: Dict[str, List[dict]] = defaultdict(list)
+    span_ids = {span["span_id"] for span in spans}
+    for span in spans:
+        if span["parent_id"] in span_ids:
+            children[span["parent_id"]].append(span)
+    # Server spans whose parent came from the proxy's request id are roots too
+    roots = [span for span in spans if span["parent_id"] not in span_ids]
+    slowest = sorted(roots, key=lambda span: span["duration_ms"], reverse=True)[:top]
+
+    self_by_name: Dict[str, float] = defaultdict(float)
+    for span in spans:
+        self_by_name[span["name"]] += self_time_ms(span, children)
+
+    return {
+        "spans": len(spans),
+        "traces": len(roots),
+        "slowest": [
+            {"trace_id": root["trace_id"], "critical_path": critical_path(root, children)} for root in slowest
+        ],
+        "self_time_ms_by_span": {
+            name: round(ms, 2) for name, ms in sorted(self_by_name.items(), key=lambda item: item[1], reverse=True)
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="JSON-lines span file (trace_export_path)")
+    parser.add_argument("--top", type=int, default=5, help="Slowest traces to break down")
+    args = parser.parse_args()
+    print(json.dumps(report(load_spans(args.path), args.top), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,16 +6,28 @@ This Python test file utilizes pytest to manage database states and HTTP clients
 
 Fixtures:
 - `async_client`: Manages an asynchronous HTTP client for testing interactions with the FastAPI application.
-- `db_session`: Handles database transactions to ensure a clean database state for each test.
+- `db_connection`: Opens a connection per test inside a transaction that is rolled back afterwards.
+- `db_session`: A session bound to that connection; its commits only release savepoints, so each test sees a clean database.
 - User fixtures (`user`, `locked_user`, `verified_user`, etc.): Set up various user states to test different behaviors under diverse conditions.
 - `token`: Generates an authentication token for testing secured endpoints.
 - `initialize_database`: Prepares the database at the session start.
-- `setup_database`: Sets up and tears down the database before and after each test.
+- `database_schema`: Creates the schema once per test session (and per pytest-xdist worker).
+- `clear_response_cache`: Empties the response cache before each test.
+
+Under pytest-xdist every worker runs against its own database (e.g. myappdb_gw0), created on
+demand next to the configured one, so `pytest -n auto` needs a role allowed to create databases.
+
+The suite also runs without a database server on SQLite, e.g.
+`DATABASE_URL=sqlite+aiosqlite:///./test.db pytest`; tests marked `postgres` are then skipped.
 """
 
 # Standard library imports
 from builtins import Exception, range, str
+import asyncio
 from datetime import timedelta
+from functools import partial
+import os
+from typing import Optional
 from unittest.mock import AsyncMock, patch
 from uuid import uuid4
 
@@ -23,27 +35,74 @@ from uuid import uuid4
 import pytest
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
 from faker import Faker
 
 # Application-specific imports
 from app.main import app
-from app.database import Base, Database
+from app.database import Base, Database, configure_sqlite, is_memory_database, is_sqlite
 from app.models.user_model import User, UserRole
-from app.dependencies import get_db, get_settings
+from app.dependencies import get_db, get_session_factory, get_settings
 from app.utils.security import hash_password
 from app.utils.template_manager import TemplateManager
 from app.services.email_service import EmailService
 from app.services.jwt_service import create_access_token
+from app.utils.query_stats import instrument_queries
+from app.utils.response_cache import response_cache
+from app.utils.tracing import trace_queries
+from settings import config as settings_config
 
 fake = Faker()
 
+
+def worker_database_url(database_url: str, worker: Optional[str]) -> str:
+    """Database URL for one pytest-xdist worker (myappdb -> myappdb_gw0); unchanged without xdist."""
+    if not worker:
+        return database_url
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            return database_url  # every worker process already has its own in-memory database
+        root, extension = os.path.splitext(url.database)
+        return url.set(database=f"{root}_{worker}{extension}").render_as_string(hide_password=False)
+    return url.set(database=f"{url.database}_{worker}").render_as_string(hide_password=False)
+
+
 settings = get_settings()
-TEST_DATABASE_URL = settings.database_url.replace("postgresql://", "postgresql+asyncpg://")
-engine = create_async_engine(TEST_DATABASE_URL, echo=settings.debug)
-AsyncTestingSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-AsyncSessionScoped = scoped_session(AsyncTestingSessionLocal)
+BASE_DATABASE_URL = settings.database_url.replace("postgresql://", "postgresql+asyncpg://")
+TEST_DATABASE_URL = worker_database_url(BASE_DATABASE_URL, os.environ.get("PYTEST_XDIST_WORKER"))
+# Point the app at this worker's database: the shared settings object and every later Settings()
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+settings.database_url = TEST_DATABASE_URL
+settings_config.settings.database_url = TEST_DATABASE_URL
+
+# Each test runs on its own event loop, so connections are not pooled across tests
+# (except for in-memory SQLite, where the one shared connection is the database)
+engine = create_async_engine(
+    TEST_DATABASE_URL, echo=settings.debug, poolclass=StaticPool if is_memory_database(TEST_DATABASE_URL) else NullPool
+)
+if is_sqlite(TEST_DATABASE_URL):
+    configure_sqlite(engine)
+instrument_queries(engine)
+trace_queries(engine)
+# Joined to the per-test transaction: session commits and rollbacks only touch savepoints
+AsyncTestingSessionLocal = sessionmaker(
+    class_=AsyncSession, expire_on_commit=False, join_transaction_mode="create_savepoint"
+)
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip tests marked `postgres` when the suite runs against SQLite."""
+    if not is_sqlite(TEST_DATABASE_URL):
+        return
+    skip = pytest.mark.skip(reason="needs PostgreSQL")
+    for item in items:
+        if "postgres" in item.keywords:
+            item.add_marker(skip)
 
 
 @pytest.fixture
@@ -56,9 +115,11 @@ def email_service():
 
 # this is what creates the http client for your api tests
 @pytest.fixture(scope="function")
-async def async_client(db_session):
+async def async_client(db_connection, db_session):
     async with AsyncClient(app=app, base_url="http://testserver") as client:
         app.dependency_overrides[get_db] = lambda: db_session
+        # Background tasks get their own sessions, joined to the test's transaction as well
+        app.dependency_overrides[get_session_factory] = lambda: partial(AsyncTestingSessionLocal, bind=db_connection)
         try:
             yield client
         finally:
@@ -71,24 +132,58 @@ def initialize_database():
     except Exception as e:
         pytest.fail(f"Failed to initialize the database: {str(e)}")
 
-# this function setup and tears down (drops tales) for each test function, so you have a clean database for each test.
-@pytest.fixture(scope="function", autouse=True)
-async def setup_database():
+async def create_worker_database():
+    """Create this worker's database next to the configured one if it does not exist yet."""
+    if TEST_DATABASE_URL == BASE_DATABASE_URL or is_sqlite(TEST_DATABASE_URL):
+        return  # SQLite creates its file on first connect
+    name = make_url(TEST_DATABASE_URL).database
+    admin_engine = create_async_engine(BASE_DATABASE_URL, poolclass=NullPool, isolation_level="AUTOCOMMIT")
+    try:
+        async with admin_engine.connect() as conn:
+            exists = await conn.scalar(text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": name})
+            if not exists:
+                await conn.execute(text(f'CREATE DATABASE "{name}"'))
+    finally:
+        await admin_engine.dispose()
+
+async def create_schema():
+    await create_worker_database()
     async with engine.begin() as conn:
+        # drop first so a run interrupted before teardown cannot leave a stale schema behind
+        await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
-    yield
+
+async def drop_schema():
     async with engine.begin() as conn:
-        # you can comment out this line during development if you are debugging a single test
-         await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.drop_all)
+    # closes the connection an in-memory SQLite database keeps open
     await engine.dispose()
 
+# The schema is created once per session; tests isolate themselves through db_connection's rollback.
+@pytest.fixture(scope="session")
+def database_schema():
+    asyncio.run(create_schema())
+    yield
+    asyncio.run(drop_schema())
+
+@pytest.fixture(scope="function", autouse=True)
+def clear_response_cache():
+    # cached responses would otherwise leak between tests that recreate the same data
+    response_cache.clear()
+
 @pytest.fixture(scope="function")
-async def db_session(setup_database):
-    async with AsyncSessionScoped() as session:
+async def db_connection(database_schema):
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
         try:
-            yield session
+            yield connection
         finally:
-            await session.close()
+            await transaction.rollback()
+
+@pytest.fixture(scope="function")
+async def db_session(db_connection):
+    async with AsyncTestingSessionLocal(bind=db_connection) as session:
+        yield session
 
 @pytest.fixture(scope="function")
 async def locked_user(db_session):
@@ -165,10 +260,11 @@ async def users_with_same_role_50_users(db_session):
     users = []
     for _ in range(50):
         user_data = {
-            "nickname": fake.user_name(),
+            # unique: fifty draws regularly repeat a username or email otherwise
+            "nickname": fake.unique.user_name(),
             "first_name": fake.first_name(),
             "last_name": fake.last_name(),
-            "email": fake.email(),
+            "email": fake.unique.email(),
             "hashed_password": fake.password(),
             "role": UserRole.AUTHENTICATED,
             "email_verified": False,
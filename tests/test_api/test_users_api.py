@@ -1,11 +1,18 @@
-from builtins import str
+from builtins import ConnectionRefusedError, len, str
 import pytest
+from unittest.mock import AsyncMock
+from urllib.parse import urlsplit
 from httpx import AsyncClient
 from app.main import app
 from app.models.user_model import User, UserRole
 from app.utils.nickname_gen import generate_nickname
 from app.utils.security import hash_password
 from app.services.jwt_service import decode_token  # Import your FastAPI app
+from app.utils.query_stats import assert_max_queries
+from app.utils.response_cache import response_cache
+from app.dependencies import get_email_service
+from app.services.email_service import EmailService
+from app.utils.template_manager import TemplateManager
 
 # Example of a test function using the async_client fixture
 @pytest.mark.asyncio
@@ -190,3 +197,274 @@ async def test_list_users_unauthorized(async_client, user_token):
         headers={"Authorization": f"Bearer {user_token}"}
     )
     assert response.status_code == 403  # Forbidden, as expected for regular user
+
+@pytest.mark.asyncio
+async def test_retrieve_user_includes_links(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    assert response.status_code == 200
+    links = response.json()["links"]
+    assert [link["rel"] for link in links] == ["self", "update", "delete"]
+    assert links[0]["href"] == f"http://testserver/users/{admin_user.id}"
+
+@pytest.mark.asyncio
+async def test_retrieve_different_users_are_cached_separately(async_client, admin_user, verified_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    first = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    second = await async_client.get(f"/users/{verified_user.id}", headers=headers)
+    assert second.json()["id"] == str(verified_user.id)
+    assert second.headers["etag"] != first.headers["etag"]
+    revalidated = await async_client.get(f"/users/{verified_user.id}", headers={**headers, "If-None-Match": first.headers["etag"]})
+    assert revalidated.status_code == 200
+
+@pytest.mark.asyncio
+async def test_list_users_without_links(async_client, admin_token, users_with_same_role_50_users):
+    response = await async_client.get(
+        "/users/?limit=5&include_links=false",
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["links"] == []
+    assert all("links" not in item for item in body["items"])
+
+@pytest.mark.asyncio
+async def test_list_users_with_links(async_client, admin_token, users_with_same_role_50_users):
+    response = await async_client.get(
+        "/users/?limit=5",
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert {link["rel"] for link in body["links"]} == {"self", "first", "last", "next"}
+    assert all(len(item["links"]) == 3 for item in body["items"])
+
+@pytest.mark.asyncio
+async def test_retrieve_user_sparse_fields(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get(f"/users/{admin_user.id}?fields=email,nickname&include_links=false", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"id": str(admin_user.id), "email": admin_user.email, "nickname": admin_user.nickname}
+
+@pytest.mark.asyncio
+async def test_retrieve_user_unknown_field(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get(f"/users/{admin_user.id}?fields=email,hashed_password", headers=headers)
+    assert response.status_code == 422
+    assert "hashed_password" in response.json()["detail"]
+
+@pytest.mark.asyncio
+async def test_list_users_sparse_fields(async_client, admin_token, users_with_same_role_50_users):
+    response = await async_client.get(
+        "/users/?limit=5&fields=role",
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert len(items) == 5
+    assert all(set(item) == {"id", "role", "links"} for item in items)
+
+@pytest.mark.asyncio
+async def test_list_users_filtered(async_client, admin_user, admin_token, users_with_same_role_50_users):
+    response = await async_client.get(
+        "/users/?role=ADMIN&limit=5",
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 1
+    assert body["items"][0]["id"] == str(admin_user.id)
+    assert "role=ADMIN" in body["links"][0]["href"]
+
+@pytest.mark.asyncio
+@pytest.mark.postgres
+async def test_search_users(async_client, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    first_name = users_with_same_role_50_users[0].first_name
+    response = await async_client.get(f"/users/search?q={first_name}&limit=1", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["size"] == 1
+    assert "<mark>" in body["items"][0]["snippet"]
+    assert body["next_cursor"] is not None
+
+@pytest.mark.asyncio
+async def test_search_users_invalid_cursor(async_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/users/search?q=john&cursor=not-a-cursor", headers=headers)
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_retrieve_user_not_modified(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    etag = response.headers["ETag"]
+    response = await async_client.get(f"/users/{admin_user.id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+@pytest.mark.asyncio
+async def test_retrieve_user_modified_after_update(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    etag = (await async_client.get(f"/users/{admin_user.id}", headers=headers)).headers["ETag"]
+    await async_client.put(f"/users/{admin_user.id}", json={"first_name": "Changed"}, headers=headers)
+    response = await async_client.get(f"/users/{admin_user.id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+@pytest.mark.asyncio
+async def test_update_user_if_match(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    etag = (await async_client.get(f"/users/{admin_user.id}", headers=headers)).headers["ETag"]
+    response = await async_client.put(f"/users/{admin_user.id}", json={"first_name": "First"}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 200
+    new_etag = response.headers["ETag"]
+    assert new_etag != etag
+    # A second writer still holding the old ETag loses
+    response = await async_client.put(f"/users/{admin_user.id}", json={"first_name": "Second"}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 412
+    response = await async_client.put(f"/users/{admin_user.id}", json={"first_name": "Third"}, headers={**headers, "If-Match": new_etag})
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_list_users_not_modified(async_client, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    etag = (await async_client.get("/users/?limit=5", headers=headers)).headers["ETag"]
+    response = await async_client.get("/users/?limit=5", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    await async_client.delete(f"/users/{users_with_same_role_50_users[0].id}", headers=headers)
+    response = await async_client.get("/users/?limit=5", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_etags_differ_per_page_and_projection(async_client, admin_user, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    first_page = await async_client.get("/users/?skip=0&limit=5", headers=headers)
+    second_page = await async_client.get("/users/?skip=5&limit=5", headers=headers)
+    assert first_page.headers["ETag"] != second_page.headers["ETag"]
+    # The first page's ETag does not validate the second page
+    response = await async_client.get("/users/?skip=5&limit=5", headers={**headers, "If-None-Match": first_page.headers["ETag"]})
+    assert response.status_code == 200
+    sparse_list = await async_client.get("/users/?skip=0&limit=5&fields=email", headers=headers)
+    assert sparse_list.headers["ETag"] != first_page.headers["ETag"]
+
+    full = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    sparse = await async_client.get(f"/users/{admin_user.id}?fields=email", headers=headers)
+    unlinked = await async_client.get(f"/users/{admin_user.id}?include_links=false", headers=headers)
+    assert len({full.headers["ETag"], sparse.headers["ETag"], unlinked.headers["ETag"]}) == 3
+    response = await async_client.get(f"/users/{admin_user.id}?fields=email", headers={**headers, "If-None-Match": full.headers["ETag"]})
+    assert response.status_code == 200
+    response = await async_client.get(f"/users/{admin_user.id}?fields=email", headers={**headers, "If-None-Match": sparse.headers["ETag"]})
+    assert response.status_code == 304
+
+@pytest.mark.asyncio
+async def test_list_users_served_from_cache_until_write(async_client, admin_user, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    first = await async_client.get("/users/?limit=5", headers=headers)
+    hits = response_cache.hits
+    second = await async_client.get("/users/?limit=5", headers=headers)
+    assert response_cache.hits == hits + 1
+    assert second.content == first.content
+    await async_client.put(f"/users/{admin_user.id}", json={"first_name": "Changed"}, headers=headers)
+    third = await async_client.get("/users/?limit=5", headers=headers)
+    assert response_cache.hits == hits + 1
+    assert third.headers["ETag"] != first.headers["ETag"]
+
+# Query budgets: raise these only with a reason, they catch N+1 regressions
+@pytest.mark.asyncio
+async def test_retrieve_user_query_budget(async_client, admin_user, admin_token):
+    with assert_max_queries(1):
+        response = await async_client.get(f"/users/{admin_user.id}", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_list_users_query_budget(async_client, users_with_same_role_50_users, admin_token):
+    with assert_max_queries(2):
+        response = await async_client.get("/users/?limit=50", headers={"Authorization": f"Bearer {admin_token}"})
+    assert len(response.json()["items"]) == 50
+
+@pytest.mark.asyncio
+async def test_update_user_query_budget(async_client, admin_user, admin_token):
+    with assert_max_queries(3):
+        response = await async_client.put(f"/users/{admin_user.id}", json={"first_name": "Budget"},
+                                          headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_create_user_query_budget(async_client, admin_token, email_service):
+    app.dependency_overrides[get_email_service] = lambda: email_service
+    user_data = {"email": "budget@example.com", "password": "sS#fdasrongPassword123!", "role": "AUTHENTICATED"}
+    with assert_max_queries(6):  # includes the verification token insert
+        response = await async_client.post("/users/", json=user_data, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 201
+
+@pytest.mark.asyncio
+async def test_password_reset_flow(async_client, verified_user, email_service):
+    app.dependency_overrides[get_email_service] = lambda: email_service
+    try:
+        response = await async_client.post("/password-reset/request", json={"email": verified_user.email})
+        assert response.status_code == 202
+        unknown = await async_client.post("/password-reset/request", json={"email": "nobody@example.com"})
+        assert unknown.status_code == 202 and unknown.json() == response.json()
+        assert email_service.send_password_reset_email.await_count == 1
+        _, token = email_service.send_password_reset_email.call_args.args
+    finally:
+        app.dependency_overrides.pop(get_email_service, None)
+
+    body = {"user_id": str(verified_user.id), "token": token, "new_password": "BrandNew$Password1"}
+    response = await async_client.post("/password-reset/confirm", json=body)
+    assert response.status_code == 200
+    # The link works once
+    response = await async_client.post("/password-reset/confirm", json=body)
+    assert response.status_code == 400
+
+    form_data = {"username": verified_user.email, "password": "BrandNew$Password1"}
+    response = await async_client.post("/login/", data=urlencode(form_data), headers={"Content-Type": "application/x-www-form-urlencoded"})
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_password_reset_request_hides_send_failures(async_client, verified_user, email_service):
+    email_service.send_password_reset_email.side_effect = ConnectionRefusedError
+    app.dependency_overrides[get_email_service] = lambda: email_service
+    try:
+        response = await async_client.post("/password-reset/request", json={"email": verified_user.email})
+    finally:
+        app.dependency_overrides.pop(get_email_service, None)
+    assert response.status_code == 202
+    assert email_service.send_password_reset_email.await_count == 1
+
+@pytest.mark.asyncio
+async def test_password_reset_link_in_email_resolves(async_client, verified_user, email_service, monkeypatch):
+    app.dependency_overrides[get_email_service] = lambda: email_service
+    try:
+        await async_client.post("/password-reset/request", json={"email": verified_user.email})
+        _, token = email_service.send_password_reset_email.call_args.args
+    finally:
+        app.dependency_overrides.pop(get_email_service, None)
+    mailer = EmailService(template_manager=TemplateManager())
+    monkeypatch.setattr(mailer, "send_user_email", AsyncMock())
+    await mailer.send_password_reset_email(verified_user, token)
+    reset_url = mailer.send_user_email.call_args.args[0]["reset_url"]
+
+    response = await async_client.get(urlsplit(reset_url).path)
+    assert response.status_code == 200
+    link = response.json()
+    assert link["token"] == token
+    body = {"user_id": link["user_id"], "token": link["token"], "new_password": "BrandNew$Password1"}
+    response = await async_client.post(urlsplit(link["confirm_url"]).path, json=body)
+    assert response.status_code == 200
+
+    response = await async_client.get(urlsplit(reset_url).path + "x")
+    assert response.status_code == 400
+
+    monkeypatch.setattr("settings.config.settings.password_reset_base_url", "https://app.example.com/account/")
+    await mailer.send_password_reset_email(verified_user, token)
+    assert mailer.send_user_email.call_args.args[0]["reset_url"] == f"https://app.example.com/account/reset-password/{verified_user.id}/{token}"
+
+@pytest.mark.asyncio
+async def test_password_reset_rejects_forged_token_without_queries(async_client, verified_user):
+    body = {"user_id": str(verified_user.id), "token": "forged.7fffffff.c2lnbmF0dXJl", "new_password": "BrandNew$Password1"}
+    with assert_max_queries(0):
+        response = await async_client.post("/password-reset/confirm", json=body)
+    assert response.status_code == 400
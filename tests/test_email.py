@@ -1,3 +1,6 @@
+import threading
+import time
+from unittest.mock import Mock
 import pytest
 from app.services.email_service import EmailService
 from app.utils.template_manager import TemplateManager
@@ -12,3 +15,18 @@ async def test_send_markdown_email(email_service):
     }
     await email_service.send_user_email(user_data, 'email_verification')
     # Manual verification in Mailtrap
+
+
+@pytest.mark.asyncio
+async def test_smtp_send_runs_off_the_event_loop():
+    service = EmailService(template_manager=TemplateManager())
+    threads = []
+
+    def slow_send(subject, html_content, recipient):
+        threads.append(threading.current_thread())
+        time.sleep(0.05)
+
+    service.smtp_client = Mock(send_email=slow_send)
+    user_data = {"email": "test@example.com", "name": "Test User", "reset_url": "http://example.com/reset", "expires_minutes": 30}
+    await service.send_user_email(user_data, 'password_reset')
+    assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,36 @@
+from builtins import str
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from app.utils.etag import collection_etag, etag_matches, parse_user_etag, representation_tag, user_etag
+
+
+def test_user_etag_round_trip():
+    user_id = uuid4()
+    updated_at = datetime(2024, 4, 21, 9, 51, 44, 977108, tzinfo=timezone.utc)
+    etag = user_etag(user_id, updated_at)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert parse_user_etag(etag, user_id) == updated_at
+
+def test_user_etag_variants_differ_but_parse_alike():
+    user_id = uuid4()
+    updated_at = datetime(2024, 4, 21, 9, 51, 44, 977108, tzinfo=timezone.utc)
+    full = user_etag(user_id, updated_at, representation_tag(("id", "email"), True))
+    sparse = user_etag(user_id, updated_at, representation_tag(("id",), True))
+    assert full != sparse
+    assert parse_user_etag(full, user_id) == parse_user_etag(sparse, user_id) == updated_at
+
+def test_parse_user_etag_rejects_other_users_and_weak_tags():
+    user_id = uuid4()
+    etag = user_etag(user_id, datetime.now(timezone.utc))
+    assert parse_user_etag(etag, uuid4()) is None
+    assert parse_user_etag(f"W/{etag}", user_id) is None
+    assert parse_user_etag('"garbage"', user_id) is None
+
+def test_etag_matches():
+    etag = collection_etag(3, datetime.now(timezone.utc))
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
@@ -0,0 +1,81 @@
+from builtins import AttributeError, ConnectionRefusedError, min
+import pytest
+from sqlalchemy import text
+
+from app.database import Database
+from app.main import app, lifespan
+from settings.config import settings
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture
+def ready():
+    app.state.ready = True
+    yield
+    app.state.ready = False
+
+async def test_healthz(async_client):
+    response = await async_client.get("/healthz")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+async def test_readyz_before_startup(async_client):
+    app.state.ready = False
+    response = await async_client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json() == {"status": "starting"}
+
+async def test_readyz_when_warm(async_client, ready):
+    response = await async_client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready"}
+
+async def test_readyz_database_down(async_client, ready, db_session, monkeypatch):
+    async def failing_execute(*args, **kwargs):
+        raise ConnectionRefusedError("database is down")
+    monkeypatch.setattr(db_session, "execute", failing_execute)
+    response = await async_client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json() == {"status": "database unavailable"}
+
+@pytest.mark.postgres
+async def test_lifespan_warms_pool_and_disposes(db_session, monkeypatch):
+    monkeypatch.setattr("app.main.setup_logging", lambda: None)
+    monkeypatch.setattr("app.main.shutdown_logging", lambda: None)
+    await Database.dispose()
+    try:
+        async with lifespan(app):
+            assert app.state.ready is True
+            assert app.openapi_schema is not None
+            pool = Database._engine.pool
+            assert pool.checkedin() == min(settings.db_warmup_connections, pool.size())
+            async with Database.get_session_factory()() as session:
+                # the warmup queries are already prepared on the pooled connection
+                result = await session.execute(text("SELECT count(*) FROM pg_prepared_statements"))
+                assert result.scalar() > 0
+        assert app.state.ready is False
+        assert Database._engine is None
+    finally:
+        Database.initialize(settings.database_url)
+
+async def test_lifespan_fails_on_warmup_bugs_but_not_on_outages(monkeypatch):
+    monkeypatch.setattr("app.main.setup_logging", lambda: None)
+    monkeypatch.setattr("app.main.shutdown_logging", lambda: None)
+    monkeypatch.setenv("SCHEDULER_ENABLED", "false")
+
+    async def broken_warm_up(*args):
+        raise AttributeError("bug")
+
+    async def unreachable_warm_up(*args):
+        raise ConnectionRefusedError("database down")
+
+    monkeypatch.setattr(Database, "warm_up", broken_warm_up)
+    with pytest.raises(AttributeError):
+        async with lifespan(app):
+            pass
+    monkeypatch.setattr(Database, "warm_up", unreachable_warm_up)
+    try:
+        async with lifespan(app):
+            assert app.state.ready is True
+    finally:
+        Database.initialize(settings.database_url)
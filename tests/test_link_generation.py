@@ -6,7 +6,8 @@ from uuid import uuid4
 import pytest
 from fastapi import Request
 
-from app.utils.link_generation import create_link, create_pagination_link, create_user_links, generate_pagination_links
+from app.main import app
+from app.utils.link_generation import build_link_templates, create_link, create_pagination_link, create_user_links, generate_pagination_links, get_link_templates
 
 from urllib.parse import urlparse, parse_qs, urlunparse, urlencode
 
@@ -24,10 +25,17 @@ def normalize_url(url):
 
 @pytest.fixture
 def mock_request():
-    request = MagicMock(spec=Request)
-    request.url_for = MagicMock(side_effect=lambda action, user_id: f"http://testserver/{action}/{user_id}")
-    request.url = "http://testserver/users"
-    return request
+    scope = {
+        "type": "http",
+        "app": app,
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "root_path": "",
+        "path": "/users",
+        "query_string": b"",
+        "headers": [],
+    }
+    return Request(scope)
 
 def test_create_link():
     link = create_link("self", "http://example.com", "GET", "view")
@@ -37,9 +45,15 @@ def test_create_user_links(mock_request):
     user_id = uuid4()
     links = create_user_links(user_id, mock_request)
     assert len(links) == 3
-    assert normalize_url(str(links[0].href)) == f"http://testserver/get_user/{user_id}"
-    assert normalize_url(str(links[1].href)) == f"http://testserver/update_user/{user_id}"
-    assert normalize_url(str(links[2].href)) == f"http://testserver/delete_user/{user_id}"
+    assert [link.rel for link in links] == ["self", "update", "delete"]
+    assert normalize_url(str(links[0].href)) == f"http://testserver/users/{user_id}"
+    assert normalize_url(str(links[1].href)) == f"http://testserver/users/{user_id}"
+    assert normalize_url(str(links[2].href)) == f"http://testserver/users/{user_id}"
+
+def test_link_templates_are_cached(mock_request):
+    templates = build_link_templates(app)
+    assert templates["get_user"] == "/users/{user_id}"
+    assert get_link_templates(mock_request) is templates
 
 def test_generate_pagination_links(mock_request):
     skip = 10
@@ -49,3 +63,9 @@ def test_generate_pagination_links(mock_request):
     assert len(links) >= 4
     expected_self_url = "http://testserver/users?limit=5&skip=10"
     assert normalize_url(str(links[0].href)) == normalize_url(expected_self_url), "Self link should match expected URL"
+
+def test_generate_pagination_links_keeps_other_query_params(mock_request):
+    mock_request.scope["query_string"] = b"skip=10&limit=5&include_links=true"
+    links = generate_pagination_links(mock_request, 10, 5, 50)
+    expected_next_url = "http://testserver/users?include_links=true&skip=15&limit=5"
+    assert normalize_url(str(links[3].href)) == normalize_url(expected_next_url)
@@ -0,0 +1,12 @@
+from benchmarks.load_test import check_errors
+
+def test_check_errors_warns_and_reports_fully_failed_scenarios(capsys):
+    scenarios = {
+        "register": {"requests": 40, "errors": 40},
+        "login": {"requests": 40, "errors": 3},
+        "get": {"requests": 40, "errors": 0},
+    }
+    assert check_errors(scenarios) == ["register"]
+    warnings = capsys.readouterr().err
+    assert "register: 40 of 40 requests failed" in warnings
+    assert "login: 3 of 40" in warnings and "get:" not in warnings
@@ -0,0 +1,68 @@
+from builtins import KeyError, RuntimeError, len, range, str
+import tracemalloc
+import pytest
+from prometheus_client import REGISTRY
+
+from app.utils import memory
+
+@pytest.fixture
+def tracing():
+    memory.start_tracing()
+    yield
+    memory.stop_tracing()
+
+def allocate_blocks():
+    return [bytearray(1024) for _ in range(2000)]
+
+def test_diff_finds_growing_allocation_site(tracing):
+    base_id, _ = memory.take_snapshot()
+    blocks = allocate_blocks()
+    target_id, _ = memory.take_snapshot()
+    top = memory.diff_allocators(memory.get_snapshot(base_id), memory.get_snapshot(target_id), limit=1)
+    assert "tests/test_memory.py" in top[0]["location"]
+    assert top[0]["size_diff_bytes"] >= 2000 * 1024
+    del blocks
+
+def test_snapshot_store_is_bounded(tracing, monkeypatch):
+    monkeypatch.setattr("app.utils.memory.settings.memory_snapshot_limit", 2)
+    ids = [memory.take_snapshot()[0] for _ in range(3)]
+    assert memory.snapshot_ids() == ids[1:]
+    with pytest.raises(KeyError):
+        memory.get_snapshot(ids[0])
+
+def test_snapshot_requires_tracing():
+    with pytest.raises(RuntimeError):
+        memory.take_snapshot()
+
+def test_memory_metrics_exported(user):
+    assert REGISTRY.get_sample_value("app_live_objects", {"pid": str(memory.os.getpid()), "type": "User"}) >= 1
+    assert REGISTRY.get_sample_value("app_gc_generation_objects", {"pid": str(memory.os.getpid()), "generation": "0"}) is not None
+    assert REGISTRY.get_sample_value("app_process_resident_memory_bytes", {"pid": str(memory.os.getpid())}) > 0
+
+@pytest.mark.asyncio
+async def test_memory_endpoints(async_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    try:
+        response = await async_client.post("/admin/diagnostics/memory/snapshots", headers=headers)
+        assert response.status_code == 409
+        assert (await async_client.post("/admin/diagnostics/memory/start?frames=5", headers=headers)).status_code == 200
+        assert tracemalloc.get_traceback_limit() == 5
+
+        base = (await async_client.post("/admin/diagnostics/memory/snapshots", headers=headers)).json()
+        target = (await async_client.post("/admin/diagnostics/memory/snapshots?limit=5", headers=headers)).json()
+        assert len(target["top"]) == 5
+        assert target["traced_memory"]["peak_bytes"] > 0
+
+        response = await async_client.get(f"/admin/diagnostics/memory/diff?base={base['snapshot_id']}", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["target"] == target["snapshot_id"]
+        response = await async_client.get("/admin/diagnostics/memory/diff?base=999999", headers=headers)
+        assert response.status_code == 404
+    finally:
+        await async_client.post("/admin/diagnostics/memory/stop", headers=headers)
+    assert not tracemalloc.is_tracing()
+
+@pytest.mark.asyncio
+async def test_memory_endpoints_require_admin(async_client, manager_token):
+    response = await async_client.post("/admin/diagnostics/memory/start", headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 403
@@ -0,0 +1,70 @@
+from builtins import str
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import bcrypt
+import pytest
+from prometheus_client import REGISTRY
+
+from app.utils.security import hash_password, verify_password, verify_password_async
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposes_metrics(async_client):
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for name in ("http_requests_total", "http_request_duration_seconds", "db_pool_checked_out",
+                 "bcrypt_duration_seconds", "smtp_send_duration_seconds", "response_cache_requests_total"):
+        assert name in response.text
+
+@pytest.mark.asyncio
+async def test_requests_labelled_by_route_template(async_client, admin_token, admin_user):
+    labels = {"method": "GET", "route": "/users/{user_id}", "status": "200"}
+    before = sample("http_requests_total", **labels)
+    response = await async_client.get(f"/users/{admin_user.id}", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert sample("http_requests_total", **labels) == before + 1
+    assert sample("http_requests_in_progress") == 0
+
+@pytest.mark.asyncio
+async def test_unmatched_routes_share_a_label(async_client):
+    labels = {"method": "GET", "route": "unmatched", "status": "404"}
+    before = sample("http_requests_total", **labels)
+    await async_client.get("/no/such/path/12345")
+    assert sample("http_requests_total", **labels) == before + 1
+
+def test_bcrypt_calls_are_timed():
+    before = sample("bcrypt_duration_seconds_count", operation="verify")
+    hashed = hash_password("MySuperPassword$1234", rounds=4)
+    assert verify_password("MySuperPassword$1234", hashed)
+    assert sample("bcrypt_duration_seconds_count", operation="verify") == before + 1
+    assert sample("bcrypt_operations_in_progress", operation="verify") == 0
+
+@pytest.mark.asyncio
+async def test_bcrypt_runs_off_the_event_loop_and_counts_waiters(monkeypatch):
+    monkeypatch.setattr("app.utils.security._bcrypt_executor", ThreadPoolExecutor(max_workers=1))
+    hashed = hash_password("MySuperPassword$1234", rounds=4)
+    started, release = threading.Event(), threading.Event()
+    checkpw = bcrypt.checkpw
+
+    def blocking_checkpw(*args):
+        started.set()
+        release.wait(5)
+        return checkpw(*args)
+
+    monkeypatch.setattr("bcrypt.checkpw", blocking_checkpw)
+    calls = asyncio.ensure_future(asyncio.gather(
+        verify_password_async("MySuperPassword$1234", hashed), verify_password_async("MySuperPassword$1234", hashed)
+    ))
+    # The event loop keeps running while the first call holds the only bcrypt thread
+    while not started.is_set():
+        await asyncio.sleep(0.01)
+    assert sample("bcrypt_operations_in_progress", operation="verify") == 1
+    assert sample("bcrypt_operations_waiting", operation="verify") == 1
+    release.set()
+    assert await calls == [True, True]
+    assert sample("bcrypt_operations_waiting", operation="verify") == 0
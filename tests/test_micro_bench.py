@@ -0,0 +1,17 @@
+from builtins import range, sum
+from benchmarks.micro_bench import compare, time_benchmark
+
+def result(**minimums):
+    return {"results": {name: {"min_us": minimum} for name, minimum in minimums.items()}}
+
+def test_compare_flags_slowdowns_beyond_threshold():
+    report = compare(result(fast=100.0, slow=100.0), result(fast=105.0, slow=120.0, new=1.0), threshold=10.0)
+    assert report["regressions"] == ["slow"]
+    assert report["benchmarks"]["fast"]["change_pct"] == 5.0
+    assert report["benchmarks"]["new"]["baseline_us"] is None
+
+def test_time_benchmark_calibrates_iterations():
+    timing = time_benchmark(lambda: sum(range(100)), rounds=3, min_time=0.01)
+    assert timing["iterations"] > 1
+    assert timing["rounds"] == 3
+    assert timing["min_us"] <= timing["median_us"]
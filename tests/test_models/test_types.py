@@ -0,0 +1,31 @@
+from builtins import str
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.schema import CreateTable
+from app.models.types import UTCDateTime, clock_utcnow, utcnow
+from app.models.user_model import User
+
+def test_search_vector_is_postgresql_only():
+    assert "search_vector" in str(CreateTable(User.__table__).compile(dialect=postgresql.dialect()))
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    inspector = inspect(engine)
+    assert "search_vector" not in [column["name"] for column in inspector.get_columns("users")]
+    indexes = [index["name"] for index in inspector.get_indexes("users")]
+    assert "ix_users_role" in indexes
+    assert "ix_users_search_vector" not in indexes
+
+def test_timestamp_functions_per_dialect():
+    assert str(utcnow().compile(dialect=postgresql.dialect())) == "now()"
+    assert str(clock_utcnow().compile(dialect=postgresql.dialect())) == "clock_timestamp()"
+    assert "strftime" in str(clock_utcnow().compile(dialect=sqlite.dialect()))
+
+def test_utc_datetime_round_trip_on_sqlite():
+    column_type = UTCDateTime()
+    dialect = sqlite.dialect()
+    local = datetime(2024, 5, 1, 14, 30, tzinfo=timezone(timedelta(hours=2)))
+    stored = column_type.process_bind_param(local, dialect)
+    assert stored == datetime(2024, 5, 1, 12, 30)
+    assert column_type.process_result_value(stored, dialect) == local
+    assert column_type.process_result_value(stored, dialect).tzinfo == timezone.utc
@@ -0,0 +1,81 @@
+from builtins import int, len, list, str
+import time
+import pytest
+
+from app.utils.profiler import StackSampler
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr("settings.config.settings.profile_dir", str(tmp_path))
+    return tmp_path
+
+def busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+def test_sampler_collects_collapsed_stacks():
+    sampler = StackSampler(interval=0.001).start()
+    busy_wait(0.1)
+    sampler.stop()
+    assert sampler.sample_count > 10
+    stack, count = sampler.collapsed().splitlines()[0].rsplit(" ", 1)
+    assert "busy_wait (tests/test_profiler.py:" in stack
+    assert stack.index("test_sampler_collects_collapsed_stacks") < stack.index("busy_wait")
+    assert int(count) > 0
+
+@pytest.mark.asyncio
+async def test_profile_endpoint_returns_collapsed_stacks(async_client, admin_token, profile_dir):
+    response = await async_client.post("/admin/diagnostics/profile?seconds=0.2&interval_ms=1",
+                                       headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert int(response.headers["x-profile-samples"]) > 0
+    assert response.text.splitlines()[0].rsplit(" ", 1)[1].isdigit()
+    assert len(list(profile_dir.iterdir())) == 1
+
+@pytest.mark.asyncio
+async def test_profile_endpoint_requires_admin(async_client, manager_token):
+    response = await async_client.post("/admin/diagnostics/profile?seconds=0.1",
+                                       headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 403
+
+@pytest.fixture
+def profiling_enabled(monkeypatch):
+    monkeypatch.setattr("settings.config.settings.request_profiling_enabled", True)
+    monkeypatch.setattr("settings.config.settings.request_profiling_secret", "s3cret")
+
+@pytest.mark.asyncio
+async def test_admin_request_profiled_by_header(async_client, admin_user, admin_token, profile_dir, profiling_enabled):
+    headers = {"Authorization": f"Bearer {admin_token}", "X-Profile": "1"}
+    response = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    assert response.status_code == 200
+    name = response.headers["x-profile-id"]
+    assert name.endswith("-GET__users__user_id.collapsed")
+    assert (profile_dir / name).exists()
+
+@pytest.mark.asyncio
+async def test_request_profiled_with_shared_secret(async_client, verified_user, user_token, profile_dir, profiling_enabled):
+    headers = {"Authorization": f"Bearer {user_token}", "X-Profile": "1", "X-Profile-Secret": "s3cret"}
+    response = await async_client.get(f"/users/{verified_user.id}", headers=headers)
+    assert (profile_dir / response.headers["x-profile-id"]).exists()
+
+@pytest.mark.asyncio
+async def test_non_admin_request_not_profiled(async_client, verified_user, user_token, profile_dir, profiling_enabled, monkeypatch):
+    monkeypatch.setattr(StackSampler, "start", lambda self: pytest.fail("sampler started"))
+    for extra in ({}, {"X-Profile-Secret": "wrong"}):
+        headers = {"Authorization": f"Bearer {user_token}", "X-Profile": "1", **extra}
+        response = await async_client.get(f"/users/{verified_user.id}", headers=headers)
+        assert "x-profile-id" not in response.headers
+    response = await async_client.get("/users/", headers={"X-Profile": "1"})
+    assert "x-profile-id" not in response.headers
+    assert list(profile_dir.iterdir()) == []
+
+@pytest.mark.asyncio
+async def test_request_profiling_disabled_by_default(async_client, admin_user, admin_token, profile_dir, monkeypatch):
+    monkeypatch.setattr("settings.config.settings.request_profiling_secret", "s3cret")
+    monkeypatch.setattr(StackSampler, "start", lambda self: pytest.fail("sampler started"))
+    headers = {"Authorization": f"Bearer {admin_token}", "X-Profile": "1", "X-Profile-Secret": "s3cret"}
+    response = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert list(profile_dir.iterdir()) == []
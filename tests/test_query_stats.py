@@ -0,0 +1,63 @@
+from builtins import range
+import logging
+import pytest
+from sqlalchemy import select, text
+
+from app.models.user_model import User
+from app.utils.query_stats import QueryStatsMiddleware, assert_max_queries, track_queries
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.mark.postgres
+async def test_track_queries_counts_and_times(db_session):
+    with track_queries() as stats:
+        await db_session.execute(text("SELECT 1"))
+        await db_session.execute(text("SELECT pg_sleep(0.01)"))
+    assert stats.count == 2
+    assert stats.total_time >= 0.01
+    assert "pg_sleep" in stats.slowest[0]
+
+async def test_nested_collectors_both_record(db_session):
+    with track_queries() as outer:
+        with track_queries() as inner:
+            await db_session.execute(text("SELECT 1"))
+        await db_session.execute(text("SELECT 2"))
+    assert (outer.count, inner.count) == (2, 1)
+
+async def test_repeated_statements_detected(db_session, users_with_same_role_50_users):
+    with track_queries() as stats:
+        for user in users_with_same_role_50_users[:6]:
+            await db_session.execute(select(User).where(User.id == user.id))
+    statement, times = stats.repeated(5)[0]
+    assert times == 6
+    assert statement.startswith("SELECT users.id")
+
+async def test_assert_max_queries(db_session):
+    with assert_max_queries(1):
+        await db_session.execute(text("SELECT 1"))
+    with pytest.raises(AssertionError, match="at most 1 queries, 2 were executed"):
+        with assert_max_queries(1):
+            await db_session.execute(text("SELECT 1"))
+            await db_session.execute(text("SELECT 2"))
+
+async def test_middleware_logs_n_plus_one(db_session, caplog):
+    async def endpoint(scope, receive, send):
+        for _ in range(5):
+            await db_session.execute(text("SELECT 1"))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    middleware = QueryStatsMiddleware(endpoint)
+    with caplog.at_level(logging.WARNING, logger="app.utils.query_stats"):
+        await middleware({"type": "http", "method": "GET", "path": "/"}, None, send)
+    assert "Possible N+1 in GET unmatched: statement ran 5 times: SELECT 1" in caplog.text
+
+@pytest.mark.postgres
+async def test_slow_query_logged(db_session, caplog, monkeypatch):
+    monkeypatch.setattr("app.utils.query_stats.settings.slow_query_threshold_ms", 5.0)
+    with caplog.at_level(logging.WARNING, logger="app.utils.query_stats"):
+        await db_session.execute(text("SELECT pg_sleep(0.01)"))
+    assert "Slow query" in caplog.text
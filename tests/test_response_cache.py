@@ -0,0 +1,81 @@
+from builtins import range
+import time
+import pytest
+from fastapi import Request
+from starlette.responses import Response
+
+from app.utils.response_cache import ResponseCache
+
+
+def make_request(query_string: bytes = b"", path: str = "/users/") -> Request:
+    return Request({
+        "type": "http", "scheme": "http", "server": ("testserver", 80), "root_path": "",
+        "path": path, "query_string": query_string, "headers": [],
+    })
+
+@pytest.fixture
+def cache():
+    return ResponseCache(max_entries=3, max_bytes=1024, ttls={"list_users": 60.0})
+
+def test_hit_after_store(cache):
+    key = cache.key("list_users", make_request(b"limit=5&skip=0"), "ADMIN")
+    assert cache.lookup(key) is None
+    cache.store(key, Response(content=b'{"items":[]}', media_type="application/json", headers={"ETag": '"c0.0"'}))
+    # query parameter order does not matter
+    cached = cache.lookup(cache.key("list_users", make_request(b"skip=0&limit=5"), "ADMIN"))
+    assert cached.body == b'{"items":[]}'
+    assert cached.headers["etag"] == '"c0.0"'
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_etag_revalidation_from_cache(cache):
+    key = cache.key("list_users", make_request(), "ADMIN")
+    cache.store(key, Response(content=b"{}", headers={"ETag": '"c1.1"'}))
+    assert cache.lookup(key, '"c1.1"').status_code == 304
+
+def test_key_varies_by_role_and_version(cache):
+    request = make_request()
+    key = cache.key("list_users", request, "ADMIN")
+    cache.store(key, Response(content=b"{}"))
+    assert cache.lookup(cache.key("list_users", request, "MANAGER")) is None
+    cache.bump_version()
+    assert cache.lookup(cache.key("list_users", request, "ADMIN")) is None
+
+def test_key_varies_by_path():
+    cache = ResponseCache(max_entries=3, max_bytes=1024, ttls={"get_user": 60.0})
+    first = cache.key("get_user", make_request(path="/users/a"), "ADMIN")
+    cache.store(first, Response(content=b'{"id":"a"}', headers={"ETag": '"a.1"'}))
+    second = cache.key("get_user", make_request(path="/users/b"), "ADMIN")
+    assert second != first
+    assert cache.lookup(second, '"a.1"') is None
+    assert cache.lookup(cache.key("get_user", make_request(path="/users/a"), "ADMIN")).body == b'{"id":"a"}'
+
+def test_uncached_route(cache):
+    assert cache.key("get_user", make_request(), "ADMIN") is None
+    assert cache.lookup(None) is None
+
+def test_lru_eviction_by_count(cache):
+    keys = [cache.key("list_users", make_request(f"skip={i}".encode()), "ADMIN") for i in range(4)]
+    for key in keys[:3]:
+        cache.store(key, Response(content=b"{}"))
+    cache.lookup(keys[0])  # refresh keys[0] so keys[1] is least recently used
+    cache.store(keys[3], Response(content=b"{}"))
+    assert len(cache) == 3
+    assert cache.evictions == 1
+    assert cache.lookup(keys[1]) is None
+    assert cache.lookup(keys[0]) is not None
+
+def test_eviction_by_size(cache):
+    first = cache.key("list_users", make_request(b"skip=0"), "ADMIN")
+    second = cache.key("list_users", make_request(b"skip=10"), "ADMIN")
+    cache.store(first, Response(content=b"x" * 600))
+    cache.store(second, Response(content=b"x" * 600))
+    assert cache.lookup(first) is None
+    assert cache.size_bytes == 600
+
+def test_ttl_expiry(cache, monkeypatch):
+    key = cache.key("list_users", make_request(), "ADMIN")
+    cache.store(key, Response(content=b"{}"))
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert cache.lookup(key) is None
+    assert len(cache) == 0
@@ -0,0 +1,29 @@
+from builtins import str
+import json
+import uuid
+from datetime import datetime, timezone
+
+from app.models.user_model import UserRole
+from app.schemas.user_schemas import UserListResponse, UserResponse
+from app.utils.responses import ModelJSONResponse
+
+
+def test_model_json_response_renders_model():
+    user_id = uuid.uuid4()
+    user = UserResponse(id=user_id, email="john.doe@example.com", nickname="john_doe", role=UserRole.ADMIN)
+    response = ModelJSONResponse(UserListResponse(items=[user], total=1, page=1, size=1))
+    body = json.loads(response.body)
+    assert response.media_type == "application/json"
+    assert body["items"][0]["id"] == str(user_id)
+    assert body["items"][0]["role"] == "ADMIN"
+    assert body["total"] == 1
+
+def test_model_json_response_renders_plain_content():
+    user_id = uuid.uuid4()
+    now = datetime(2024, 4, 21, 9, 51, tzinfo=timezone.utc)
+    response = ModelJSONResponse({"id": user_id, "created_at": now, "role": UserRole.MANAGER})
+    assert json.loads(response.body) == {
+        "id": str(user_id),
+        "created_at": "2024-04-21T09:51:00Z",
+        "role": "MANAGER",
+    }
@@ -0,0 +1,77 @@
+from builtins import RuntimeError, len
+import asyncio
+import pytest
+from app.utils.scheduler import Job, Scheduler, advisory_lock_key
+from tests.conftest import engine
+
+pytestmark = pytest.mark.asyncio
+
+
+def test_advisory_lock_key_is_stable_signed_64_bit():
+    key = advisory_lock_key("app.scheduler")
+    assert key == advisory_lock_key("app.scheduler") != advisory_lock_key("other")
+    assert -2**63 <= key < 2**63
+
+
+async def test_run_job_reports_success_timeout_and_failure():
+    scheduler = Scheduler(engine)
+
+    async def changed_rows():
+        return 3
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    assert await scheduler.run_job(Job("rows", changed_rows, 1, 1, 0)) == "success"
+    assert await scheduler.run_job(Job("slow", slow, 1, 0.01, 0)) == "timeout"
+    assert await scheduler.run_job(Job("broken", broken, 1, 1, 0)) == "failure"
+
+
+async def test_jobs_with_zero_interval_are_disabled():
+    scheduler = Scheduler(engine)
+    scheduler.add("off", asyncio.sleep, 0, 1)
+    scheduler.add("on", asyncio.sleep, 5, 1)
+    assert len(scheduler.jobs) == 1 and "on" in scheduler.jobs
+
+
+@pytest.mark.postgres
+async def test_only_one_scheduler_holds_the_leader_lock():
+    first = Scheduler(engine, lock_name="test.scheduler.election")
+    second = Scheduler(engine, lock_name="test.scheduler.election")
+    try:
+        assert await first.elect() is True
+        assert await first.elect() is True  # re-checking keeps the lock
+        assert await second.elect() is False
+        await first.stop()
+        assert await second.elect() is True
+    finally:
+        await first.stop()
+        await second.stop()
+
+
+@pytest.mark.postgres
+async def test_jobs_run_on_the_leader_only():
+    runs = {"leader": 0, "follower": 0}
+
+    def counter(name):
+        async def run():
+            runs[name] += 1
+        return run
+
+    leader = Scheduler(engine, lock_name="test.scheduler.jobs", election_interval=0.01)
+    follower = Scheduler(engine, lock_name="test.scheduler.jobs", election_interval=0.01)
+    leader.add("count", counter("leader"), interval=0.01, timeout=1)
+    follower.add("count", counter("follower"), interval=0.01, timeout=1)
+    try:
+        await leader.elect()
+        leader.start()
+        follower.start()
+        await asyncio.sleep(0.3)
+    finally:
+        await leader.stop()
+        await follower.stop()
+    assert runs["leader"] > 0
+    assert runs["follower"] == 0
@@ -1,7 +1,8 @@
 # test_security.py
 from builtins import RuntimeError, ValueError, isinstance, str
 import pytest
-from app.utils.security import hash_password, verify_password
+from datetime import datetime, timedelta, timezone
+from app.utils.security import hash_password, sign_token, signed_token_expiry, verify_password, verify_signed_token
 
 def test_hash_password():
     """Test that hashing password returns a bcrypt hashed string."""
@@ -65,3 +66,23 @@ def test_hash_password_internal_error(monkeypatch):
     with pytest.raises(ValueError):
         hash_password("test")
 
+def test_signed_token_round_trip():
+    """A signed token verifies for its own purpose and subject only."""
+    expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+    token = sign_token("EMAIL_VERIFICATION", "user-1", expires_at)
+    assert verify_signed_token(token, "EMAIL_VERIFICATION", "user-1")
+    assert not verify_signed_token(token, "PASSWORD_RESET", "user-1")
+    assert not verify_signed_token(token, "EMAIL_VERIFICATION", "user-2")
+    assert signed_token_expiry(token) == expires_at.replace(microsecond=0)
+
+def test_signed_token_rejects_tampering_and_expiry():
+    """Changed expiries, forged signatures, expired and malformed tokens are all rejected."""
+    token = sign_token("EMAIL_VERIFICATION", "user-1", datetime.now(timezone.utc) + timedelta(hours=1))
+    nonce, expires, signature = token.split(".")
+    assert not verify_signed_token(f"{nonce}.{int(expires, 16) + 3600:x}.{signature}", "EMAIL_VERIFICATION", "user-1")
+    assert not verify_signed_token(f"{nonce}.{expires}.{signature[:-2]}xx", "EMAIL_VERIFICATION", "user-1")
+    assert not verify_signed_token(f"{nonce}.{expires}.é", "EMAIL_VERIFICATION", "user-1")
+    expired = sign_token("EMAIL_VERIFICATION", "user-1", datetime.now(timezone.utc) - timedelta(seconds=1))
+    assert not verify_signed_token(expired, "EMAIL_VERIFICATION", "user-1")
+    for malformed in ("", "abc", "a.zz.b", "a.b.c.d"):
+        assert not verify_signed_token(malformed, "EMAIL_VERIFICATION", "user-1")
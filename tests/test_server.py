@@ -0,0 +1,42 @@
+from unittest.mock import MagicMock, patch
+
+from app import server
+
+def test_worker_count_derived_from_cpus(monkeypatch):
+    monkeypatch.setattr(server.settings, "server_workers", 0)
+    monkeypatch.setattr(server.settings, "server_workers_per_core", 2.0)
+    with patch.object(server, "available_cpus", return_value=4):
+        assert server.worker_count() == 8
+    monkeypatch.setattr(server.settings, "server_workers", 3)
+    assert server.worker_count() == 3
+
+def test_gunicorn_options(monkeypatch):
+    monkeypatch.setattr(server.settings, "server_port", 9000)
+    options = server.gunicorn_options()
+    assert options["bind"] == "0.0.0.0:9000"
+    assert options["worker_class"] == "app.server.AppUvicornWorker"
+    assert options["max_requests_jitter"] == server.settings.server_max_requests_jitter
+    assert options["child_exit"] is server.child_exit
+
+def test_gunicorn_config_applied():
+    application = server.GunicornApplication(server.APP_PATH, server.gunicorn_options())
+    assert application.cfg.worker_class_str == "app.server.AppUvicornWorker"
+    assert application.cfg.keepalive == server.settings.server_keepalive
+
+def test_child_exit_marks_worker_dead():
+    with patch("app.utils.metrics.mark_worker_dead") as mark_worker_dead:
+        server.child_exit(MagicMock(), MagicMock(pid=1234))
+    mark_worker_dead.assert_called_once_with(1234)
+
+def test_development_mode_runs_uvicorn_with_reload(monkeypatch):
+    monkeypatch.setattr(server.settings, "server_mode", "development")
+    with patch("uvicorn.run") as run:
+        server.main()
+    assert run.call_args.kwargs["reload"] is True
+
+def test_development_mode_ignores_multiprocess_metrics_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(server.settings, "server_mode", "development")
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path / "missing"))
+    with patch("uvicorn.run"):
+        server.main()
+    assert "PROMETHEUS_MULTIPROC_DIR" not in server.os.environ
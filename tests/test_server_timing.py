@@ -0,0 +1,46 @@
+import logging
+import pytest
+
+from app.utils.server_timing import RequestTimings
+
+def test_header_value_orders_known_phases_first():
+    timings = RequestTimings()
+    timings.add("custom", 0.002)
+    timings.add("serialize", 0.001)
+    timings.add("auth", 0.0005)
+    timings.add("auth", 0.0005)
+    assert timings.header_value(0.01) == "auth;dur=1.0, serialize;dur=1.0, custom;dur=2.0, total;dur=10.0"
+
+@pytest.mark.asyncio
+async def test_no_header_by_default(async_client, admin_user, admin_token):
+    response = await async_client.get(f"/users/{admin_user.id}", headers={"Authorization": f"Bearer {admin_token}"})
+    assert "server-timing" not in response.headers
+
+@pytest.mark.asyncio
+async def test_admin_can_request_breakdown(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}", "X-Server-Timing": "1"}
+    response = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    assert response.status_code == 200
+    phases = [metric.split(";")[0] for metric in response.headers["server-timing"].split(", ")]
+    assert phases == ["auth", "db", "serialize", "total"]
+
+@pytest.mark.asyncio
+async def test_non_admin_cannot_request_breakdown(async_client, verified_user, user_token):
+    headers = {"Authorization": f"Bearer {user_token}", "X-Server-Timing": "1"}
+    response = await async_client.get(f"/users/{verified_user.id}", headers=headers)
+    assert "server-timing" not in response.headers
+
+@pytest.mark.asyncio
+async def test_setting_enables_header_with_hash_phase(async_client, verified_user, monkeypatch):
+    monkeypatch.setattr("app.utils.server_timing.settings.server_timing_enabled", True)
+    form_data = {"username": verified_user.email, "password": "MySuperPassword$1234"}
+    response = await async_client.post("/login/", data=form_data)
+    assert response.status_code == 200
+    assert "hash;dur=" in response.headers["server-timing"]
+
+@pytest.mark.asyncio
+async def test_slow_requests_logged_with_breakdown(async_client, admin_user, admin_token, monkeypatch, caplog):
+    monkeypatch.setattr("app.utils.server_timing.settings.slow_request_threshold_ms", 0.0)
+    with caplog.at_level(logging.WARNING, logger="app.utils.server_timing"):
+        await async_client.get(f"/users/{admin_user.id}", headers={"Authorization": f"Bearer {admin_token}"})
+    assert "Slow request GET /users/{user_id}: auth;dur=" in caplog.text
@@ -0,0 +1,82 @@
+from builtins import len, range, str
+import pytest
+from sqlalchemy import text
+from app.models.user_model import User, UserRole
+from app.services.user_service import UserService
+
+# Full-text search is built on PostgreSQL tsvector / GIN
+pytestmark = [pytest.mark.asyncio, pytest.mark.postgres]
+
+@pytest.fixture
+async def profile_users(db_session):
+    users = [
+        User(nickname="python_dev", email="ada@example.com", hashed_password="x", role=UserRole.AUTHENTICATED,
+             first_name="Ada", last_name="Python", bio="Backend engineer."),
+        User(nickname="bio_dev", email="grace@example.com", hashed_password="x", role=UserRole.AUTHENTICATED,
+             first_name="Grace", last_name="Hopper", bio="Writes Python services and data pipelines."),
+        User(nickname="other_dev", email="linus@example.com", hashed_password="x", role=UserRole.AUTHENTICATED,
+             first_name="Linus", last_name="Kernel", bio="Systems programming in C."),
+    ]
+    db_session.add_all(users)
+    await db_session.commit()
+    return users
+
+async def test_search_ranks_name_matches_first(db_session, profile_users):
+    results = await UserService.search(db_session, "python")
+    assert [result["nickname"] for result in results] == ["python_dev", "bio_dev"]
+    assert results[0]["rank"] > results[1]["rank"]
+
+async def test_search_highlights_snippet(db_session, profile_users):
+    results = await UserService.search(db_session, "pipelines")
+    assert len(results) == 1
+    assert "<mark>pipelines</mark>" in results[0]["snippet"]
+
+async def test_search_snippet_escapes_profile_html(db_session):
+    db_session.add(User(nickname="xss_dev", email="xss@example.com", hashed_password="x", role=UserRole.AUTHENTICATED,
+                        first_name="Mallory", bio="<img src=x onerror=alert(1)> builds \x02pipelines\x03 & more"))
+    await db_session.commit()
+    results = await UserService.search(db_session, "pipelines")
+    snippet = results[0]["snippet"]
+    assert "<img" not in snippet and "&lt;img" in snippet
+    assert "<mark>pipelines</mark>" in snippet and "&amp;" in snippet
+    assert snippet.count("<mark>") == 1
+
+async def test_search_no_matches(db_session, profile_users):
+    assert await UserService.search(db_session, "haskell") == []
+
+async def test_search_keyset_pagination(db_session):
+    db_session.add_all([
+        User(nickname=f"dev_{i}", email=f"dev{i}@example.com", hashed_password="x", role=UserRole.AUTHENTICATED,
+             first_name="Dev", bio="engineer " * (i % 5 + 1))
+        for i in range(25)
+    ])
+    await db_session.commit()
+    seen = []
+    after = None
+    while True:
+        page = await UserService.search(db_session, "engineer", limit=10, after=after)
+        seen.extend(result["id"] for result in page)
+        if len(page) < 10:
+            break
+        after = (page[-1]["rank"], page[-1]["id"])
+    assert len(seen) == 25
+    assert len(set(seen)) == 25
+
+@pytest.mark.slow
+async def test_search_uses_gin_index(db_session):
+    await db_session.execute(text("""
+        INSERT INTO users (id, nickname, email, role, email_verified, hashed_password, first_name, last_name, bio)
+        SELECT gen_random_uuid(), 'user_' || i, 'user' || i || '@example.com', 'AUTHENTICATED'::"UserRole", true, 'x',
+               'First' || i, 'Last' || i, 'Engineer number ' || i || ' working on project ' || (i % 97)
+        FROM generate_series(1, 20000) AS i
+    """))
+    await db_session.commit()
+    # Flush the GIN pending list, as autovacuum would on a long-lived table; VACUUM itself
+    # cannot run inside the test's transaction
+    await db_session.execute(text("SELECT gin_clean_pending_list('ix_users_search_vector')"))
+    await db_session.execute(text("ANALYZE users"))
+    result = await db_session.execute(text(
+        "EXPLAIN SELECT id FROM users WHERE search_vector @@ websearch_to_tsquery('english', 'first1234')"
+    ))
+    plan = "\n".join(row[0] for row in result)
+    assert "ix_users_search_vector" in plan, plan
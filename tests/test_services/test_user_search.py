@@ -0,0 +1,119 @@
+from builtins import len, str
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import func, select, text
+from app.models.user_model import User, UserRole
+from app.schemas.user_schemas import UserFilterParams
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.asyncio
+
+# Rows seeded for the planner tests; large enough that a sequential scan is never the cheapest plan
+SEED_ROWS = 20000
+
+@pytest.fixture
+async def search_users(db_session):
+    now = datetime.now(timezone.utc)
+    users = [
+        User(nickname="clever_panda_1", email="alice.smith@example.com", hashed_password="x", role=UserRole.ADMIN,
+             email_verified=True, is_locked=False, is_professional=True, last_login_at=now - timedelta(days=1)),
+        User(nickname="jolly_fox_2", email="bob_jones@example.org", hashed_password="x", role=UserRole.AUTHENTICATED,
+             email_verified=True, is_locked=True, is_professional=False, last_login_at=now - timedelta(days=30)),
+        User(nickname="brave_koala_3", email="carol@sample.net", hashed_password="x", role=UserRole.ANONYMOUS,
+             email_verified=False, is_locked=False, is_professional=False),
+    ]
+    db_session.add_all(users)
+    await db_session.commit()
+    return users
+
+async def search(db_session, **params):
+    filters = UserFilterParams(**params)
+    users = await UserService.list_user_fields(db_session, ["id", "email"], 0, 10, filters)
+    assert await UserService.count(db_session, filters) == len(users)
+    return sorted(user["email"] for user in users)
+
+async def test_filter_email_substring(db_session, search_users):
+    assert await search(db_session, email="EXAMPLE") == ["alice.smith@example.com", "bob_jones@example.org"]
+
+async def test_filter_email_prefix(db_session, search_users):
+    assert await search(db_session, email_prefix="Alice") == ["alice.smith@example.com"]
+    assert await search(db_session, email_prefix="example") == []
+
+async def test_filter_wildcards_are_literal(db_session, search_users):
+    assert await search(db_session, email="b_j") == ["bob_jones@example.org"]
+    assert await search(db_session, email="%") == []
+
+async def test_filter_nickname(db_session, search_users):
+    assert await search(db_session, nickname="fox") == ["bob_jones@example.org"]
+    assert await search(db_session, nickname_prefix="BRAVE") == ["carol@sample.net"]
+
+async def test_filter_flags_and_role(db_session, search_users):
+    assert await search(db_session, role=UserRole.ADMIN) == ["alice.smith@example.com"]
+    assert await search(db_session, is_locked=True) == ["bob_jones@example.org"]
+    assert await search(db_session, email_verified=False) == ["carol@sample.net"]
+    assert await search(db_session, is_professional=True, is_locked=False) == ["alice.smith@example.com"]
+
+async def test_filter_last_login_range(db_session, search_users):
+    now = datetime.now(timezone.utc)
+    assert await search(db_session, last_login_from=now - timedelta(days=7)) == ["alice.smith@example.com"]
+    assert await search(db_session, last_login_to=now - timedelta(days=7)) == ["bob_jones@example.org"]
+
+@pytest.fixture
+async def seeded_users(db_session):
+    """Bulk-load a realistic users table with skewed flag distributions, then refresh statistics."""
+    await db_session.execute(text(f"""
+        INSERT INTO users (id, nickname, email, role, email_verified, is_locked, is_professional,
+                           failed_login_attempts, hashed_password, created_at, last_login_at)
+        SELECT gen_random_uuid(), 'user_' || i, 'user' || i || '@example.com',
+               (CASE WHEN i % 500 = 0 THEN 'ADMIN' WHEN i % 50 = 0 THEN 'MANAGER' ELSE 'AUTHENTICATED' END)::"UserRole",
+               i % 20 <> 0, i % 100 = 0, i % 10 = 0, 0, 'x',
+               now() - make_interval(mins => i * 30), now() - make_interval(mins => i * 7)
+        FROM generate_series(1, {SEED_ROWS}) AS i
+    """))
+    await db_session.commit()
+    await db_session.execute(text("ANALYZE users"))
+
+async def explain(db_session, query) -> str:
+    connection = await db_session.connection()
+    sql = str(query.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    result = await connection.exec_driver_sql(f"EXPLAIN {sql}")
+    return "\n".join(row[0] for row in result)
+
+def count_query(**params):
+    return UserService._apply_filters(select(func.count()).select_from(User), UserFilterParams(**params))
+
+@pytest.mark.slow
+@pytest.mark.postgres
+@pytest.mark.parametrize("params, index", [
+    ({"email_prefix": "user1234"}, "ix_users_email_lower_pattern"),
+    ({"nickname_prefix": "user_1234"}, "ix_users_nickname_lower_pattern"),
+    ({"role": UserRole.ADMIN}, "ix_users_role"),
+    ({"is_locked": True}, "ix_users_locked_created_at"),
+    ({"email_verified": False}, "ix_users_unverified_created_at"),
+    ({"is_professional": True}, "ix_users_professional_created_at"),
+])
+async def test_filters_use_indexes(db_session, seeded_users, params, index):
+    plan = await explain(db_session, count_query(**params))
+    assert index in plan, plan
+
+@pytest.mark.slow
+@pytest.mark.postgres
+async def test_date_ranges_use_indexes(db_session, seeded_users):
+    now = datetime.now(timezone.utc)
+    plan = await explain(db_session, count_query(created_from=now - timedelta(days=2)))
+    assert "ix_users_created_at_id" in plan, plan
+    plan = await explain(db_session, count_query(last_login_from=now - timedelta(hours=12)))
+    assert "ix_users_last_login_at" in plan, plan
+
+@pytest.mark.slow
+@pytest.mark.postgres
+async def test_substring_search_uses_trigram_index(db_session, seeded_users):
+    available = await db_session.execute(text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"))
+    if available.scalar() is None:
+        pytest.skip("pg_trgm extension is not available on this server")
+    await db_session.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    await db_session.execute(text("CREATE INDEX ix_users_email_trgm ON users USING gin (email gin_trgm_ops)"))
+    await db_session.commit()
+    await db_session.execute(text("ANALYZE users"))
+    plan = await explain(db_session, count_query(email="r1234@"))
+    assert "ix_users_email_trgm" in plan, plan
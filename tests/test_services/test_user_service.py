@@ -1,10 +1,14 @@
 from builtins import range
+from datetime import datetime, timedelta, timezone
 import pytest
 from sqlalchemy import select
 from app.dependencies import get_settings
+from app.models.token_model import TokenPurpose, UserToken
 from app.models.user_model import User, UserRole
 from app.services.user_service import UserService
 from app.utils.nickname_gen import generate_nickname
+from app.utils.query_stats import assert_max_queries
+from app.utils.security import generate_verification_token, hash_token
 
 pytestmark = pytest.mark.asyncio
 
@@ -19,6 +23,7 @@ async def test_create_user_with_valid_data(db_session, email_service):
     user = await UserService.create(db_session, user_data, email_service)
     assert user is not None
     assert user.email == user_data["email"]
+    assert not user.self_registered
 
 # Test creating a user with invalid data
 async def test_create_user_with_invalid_data(db_session, email_service):
@@ -92,6 +97,17 @@ async def test_list_users_with_pagination(db_session, users_with_same_role_50_us
     assert len(users_page_2) == 10
     assert users_page_1[0].id != users_page_2[0].id
 
+# Test listing users with a column projection
+async def test_list_user_fields(db_session, users_with_same_role_50_users):
+    users = await UserService.list_user_fields(db_session, ["id", "email"], skip=0, limit=10)
+    assert len(users) == 10
+    assert all(set(user) == {"id", "email"} for user in users)
+
+# Test fetching selected columns of a user by ID
+async def test_get_fields_by_id(db_session, user):
+    retrieved_user = await UserService.get_fields_by_id(db_session, user.id, ["id", "nickname"])
+    assert retrieved_user == {"id": user.id, "nickname": user.nickname}
+
 # Test registering a user with valid data
 async def test_register_user_with_valid_data(db_session, email_service):
     user_data = {
@@ -103,6 +119,7 @@ async def test_register_user_with_valid_data(db_session, email_service):
     user = await UserService.register_user(db_session, user_data, email_service)
     assert user is not None
     assert user.email == user_data["email"]
+    assert user.self_registered
 
 # Test attempting to register a user with invalid data
 async def test_register_user_with_invalid_data(db_session, email_service):
@@ -149,11 +166,146 @@ async def test_reset_password(db_session, user):
 
 # Test verifying a user's email
 async def test_verify_email_with_token(db_session, user):
-    token = "valid_token_example"  # This should be set in your user setup if it depends on a real token
-    user.verification_token = token  # Simulating setting the token in the database
+    token = UserService._issue_token(db_session, user.id, TokenPurpose.EMAIL_VERIFICATION, timedelta(hours=1))
     await db_session.commit()
     result = await UserService.verify_email_with_token(db_session, user.id, token)
     assert result is True
+    verified = await UserService.get_by_id(db_session, user.id)
+    assert verified.email_verified and verified.role == UserRole.AUTHENTICATED
+    # Tokens are single use
+    assert await UserService.verify_email_with_token(db_session, user.id, token) is False
+
+# Expired tokens, tokens for another user and unknown tokens are all rejected
+async def test_verify_email_rejects_invalid_tokens(db_session, user, verified_user):
+    expired = UserService._issue_token(db_session, user.id, TokenPurpose.EMAIL_VERIFICATION, timedelta(seconds=-1))
+    valid = UserService._issue_token(db_session, user.id, TokenPurpose.EMAIL_VERIFICATION, timedelta(hours=1))
+    await db_session.commit()
+    assert await UserService.verify_email_with_token(db_session, user.id, expired) is False
+    assert await UserService.verify_email_with_token(db_session, verified_user.id, valid) is False
+    assert await UserService.verify_email_with_token(db_session, user.id, "not-a-token") is False
+    assert (await UserService.get_by_id(db_session, user.id)).email_verified is False
+
+# Links that fail the signature check are rejected without touching the database
+async def test_verify_email_rejects_forged_tokens_without_queries(db_session, user):
+    user_id = user.id
+    with assert_max_queries(0):
+        assert await UserService.verify_email_with_token(db_session, user_id, "forged.7fffffff.c2lnbmF0dXJl") is False
+        assert await UserService.verify_email_with_token(db_session, user_id, "not.a.token") is False
+
+# Unsigned tokens mailed before signing was introduced keep working until their row expires
+async def test_verify_email_accepts_legacy_unsigned_tokens(db_session, user, verified_user, monkeypatch):
+    monkeypatch.setattr("settings.config.settings.legacy_token_valid_until", datetime.now(timezone.utc) + timedelta(hours=1))
+    user_id = user.id
+    legacy, expired = generate_verification_token(), generate_verification_token()
+    db_session.add_all([
+        UserToken(user_id=user_id, purpose=TokenPurpose.EMAIL_VERIFICATION, token_hash=hash_token(legacy),
+                  expires_at=datetime.now(timezone.utc) + timedelta(hours=48)),
+        UserToken(user_id=user_id, purpose=TokenPurpose.EMAIL_VERIFICATION, token_hash=hash_token(expired),
+                  expires_at=datetime.now(timezone.utc) - timedelta(seconds=1)),
+    ])
+    await db_session.commit()
+    assert await UserService.verify_email_with_token(db_session, user_id, expired) is False
+    assert await UserService.verify_email_with_token(db_session, verified_user.id, legacy) is False
+    assert await UserService.verify_email_with_token(db_session, user_id, legacy) is True
+    assert await UserService.verify_email_with_token(db_session, user_id, legacy) is False
+
+# Past the cutoff, or without the old shape, dotless tokens never reach the database
+async def test_verify_email_rejects_legacy_tokens_without_queries(db_session, user, monkeypatch):
+    user_id = user.id
+    legacy = generate_verification_token()
+    db_session.add(UserToken(user_id=user_id, purpose=TokenPurpose.EMAIL_VERIFICATION, token_hash=hash_token(legacy),
+                             expires_at=datetime.now(timezone.utc) + timedelta(hours=48)))
+    await db_session.commit()
+    monkeypatch.setattr("settings.config.settings.legacy_token_valid_until", datetime.now(timezone.utc) - timedelta(seconds=1))
+    with assert_max_queries(0):
+        assert await UserService.verify_email_with_token(db_session, user_id, legacy) is False
+    monkeypatch.setattr("settings.config.settings.legacy_token_valid_until", datetime.now(timezone.utc) + timedelta(hours=1))
+    with assert_max_queries(0):
+        assert await UserService.verify_email_with_token(db_session, user_id, "not-a-token") is False
+        assert await UserService.verify_email_with_token(db_session, user_id, legacy + "x") is False
+
+# Only the hash of a verification token is stored; the plaintext goes out by email
+async def test_create_stores_hashed_verification_token(db_session, email_service, admin_user):
+    user_data = {"nickname": generate_nickname(), "email": "hashed_token@example.com", "password": "ValidPassword123!", "role": UserRole.AUTHENTICATED.name}
+    user = await UserService.create(db_session, user_data, email_service)
+    sent_user, token = email_service.send_verification_email.call_args.args
+    assert sent_user is user
+    stored = (await db_session.execute(select(UserToken).filter_by(user_id=user.id))).scalar_one()
+    assert stored.purpose == TokenPurpose.EMAIL_VERIFICATION
+    assert stored.token_hash == hash_token(token) != token
+    assert await UserService.verify_email_with_token(db_session, user.id, token) is True
+
+# Expired tokens are deleted in batches; live tokens are kept
+async def test_purge_expired_tokens_in_batches(db_session, user):
+    for _ in range(5):
+        UserService._issue_token(db_session, user.id, TokenPurpose.PASSWORD_RESET, timedelta(seconds=-1))
+    live = UserService._issue_token(db_session, user.id, TokenPurpose.PASSWORD_RESET, timedelta(hours=1))
+    await db_session.commit()
+    assert await UserService.purge_expired_tokens(db_session, batch_size=2, max_batches=2) == 4
+    assert await UserService.purge_expired_tokens(db_session, batch_size=2, max_batches=10) == 1
+    remaining = (await db_session.execute(select(UserToken.token_hash))).scalars().all()
+    assert remaining == [hash_token(live)]
+
+# A reset link from one user cannot be used for another, and it revokes the user's other reset links
+async def test_reset_password_with_token(db_session, user, verified_user):
+    user_id, other_id = user.id, verified_user.id
+    first = UserService._issue_token(db_session, user_id, TokenPurpose.PASSWORD_RESET, timedelta(hours=1))
+    second = UserService._issue_token(db_session, user_id, TokenPurpose.PASSWORD_RESET, timedelta(hours=1))
+    await db_session.commit()
+    assert await UserService.reset_password_with_token(db_session, other_id, first, "NewPassword123!") is False
+    assert await UserService.reset_password_with_token(db_session, user_id, first, "NewPassword123!") is True
+    assert await UserService.reset_password_with_token(db_session, user_id, second, "OtherPassword123!") is False
+
+# Reset emails to one account are throttled, and a new link replaces the outstanding one
+async def test_request_password_reset_throttles_and_replaces(db_session, verified_user, email_service, monkeypatch):
+    user_id = verified_user.id
+    assert await UserService.request_password_reset(db_session, verified_user.email, email_service) is True
+    assert await UserService.request_password_reset(db_session, verified_user.email, email_service) is False
+    assert email_service.send_password_reset_email.await_count == 1
+    first = email_service.send_password_reset_email.call_args.args[1]
+
+    monkeypatch.setattr("app.services.user_service.settings.password_reset_cooldown_seconds", 0)
+    assert await UserService.request_password_reset(db_session, verified_user.email, email_service) is True
+    second = email_service.send_password_reset_email.call_args.args[1]
+    assert await UserService.reset_password_with_token(db_session, user_id, first, "NewPassword123!") is False
+    assert await UserService.reset_password_with_token(db_session, user_id, second, "NewPassword123!") is True
+
+# Lockouts older than the cooldown are lifted; recent ones stay
+async def test_unlock_expired_lockouts(db_session, locked_user, verified_user):
+    locked_user.locked_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    verified_user.lock_account()
+    await db_session.commit()
+    assert await UserService.unlock_expired_lockouts(db_session, timedelta(minutes=30), batch_size=10, max_batches=1) == 1
+    await db_session.refresh(locked_user)
+    await db_session.refresh(verified_user)
+    assert not locked_user.is_locked and locked_user.failed_login_attempts == 0 and locked_user.locked_at is None
+    assert verified_user.is_locked
+
+# Only self-registered users who never verified are purged once past the retention period
+async def test_purge_stale_unverified_users(db_session, unverified_user, verified_user):
+    month_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    stale = User(nickname=generate_nickname(), email="stale@example.com", hashed_password="x", role=UserRole.ANONYMOUS,
+                 self_registered=True, created_at=month_ago)
+    fresh = User(nickname=generate_nickname(), email="fresh@example.com", hashed_password="x", role=UserRole.ANONYMOUS,
+                 self_registered=True)
+    # Users created by an admin start out unverified and ANONYMOUS too
+    by_admin = User(nickname=generate_nickname(), email="by-admin@example.com", hashed_password="x", role=UserRole.ANONYMOUS,
+                    created_at=month_ago)
+    db_session.add_all([stale, fresh, by_admin])
+    await db_session.flush()
+    UserService._issue_token(db_session, stale.id, TokenPurpose.EMAIL_VERIFICATION, timedelta(days=-20))
+    await db_session.commit()
+    stale_id = stale.id
+    assert await UserService.purge_stale_unverified_users(db_session, timedelta(days=7), batch_size=10, max_batches=1) == 1
+    remaining = set((await db_session.execute(select(User.email))).scalars())
+    assert remaining == {unverified_user.email, verified_user.email, "fresh@example.com", "by-admin@example.com"}
+    assert (await db_session.execute(select(UserToken).filter_by(user_id=stale_id))).first() is None
+
+async def test_user_stats(db_session, admin_user, locked_user, verified_user):
+    stats = await UserService.user_stats(db_session)
+    assert stats[UserRole.ADMIN] == {"total": 1, "unverified": 1, "locked": 0}
+    assert stats[UserRole.AUTHENTICATED] == {"total": 2, "unverified": 1, "locked": 1}
+    assert stats[UserRole.MANAGER]["total"] == 0
 
 # Test unlocking a user's account
 async def test_unlock_user_account(db_session, locked_user):
@@ -161,3 +313,12 @@ async def test_unlock_user_account(db_session, locked_user):
     assert unlocked, "The account should be unlocked"
     refreshed_user = await UserService.get_by_id(db_session, locked_user.id)
     assert not refreshed_user.is_locked, "The user should no longer be locked"
+
+# Hot statements are built once per column list and reused across calls
+async def test_field_projections_reuse_cached_statements(db_session, user):
+    from app.services import user_service
+    first = await UserService.get_fields_by_id(db_session, user.id, ["id", "email"])
+    hits = user_service._user_fields_by_id.cache_info().hits
+    second = await UserService.get_fields_by_id(db_session, user.id, ["id", "email"])
+    assert first == second == {"id": user.id, "email": user.email}
+    assert user_service._user_fields_by_id.cache_info().hits == hits + 1
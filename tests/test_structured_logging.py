@@ -0,0 +1,87 @@
+from builtins import ValueError, len, range, str
+import io
+import json
+import logging
+import threading
+import uuid
+import pytest
+
+from app.utils.structured_logging import JsonFormatter, SamplingFilter, configure_logging, request_id_var
+
+@pytest.fixture
+def log_output():
+    """Install the queued pipeline writing to a buffer; yields a function returning the parsed lines."""
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    stream = io.StringIO()
+    listener = configure_logging("DEBUG", json_output=True, sample_rates={"sampled": 0.25}, stream=stream)
+
+    def lines():
+        if listener._thread is not None:
+            listener.stop()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield lines
+    if listener._thread is not None:
+        listener.stop()
+    root.handlers[:] = saved_handlers
+    root.setLevel(saved_level)
+
+def test_json_lines_with_request_id_and_extra(log_output):
+    token = request_id_var.set("abc123")
+    try:
+        logging.getLogger("app.test").info("Created %s", "user", extra={"user_count": 3})
+    finally:
+        request_id_var.reset(token)
+    record, = log_output()
+    assert record["message"] == "Created user"
+    assert record["request_id"] == "abc123"
+    assert record["user_count"] == 3
+    assert record["level"] == "INFO"
+
+def test_formatting_happens_on_listener_thread(log_output, monkeypatch):
+    threads = []
+    original = JsonFormatter.format
+    def tracking_format(self, record):
+        threads.append(threading.current_thread())
+        return original(self, record)
+    monkeypatch.setattr(JsonFormatter, "format", tracking_format)
+    logging.getLogger("app.test").warning("queued")
+    log_output()
+    assert threads and threads[0] is not threading.current_thread()
+
+def test_message_arguments_resolved_when_logged(log_output):
+    data = {"state": "before"}
+    logging.getLogger("app.test").info("State: %s", data)
+    data["state"] = "after"
+    assert log_output()[0]["message"] == "State: {'state': 'before'}"
+
+def test_exceptions_are_included(log_output):
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logging.getLogger("app.test").exception("Failed")
+    assert "ValueError: boom" in log_output()[0]["exc_info"]
+
+def test_sampling_keeps_fraction_of_info_but_all_warnings(log_output):
+    logger = logging.getLogger("sampled.child")
+    for i in range(8):
+        logger.info("info %d", i)
+    logger.warning("always")
+    messages = [record["message"] for record in log_output()]
+    assert messages == ["info 0", "info 4", "always"]
+
+def test_sampling_filter_prefix_and_drop_all():
+    sampler = SamplingFilter({"app": 1.0, "app.noisy": 0.0})
+    record = logging.makeLogRecord({"name": "app.noisy.module", "levelno": logging.INFO})
+    assert sampler.filter(record) is False
+    assert sampler.filter(logging.makeLogRecord({"name": "app.other", "levelno": logging.INFO})) is True
+
+@pytest.mark.asyncio
+async def test_request_id_correlates_service_logs(async_client, admin_token, log_output):
+    request_id = uuid.uuid4().hex
+    response = await async_client.delete(f"/users/{uuid.uuid4()}",
+                                          headers={"Authorization": f"Bearer {admin_token}", "X-Request-ID": request_id})
+    assert response.status_code == 404
+    records = [record for record in log_output() if record["logger"] == "app.services.user_service"]
+    assert records and records[0]["request_id"] == request_id
@@ -0,0 +1,74 @@
+from builtins import ValueError, len, open, str
+import json
+import pytest
+
+from app.utils.tracing import JsonLinesSpanExporter, configure_tracing, shutdown_tracing, traced
+from benchmarks.trace_report import load_spans, report
+
+REQUEST_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+@pytest.fixture
+def span_file(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    configure_tracing(JsonLinesSpanExporter(str(path)), batch=False)
+    yield path
+    shutdown_tracing()
+
+def read_spans(path):
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+@pytest.mark.asyncio
+async def test_request_spans_share_request_id_trace(async_client, admin_user, admin_token, span_file):
+    headers = {"Authorization": f"Bearer {admin_token}", "X-Request-ID": REQUEST_ID}
+    response = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["x-request-id"] == REQUEST_ID
+
+    spans = {span["name"]: span for span in read_spans(span_file)}
+    assert {span["context"]["trace_id"] for span in spans.values()} == {f"0x{REQUEST_ID}"}
+    server = spans["GET /users/{user_id}"]
+    service = spans["UserService.get_fields_by_id"]
+    query = spans["SELECT"]
+    assert server["kind"] == "SpanKind.SERVER"
+    assert server["attributes"]["http.response.status_code"] == 200
+    assert service["parent_id"] == server["context"]["span_id"]
+    assert query["parent_id"] == service["context"]["span_id"]
+    assert query["attributes"]["db.statement"].startswith("SELECT users.")
+
+@pytest.mark.asyncio
+async def test_login_traces_password_verification(async_client, verified_user, span_file):
+    form_data = {"username": verified_user.email, "password": "MySuperPassword$1234"}
+    response = await async_client.post("/login/", data=form_data)
+    assert response.status_code == 200
+    names = [span["name"] for span in read_spans(span_file)]
+    assert "verify_password" in names
+    assert "UserService.login_user" in names
+    # without an incoming id one is generated and echoed
+    assert len(response.headers["x-request-id"]) == 32
+
+def test_traced_records_exceptions(span_file):
+    @traced("failing")
+    def failing():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        failing()
+    span, = read_spans(span_file)
+    assert span["status"]["status_code"] == "ERROR"
+    assert span["events"][0]["name"] == "exception"
+
+def test_traced_is_passthrough_when_disabled():
+    @traced()
+    def add(a, b):
+        return a + b
+
+    assert add(1, 2) == 3
+
+@pytest.mark.asyncio
+async def test_trace_report_critical_path(async_client, admin_user, admin_token, span_file):
+    await async_client.get(f"/users/{admin_user.id}", headers={"Authorization": f"Bearer {admin_token}"})
+    summary = report(load_spans(str(span_file)), top=1)
+    path = [step["name"] for step in summary["slowest"][0]["critical_path"]]
+    assert path == ["GET /users/{user_id}", "UserService.get_fields_by_id", "SELECT"]
+    assert "SELECT" in summary["self_time_ms_by_span"]